@@ -0,0 +1,131 @@
+import os
+import re
+import threading
+from collections import Counter
+from dotenv import load_dotenv
+
+import numpy as np
+
+from agent.embeddings import encode
+from agent.tracing import span
+
+load_dotenv()
+
+# "adaptive" picks categories by resume coverage; "static" keeps the fixed order
+CATEGORY_SCHEDULER = os.getenv("CATEGORY_SCHEDULER", "adaptive").lower()
+# Cosine similarity below this means the category has nothing to ask about a section
+CATEGORY_COVERAGE_FLOOR = float(os.getenv("CATEGORY_COVERAGE_FLOOR", "0.2"))
+# Subtracted from a category's score for every time it was already asked
+CATEGORY_REPEAT_PENALTY = float(os.getenv("CATEGORY_REPEAT_PENALTY", "0.1"))
+# Score of categories that depend on the last answer rather than the resume
+CATEGORY_FOLLOWUP_GAIN = float(os.getenv("CATEGORY_FOLLOWUP_GAIN", "0.05"))
+# Long resume lines are split into windows of at most this many words
+SECTION_MAX_WORDS = 60
+
+# What each resume-driven category probes, phrased like the resume text it should match.
+# Categories without an entry (the error-handling follow-up) build on the last answer.
+CATEGORY_DESCRIPTIONS = {
+    "tech_most_challenging_project": "Complex project with difficult technical challenges, obstacles overcome and lessons learned.",
+    "tech_project_deep_dive": "Project implementation details: system architecture, libraries and frameworks used, design choices.",
+    "tech_project_impact": "Project results and measurable impact: reduced cost, improved efficiency, faster performance, more users.",
+    "tech_platform_choice": "Platforms, cloud services, databases and tools chosen for a product, such as Firebase, AWS or PostgreSQL.",
+    "tech_scalability_decision": "Scalable systems and data pipelines handling high throughput, low latency and large data volumes.",
+    "tech_performance_tuning": "Optimizing performance bottlenecks in database queries, data processing jobs or front-end rendering.",
+    "tech_function_design": "Designing APIs, modules, functions and algorithms for data processing and backend services.",
+    "tech_syntax_and_language": "Programming languages and skills such as Python, Java, JavaScript, SQL, C++ and their frameworks.",
+    "tech_problem_solving": "Solving real-world engineering problems: debugging production issues, scaling services, fixing memory leaks.",
+    "tech_education_application": "Education and degree: computer science coursework, data structures, mathematics, statistics and theory.",
+}
+
+# Contact details carry nothing to ask about
+_SKIP_LINE = re.compile(r"^\s*(name|phone|email|location)\s*:", re.IGNORECASE)
+
+_category_vectors = None
+_category_lock = threading.Lock()
+
+
+def _normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype="float32"))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _get_category_vectors() -> np.ndarray:
+    """Unit embeddings of CATEGORY_DESCRIPTIONS, in key order; computed once per process."""
+    global _category_vectors
+    with _category_lock:
+        if _category_vectors is None:
+            _category_vectors = _normalize(encode(list(CATEGORY_DESCRIPTIONS.values())))
+    return _category_vectors
+
+
+def split_resume_sections(resume_text: str) -> list:
+    """
+    Resume lines worth asking about (skills, role, education, one per project),
+    with long lines cut into windows of SECTION_MAX_WORDS words.
+    """
+    sections = []
+    for line in (resume_text or "").splitlines():
+        if not line.strip() or _SKIP_LINE.match(line):
+            continue
+        words = line.split()
+        if len(words) < 3:
+            continue
+        for start in range(0, len(words), SECTION_MAX_WORDS):
+            sections.append(" ".join(words[start:start + SECTION_MAX_WORDS]))
+    return sections
+
+
+class CategoryScheduler:
+    """
+    Per-session scheduler for technical question categories.
+
+    At session start the resume is split into sections and a category x section
+    coverage matrix is computed with one batched encode and one matrix product.
+    Each turn then scores every category by the resume mass it would newly
+    probe -- coverage of the sections not yet probed by earlier questions,
+    weighted by section length -- minus a penalty per previous use. Per turn
+    this is a single (categories x sections) matrix-vector product.
+    """
+
+    def __init__(self, resume_text: str):
+        self.categories = list(CATEGORY_DESCRIPTIONS)
+        self.sections = split_resume_sections(resume_text)
+        self.uses = Counter()
+
+        with span("category_coverage", sections=len(self.sections)):
+            if self.sections:
+                similarity = _get_category_vectors() @ _normalize(encode(self.sections)).T
+                floor = CATEGORY_COVERAGE_FLOOR
+                self.coverage = np.clip((similarity - floor) / (1 - floor), 0, 1)
+            else:
+                self.coverage = np.zeros((len(self.categories), 0), dtype="float32")
+        weights = np.log1p([len(s.split()) for s in self.sections]).astype("float32")
+        self.weights = weights / weights.sum() if weights.size else weights
+        # How thoroughly each section has been probed so far (0..1)
+        self.probed = np.zeros(len(self.sections), dtype="float32")
+
+    def scores(self, categories: list) -> dict:
+        """Score of each of `categories` for the next question; higher is better."""
+        gain = self.coverage @ (self.weights * (1 - self.probed))
+        result = {}
+        for category in categories:
+            if category in CATEGORY_DESCRIPTIONS:
+                score = float(gain[self.categories.index(category)])
+            else:
+                score = CATEGORY_FOLLOWUP_GAIN
+            result[category] = score - CATEGORY_REPEAT_PENALTY * self.uses[category]
+        return result
+
+    def record(self, category: str):
+        """Mark `category` as asked: the sections it covers count as probed."""
+        self.uses[category] += 1
+        if category in CATEGORY_DESCRIPTIONS:
+            self.probed = np.maximum(self.probed, self.coverage[self.categories.index(category)])
+
+    def pick(self, categories: list) -> str:
+        """Best-scoring of `categories` (ties keep list order), recorded as asked."""
+        scores = self.scores(categories)
+        best = max(categories, key=lambda c: scores[c])
+        self.record(best)
+        return best
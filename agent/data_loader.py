@@ -3,6 +3,11 @@ import sys
 import json
 from dotenv import load_dotenv
 
+from agent.embeddings import encode_for_index
+from agent.index_alias import active_index_name
+from agent.tracing import span, traced
+from agent.vector_compression import get_transform
+
 load_dotenv()
 
 # Toggle between Pinecone and Postgres via environment variable
@@ -10,20 +15,16 @@ load_dotenv()
 # True and False are case-sensitive
 USE_PINECONE = os.getenv("USE_PINECONE", "true").lower() == "true"
 
+# Vector index used for lookups; created on first use by get_index(). Anything
+# with the Pinecone Index API can be assigned here instead (e.g. LocalIndex).
+index = None
+# Name `index` was connected under; None when it was assigned directly
+_index_name = None
+
 if USE_PINECONE:
-    # ----- Pinecone Imports -----
-    from pinecone import Pinecone
-    from sentence_transformers import SentenceTransformer
+    # ----- Pinecone Settings -----
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
     PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "resumes-index")
-    if not PINECONE_API_KEY:
-        raise ValueError("PINECONE_API_KEY not found in environment.")
-    if not PINECONE_INDEX_NAME:
-        raise ValueError("PINECONE_INDEX_NAME not found in environment.")
-    # Initialize Pinecone client and embedding model
-    pc = Pinecone(api_key=PINECONE_API_KEY)
-    index = pc.Index(PINECONE_INDEX_NAME)
-    model = SentenceTransformer("all-MiniLM-L6-v2")
 
 else:
     # ----- Postgres Imports -----
@@ -39,12 +40,46 @@ else:
     if not all([PG_USER, PG_PASSWORD, PG_DATABASE]):
         raise ValueError("Postgres credentials (PG_USER, PG_PASSWORD, PG_DATABASE) must be set in environment.")
 
+def get_index():
+    """
+    The Pinecone index, connected on first call (the embedding model also loads
+    lazily in agent.embeddings), so importing this module needs no network.
+    The name comes from the active index alias (agent/index_alias.py), falling
+    back to PINECONE_INDEX_NAME; after an alias switch the next call reconnects.
+    """
+    global index, _index_name
+    if index is None or _index_name is not None:
+        name = active_index_name()
+        if index is None or name != _index_name:
+            if not PINECONE_API_KEY:
+                raise ValueError("PINECONE_API_KEY not found in environment.")
+            if not name:
+                raise ValueError("PINECONE_INDEX_NAME not found in environment.")
+            from pinecone import Pinecone
+            pc = Pinecone(api_key=PINECONE_API_KEY)
+            index = pc.Index(name)
+            _index_name = name
+    return index
+
+_warned_transforms = set()
+
+
+def _check_transform(meta: dict):
+    """Warn (once per version) when matched vectors were built with another transform than the query."""
+    stored = meta.get("vector_transform", "none")
+    expected = get_transform().version
+    if stored != expected and stored not in _warned_transforms:
+        _warned_transforms.add(stored)
+        print(f"⚠️ Index vectors use transform '{stored}' but queries use '{expected}'; "
+              "check VECTOR_TRANSFORM_PATH or the active index alias.")
+
 def _normalize_phone(phone: str) -> str:
     digits = "".join(filter(str.isdigit, phone))
     # Take the last 10 digits if length > 10, else use as-is
     return digits[-10:] if len(digits) >= 10 else digits
 
 
+@traced("phone_lookup")
 def get_candidate_by_phone(raw_phone: str) -> dict:
     """
     Fetch candidate metadata by phone number.
@@ -61,17 +96,20 @@ def get_candidate_by_phone(raw_phone: str) -> dict:
         # Only pass the normalized last-10-digits to the model prompt
         print("Using Pinecone for phone lookup...")
         query = f"Phone number: {normalized}"
-        query_vector = model.encode(query).astype("float32").tolist()
+        with span("embed"):
+            query_vector = encode_for_index(query).tolist()
 
         try:
-            result = index.query(
-                vector=query_vector,
-                top_k=1,
-                include_metadata=True
-            )
+            with span("vector_query", top_k=1):
+                result = get_index().query(
+                    vector=query_vector,
+                    top_k=1,
+                    include_metadata=True
+                )
             if result.matches:
                 match = result.matches[0]
                 meta = match.metadata
+                _check_transform(meta)
                 if meta.get("is_phone_entry") == "true":
                     return meta
             return None
@@ -83,17 +121,18 @@ def get_candidate_by_phone(raw_phone: str) -> dict:
         # ----- Postgres-based lookup -----
         print("Using Postgres for phone lookup...")
         try:
-            conn = psycopg2.connect(
-                host=PG_HOST,
-                port=PG_PORT,
-                user=PG_USER,
-                password=PG_PASSWORD,
-                database=PG_DATABASE
-            )
+            with span("db_connect"):
+                conn = psycopg2.connect(
+                    host=PG_HOST,
+                    port=PG_PORT,
+                    user=PG_USER,
+                    password=PG_PASSWORD,
+                    database=PG_DATABASE
+                )
             cur = conn.cursor(cursor_factory=RealDictCursor)
 
-            # Compare last 10 digits of stored phone (strip non-digits) to normalized input
-            query = f"""
+            # phone_normalized holds the same last-10-digits form and is uniquely indexed
+            select = f"""
             SELECT
                 name,
                 email,
@@ -107,11 +146,19 @@ def get_candidate_by_phone(raw_phone: str) -> dict:
                 projects,
                 work_experience
             FROM {PG_TABLE_NAME}
-            WHERE RIGHT(regexp_replace(phone, '\\D', '', 'g'), 10) = %s
-            LIMIT 1
             """
-            cur.execute(query, (normalized,))
-            row = cur.fetchone()
+            with span("db_query"):
+                cur.execute(select + "WHERE phone_normalized = %s", (normalized,))
+                row = cur.fetchone()
+                if row is None:
+                    # Rows not yet filled by `manage.py backfill_resume_keys` have no
+                    # phone_normalized; match them on the stored phone's digits as before
+                    cur.execute(
+                        select + "WHERE phone_normalized IS NULL "
+                                 "AND RIGHT(regexp_replace(phone, '\\D', '', 'g'), 10) = %s LIMIT 1",
+                        (normalized,),
+                    )
+                    row = cur.fetchone()
             cur.close()
             conn.close()
 
@@ -131,6 +178,7 @@ def get_candidate_by_phone(raw_phone: str) -> dict:
             return None
 
 
+@traced("load_resume")
 def load_full_resume_text(raw_phone: str) -> str:
     """
     Retrieve the candidate's full resume text as a single concatenated string.
@@ -145,15 +193,17 @@ def load_full_resume_text(raw_phone: str) -> str:
     if USE_PINECONE:
         # ----- Pinecone-based retrieval -----
         query = f"Phone number: {normalized}"
-        query_vector = model.encode(query).astype("float32").tolist()
+        with span("embed"):
+            query_vector = encode_for_index(query).tolist()
 
         try:
             # 1) Find the candidate_id via the phone entry
-            phone_result = index.query(
-                vector=query_vector,
-                top_k=1,
-                include_metadata=True
-            )
+            with span("vector_query", top_k=1):
+                phone_result = get_index().query(
+                    vector=query_vector,
+                    top_k=1,
+                    include_metadata=True
+                )
             if not phone_result.matches:
                 return None
 
@@ -164,12 +214,13 @@ def load_full_resume_text(raw_phone: str) -> str:
             candidate_id = phone_meta.get("candidate_id")
 
             # 2) Fetch all chunks for that candidate_id
-            slices = index.query(
-                vector=query_vector,
-                top_k=100,
-                include_metadata=True,
-                filter={"candidate_id": {"$eq": candidate_id}}
-            )
+            with span("vector_query", top_k=100):
+                slices = get_index().query(
+                    vector=query_vector,
+                    top_k=100,
+                    include_metadata=True,
+                    filter={"candidate_id": {"$eq": candidate_id}}
+                )
 
             if not slices.matches:
                 return None
@@ -196,13 +247,14 @@ def load_full_resume_text(raw_phone: str) -> str:
     else:
         # ----- Postgres-based retrieval -----
         try:
-            conn = psycopg2.connect(
-                host=PG_HOST,
-                port=PG_PORT,
-                user=PG_USER,
-                password=PG_PASSWORD,
-                database=PG_DATABASE
-            )
+            with span("db_connect"):
+                conn = psycopg2.connect(
+                    host=PG_HOST,
+                    port=PG_PORT,
+                    user=PG_USER,
+                    password=PG_PASSWORD,
+                    database=PG_DATABASE
+                )
             cur = conn.cursor(cursor_factory=RealDictCursor)
 
             query = f"""
@@ -218,11 +270,19 @@ def load_full_resume_text(raw_phone: str) -> str:
                 projects,
                 work_experience
             FROM {PG_TABLE_NAME}
-            WHERE RIGHT(regexp_replace(phone, '\\D', '', 'g'), 10) = %s
-            LIMIT 1
             """
-            cur.execute(query, (normalized,))
-            row = cur.fetchone()
+            with span("db_query"):
+                cur.execute(select + "WHERE phone_normalized = %s", (normalized,))
+                row = cur.fetchone()
+                if row is None:
+                    # Rows not yet filled by `manage.py backfill_resume_keys` have no
+                    # phone_normalized; match them on the stored phone's digits as before
+                    cur.execute(
+                        select + "WHERE phone_normalized IS NULL "
+                                 "AND RIGHT(regexp_replace(phone, '\\D', '', 'g'), 10) = %s LIMIT 1",
+                        (normalized,),
+                    )
+                    row = cur.fetchone()
             cur.close()
             conn.close()
 
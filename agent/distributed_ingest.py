@@ -0,0 +1,257 @@
+"""
+Ingest one shared resume folder with many workers, on one or several machines.
+
+    python -m agent.distributed_ingest worker --folder /mnt/resumes --run backfill-2025-06   # on every host, N times
+    python -m agent.distributed_ingest status --folder /mnt/resumes --run backfill-2025-06 --watch 10
+    python -m agent.distributed_ingest merge  --folder /mnt/resumes --run backfill-2025-06   # once all are done
+    python -m agent.distributed_ingest retry-failed --folder /mnt/resumes --run backfill-2025-06
+
+Workers take files through lease records (agent/ingest_leases.py,
+INGEST_LEASE_STORE=postgres or directory). Dead workers' leases are reclaimed
+once they expire. A worker commits its files every --checkpoint-every resumes,
+after their upserts have completed. Workers that run out of files wait for
+other workers' leases, so they can reclaim them if those workers die, and exit
+when every file is done or failed.
+
+Each worker writes its BM25 chunks to its own shard in the shared folder.
+`merge` folds the shards into the active lexical index and drops the
+candidates that workers retired (near-duplicate replacements).
+
+Near-duplicate handling is best-effort here. A worker waits for its own
+pending upserts before it checks or retires an earlier upload of the same
+record, but not for other workers' upserts. Two uploads of one record that
+are ingested at the same moment by different workers can both end up
+indexed, or leave the older one unretired.
+"""
+import os
+import json
+import time
+import socket
+import argparse
+import threading
+from datetime import datetime
+
+from agent.embeddings import get_model
+from agent.index_alias import active_lexical_path
+from agent.ingest import (API_URL, RESUME_FOLDER, INTERVIEW_PLAN_MODE, index_candidate, initialize_pinecone,
+                          list_resumes, load_plan_llm, upload_resume_and_get_data)
+from agent.ingest_journal import candidate_id_for, file_digest
+from agent.ingest_leases import INGEST_LEASE_STORE, INGEST_LEASE_TTL_S, open_store, shared_dir, worker_name
+from agent.lexical_index import BM25Index
+from agent.upsert_pool import UPSERT_WORKERS, UpsertPool
+
+# Workers whose last report is older than this are shown as stale in `status`
+STALE_WORKER_S = 3 * INGEST_LEASE_TTL_S
+
+
+def lexical_shard_dir(folder: str, run: str) -> str:
+    return os.path.join(shared_dir(folder, run), "lexical")
+
+
+class LexicalShard(BM25Index):
+    """
+    A worker's BM25 chunks, plus the candidates it removed that it does not hold
+    itself (e.g. retired by a near-duplicate replacement), for `merge` to remove.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.removed = set()
+
+    def remove_candidate(self, candidate_id: str):
+        super().remove_candidate(candidate_id)
+        self.removed.add(candidate_id)
+
+    def save(self, path: str):
+        super().save(path)
+        own = {doc["candidate_id"] for doc in self.docs.values()}
+        with open(f"{os.path.splitext(path)[0]}.removed", "w", encoding="utf-8") as f:
+            json.dump(sorted(self.removed - own), f)
+
+
+def run_worker(folder: str, run: str, api_url: str = API_URL, store=None, worker: str = None,
+               workers: int = UPSERT_WORKERS, checkpoint_every: int = 10, ttl_s: float = INGEST_LEASE_TTL_S,
+               poll_s: float = 5.0) -> dict:
+    """Lease, parse and index files until none are left; returns this worker's stats."""
+    store = store or open_store(folder, run)
+    worker = worker or worker_name()
+    keys = list_resumes(folder)
+    store.seed(keys)
+
+    model = get_model()
+    index = initialize_pinecone()
+    if index is None:
+        raise SystemExit("❌ Distributed ingest needs the Pinecone index (USE_PINECONE and PINECONE_API_KEY).")
+    plan_llm = load_plan_llm() if INTERVIEW_PLAN_MODE == "llm" else None
+    lexical = LexicalShard()
+    shard_path = os.path.join(lexical_shard_dir(folder, run), f"{worker}.json")
+
+    held = {}  # leased key -> candidate id once its upserts are submitted (None while parsing)
+    held_lock = threading.Lock()
+    stop = threading.Event()
+    stats = {"host": socket.gethostname(), "started": time.time(), "state": "running",
+             "files": 0, "failed": 0, "vectors": 0, "vectors_per_s": 0.0}
+
+    def heartbeat():
+        # Renew well before expiry, so a slow parse or upload does not lose the lease
+        while not stop.wait(ttl_s / 3):
+            with held_lock:
+                leased = list(held)
+            store.renew(worker, leased, ttl_s)
+
+    def fail(key: str, error: str):
+        print(f"❌ {key}: {error}")
+        if store.fail(worker, key, error):
+            stats["failed"] += 1
+        with held_lock:
+            held.pop(key, None)
+
+    def checkpoint(pool: UpsertPool):
+        failures = pool.drain()
+        if len(lexical):
+            lexical.save(shard_path)
+        with held_lock:
+            done = list(held.items())
+        for key, candidate_id in done:
+            if candidate_id in failures:
+                fail(key, f"upsert failed: {failures[candidate_id]}")
+            else:
+                if store.complete(worker, key, candidate_id):
+                    stats["files"] += 1
+                else:
+                    print(f"⚠️ {key}: lease was reclaimed by another worker, leaving the file to it")
+                with held_lock:
+                    held.pop(key, None)
+        stats.update(vectors=pool.upserted, vectors_per_s=round(pool.vectors_per_s(), 1))
+        store.report(worker, stats)
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+    print(f"👷 Worker {worker} on run '{run}': {len(keys)} file(s) in {folder}")
+    try:
+        with UpsertPool(index, workers=workers) as pool:
+            while True:
+                key = store.acquire(worker, keys, ttl_s)
+                if key is None:
+                    checkpoint(pool)
+                    if not store.unfinished(keys):
+                        break
+                    time.sleep(poll_s)  # other workers' leases: reclaim them if they expire
+                    continue
+                with held_lock:
+                    held[key] = None
+                path = os.path.join(folder, key)
+                try:
+                    digest = file_digest(path)
+                except OSError as e:
+                    fail(key, str(e))
+                    continue
+                parsed_data = upload_resume_and_get_data(api_url, path)
+                if not parsed_data:
+                    fail(key, "parse failed")
+                    continue
+                candidate_id = candidate_id_for(digest)
+                pool.tag = candidate_id
+                if not index_candidate(pool, model, candidate_id, parsed_data, lexical, plan_llm):
+                    fail(key, "embedding failed")
+                    continue
+                with held_lock:
+                    held[key] = candidate_id
+                if len(held) >= checkpoint_every:
+                    checkpoint(pool)
+        stats["state"] = "finished"
+    finally:
+        stop.set()
+        store.report(worker, stats)
+    print(f"✅ Worker {worker} done: {stats['files']} file(s), {stats['failed']} failed, "
+          f"{stats['vectors']} vector(s) at {stats['vectors_per_s']} vectors/s")
+    return stats
+
+
+def merge_lexical(folder: str, run: str, path: str = None) -> int:
+    """
+    Fold every worker's BM25 shard into the lexical index at `path` (default:
+    the active one), then drop the candidates the workers removed.
+    """
+    path = path or active_lexical_path()
+    lexical = BM25Index.load(path)
+    shard_dir = lexical_shard_dir(folder, run)
+    removed = set()
+    for name in sorted(os.listdir(shard_dir)) if os.path.isdir(shard_dir) else []:
+        if not name.endswith((".json", ".removed")):
+            continue  # a shard being written
+        with open(os.path.join(shard_dir, name), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if name.endswith(".removed"):
+            removed.update(data)
+            continue
+        for doc_id, doc in data.get("docs", {}).items():
+            lexical.add(doc_id, doc["text"], doc.get("candidate_id"), doc.get("metadata"))
+    for candidate_id in removed:
+        lexical.remove_candidate(candidate_id)
+    lexical.save(path)
+    return len(lexical)
+
+
+def print_progress(progress: dict, run: str):
+    files, now = progress["files"], time.time()
+    finished = files["done"] + files["failed"]
+    print(f"[{datetime.now():%H:%M:%S}] run '{run}': {files['done']}/{files['total']} done, "
+          f"{files['failed']} failed, {files['leased']} leased, {files['expired']} expired, "
+          f"{files['pending']} pending")
+    if progress["workers"]:
+        print(f"  {'worker':<28} {'state':<9} {'files':>7} {'failed':>6} {'vectors':>9} {'vectors/s':>10} "
+              f"{'last seen':>10}")
+    files_per_s = vectors_per_s = 0.0
+    for w in progress["workers"]:
+        age = now - w["last_seen"]
+        state = w.get("state", "running")
+        if state == "running" and age > STALE_WORKER_S:
+            state = "stale"
+        if state == "running":
+            files_per_s += w["files"] / max(w["last_seen"] - w["started"], 1e-9)
+            vectors_per_s += w["vectors_per_s"]
+        print(f"  {w['worker']:<28} {state:<9} {w['files']:>7} {w['failed']:>6} {w['vectors']:>9} "
+              f"{w['vectors_per_s']:>10.1f} {age:>9.0f}s")
+    remaining = files["total"] - finished
+    if remaining and files_per_s:
+        print(f"  aggregate: {vectors_per_s:.1f} vectors/s, {files_per_s:.2f} files/s, "
+              f"~{remaining / files_per_s / 60:.0f} min left")
+    elif not remaining and files["total"]:
+        print("  all files finished; run `merge` to update the lexical index")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a shared resume folder with several workers.")
+    parser.add_argument("command", choices=["worker", "status", "merge", "retry-failed"])
+    parser.add_argument("--folder", default=RESUME_FOLDER)
+    parser.add_argument("--run", default=None, help="Name of the backfill (default: the folder name).")
+    parser.add_argument("--store", choices=["postgres", "directory"], default=INGEST_LEASE_STORE)
+    parser.add_argument("--workers", type=int, default=UPSERT_WORKERS, help="Parallel upsert requests (worker).")
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="Files per commit (worker).")
+    parser.add_argument("--ttl", type=float, default=INGEST_LEASE_TTL_S, help="Lease seconds (worker).")
+    parser.add_argument("--watch", type=float, default=0, help="Refresh every N seconds (status).")
+    args = parser.parse_args()
+    run = args.run or os.path.basename(os.path.normpath(args.folder))
+    store = open_store(args.folder, run, args.store)
+
+    if args.command == "worker":
+        run_worker(args.folder, run, store=store, workers=args.workers, checkpoint_every=args.checkpoint_every,
+                   ttl_s=args.ttl)
+    elif args.command == "merge":
+        count = merge_lexical(args.folder, run)
+        print(f"🔎 Lexical index now holds {count} chunk(s): {active_lexical_path()}")
+    elif args.command == "retry-failed":
+        print(f"↩️ {store.retry_failed()} failed file(s) will be retried by the next worker")
+    else:
+        keys = list_resumes(args.folder)
+        while True:
+            progress = store.progress(keys)
+            print_progress(progress, run)
+            files = progress["files"]
+            if not args.watch or files["done"] + files["failed"] >= files["total"]:
+                break
+            time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Disk-backed embedding cache shared by ingest, phone lookups and retrieval.
+
+Layout under EMBEDDING_CACHE_DIR:
+    meta.json      dimension and capacity
+    vectors.f32    memory-mapped float32 matrix, one row per cached text
+    keys.bin       16-byte key per row: blake2b(model name + text)
+    ticks.u64      last-use counter per row, for LRU eviction across restarts
+
+The key of a row is checked on every hit, so a slot is never served for the
+wrong text. One process at a time writes (an exclusive lock on the directory);
+others open the cache read-only and only use existing entries.
+
+    python -m agent.embedding_cache stats
+    python -m agent.embedding_cache clear
+"""
+import os
+import json
+import atexit
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, run a single writer
+    fcntl = None
+
+load_dotenv()
+
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "false").lower() == "true"
+EMBEDDING_CACHE_DIR = os.getenv(
+    "EMBEDDING_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "embeddings")
+)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+
+KEY_BYTES = 16
+_EMPTY_KEY = b"\0" * KEY_BYTES
+
+
+def cache_key(model_name: str, text: str) -> bytes:
+    return hashlib.blake2b(f"{model_name}\0{text}".encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+
+class EmbeddingCache:
+    """LRU cache of embedding rows in memory-mapped files; thread-safe."""
+
+    def __init__(self, root: str = EMBEDDING_CACHE_DIR, capacity: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.root = root
+        self.capacity = capacity
+        self.dimension = None
+        self.read_only = False
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._slots = OrderedDict()  # key -> row, least recently used first
+        self._free = []
+        self._tick = 0
+        self._lock_file = None
+        self._vectors = self._keys = self._ticks = None
+
+        meta_path = os.path.join(root, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self._open(meta["dimension"], meta["capacity"])
+
+    def _acquire_writer_lock(self) -> bool:
+        if fcntl is None:
+            return True
+        self._lock_file = open(os.path.join(self.root, ".lock"), "a+")
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _open(self, dimension: int, capacity: int):
+        """Map the files (creating them on first use) and rebuild the key index and LRU order."""
+        os.makedirs(self.root, exist_ok=True)
+        self.dimension, self.capacity = dimension, capacity
+        self.read_only = not self._acquire_writer_lock()
+        paths = {name: os.path.join(self.root, name) for name in ("vectors.f32", "keys.bin", "ticks.u64")}
+        create = not all(os.path.exists(p) for p in paths.values())
+        if create and self.read_only:
+            return
+        mode = "w+" if create else ("r" if self.read_only else "r+")
+        self._vectors = np.memmap(paths["vectors.f32"], dtype="float32", mode=mode, shape=(capacity, dimension))
+        self._keys = np.memmap(paths["keys.bin"], dtype=f"S{KEY_BYTES}", mode=mode, shape=(capacity,))
+        self._ticks = np.memmap(paths["ticks.u64"], dtype="uint64", mode=mode, shape=(capacity,))
+        if create:
+            with open(os.path.join(self.root, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"dimension": dimension, "capacity": capacity}, f)
+
+        # np.bytes_ strips trailing NULs; pad back to the full key
+        keys = [bytes(k).ljust(KEY_BYTES, b"\0") for k in self._keys]
+        used = [row for row, k in enumerate(keys) if k != _EMPTY_KEY]
+        for row in sorted(used, key=lambda r: int(self._ticks[r])):
+            self._slots[keys[row]] = row
+        self._free = [row for row, k in enumerate(keys) if k == _EMPTY_KEY][::-1]
+        self._tick = int(self._ticks.max()) if capacity else 0
+
+    def get(self, key: bytes):
+        """Copy of the cached row, or None. Never a view: put() recycles evicted rows in place."""
+        with self._lock:
+            row = self._slots.get(key)
+            if row is None or bytes(self._keys[row]).ljust(KEY_BYTES, b"\0") != key:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._slots.move_to_end(key)
+            if not self.read_only:
+                self._tick += 1
+                self._ticks[row] = self._tick
+            return np.array(self._vectors[row])
+
+    def put(self, key: bytes, vector: np.ndarray):
+        vector = np.asarray(vector, dtype="float32")
+        with self._lock:
+            if self._vectors is None and self.dimension is None:
+                self._open(vector.shape[-1], self.capacity)
+            if self.read_only or self._vectors is None or vector.shape[-1] != self.dimension:
+                return
+            row = self._slots.pop(key, None)
+            if row is None:
+                if self._free:
+                    row = self._free.pop()
+                else:
+                    _, row = self._slots.popitem(last=False)
+            # Invalidate the key first so a concurrent reader never pairs it with a half-written row
+            self._keys[row] = _EMPTY_KEY
+            self._vectors[row] = vector
+            self._keys[row] = key
+            self._tick += 1
+            self._ticks[row] = self._tick
+            self._slots[key] = row
+
+    def flush(self):
+        with self._lock:
+            if self._vectors is not None and not self.read_only:
+                self._vectors.flush()
+                self._keys.flush()
+                self._ticks.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            files = ("vectors.f32", "keys.bin", "ticks.u64", "meta.json")
+            on_disk = 0
+            for name in files:
+                path = os.path.join(self.root, name)
+                if os.path.exists(path):
+                    # Allocated blocks, not the sparse file size
+                    st = os.stat(path)
+                    on_disk += getattr(st, "st_blocks", st.st_size // 512) * 512
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "entries": len(self._slots),
+                "capacity": self.capacity,
+                "bytes_used": len(self._slots) * ((self.dimension or 0) * 4 + KEY_BYTES + 8),
+                "bytes_on_disk": on_disk,
+                "read_only": self.read_only,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._vectors = self._keys = self._ticks = None
+            self._slots.clear()
+            self._free = []
+            self.dimension = None
+            for name in ("vectors.f32", "keys.bin", "ticks.u64", "meta.json"):
+                path = os.path.join(self.root, name)
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache when EMBEDDING_CACHE_ENABLED, else None."""
+    global _cache
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache()
+            atexit.register(_cache.flush)
+    return _cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the embedding cache.")
+    parser.add_argument("command", choices=["stats", "clear"])
+    args = parser.parse_args()
+    cache = EmbeddingCache()
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"{stats['entries']}/{stats['capacity']} entries, {stats['bytes_used'] / 1e6:.1f} MB used, "
+              f"{stats['bytes_on_disk'] / 1e6:.1f} MB on disk ({EMBEDDING_CACHE_DIR})")
+    else:
+        cache.clear()
+        print(f"Cleared {EMBEDDING_CACHE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Local embedding server: one model per host instead of one per process.
+
+    python -m agent.embedding_server                      # http://127.0.0.1:8765
+    EMBEDDING_SERVER_URL=http://127.0.0.1:8765 python main.py
+
+Concurrent /encode requests are coalesced into micro-batches: the first request
+opens a window of EMBEDDING_SERVER_MAX_WAIT_MS, and everything that arrives
+before it closes (up to EMBEDDING_SERVER_MAX_BATCH texts) is encoded in one
+model call.
+
+    POST /encode   {"texts": [...]} -> float32 rows (application/octet-stream),
+                   X-Embedding-Dimension header
+    GET  /health   model name, dimension and batching stats (JSON)
+
+Clients (agent.embeddings.get_model() with EMBEDDING_SERVER_URL set) fall back
+to an in-process model while the server is unreachable.
+"""
+import os
+import json
+import time
+import queue
+import argparse
+import threading
+import http.client
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+
+import numpy as np
+
+from agent.embeddings import EMBEDDING_SERVER_URL, load_local_model, local_model_name
+
+load_dotenv()
+
+DEFAULT_SERVER_URL = "http://127.0.0.1:8765"
+# Most texts encoded in one model call, and how long the first request waits for company
+EMBEDDING_SERVER_MAX_BATCH = int(os.getenv("EMBEDDING_SERVER_MAX_BATCH", "64"))
+EMBEDDING_SERVER_MAX_WAIT_MS = float(os.getenv("EMBEDDING_SERVER_MAX_WAIT_MS", "5"))
+# Client side: request timeout, and how long to encode locally after a failed request
+EMBEDDING_SERVER_TIMEOUT_S = float(os.getenv("EMBEDDING_SERVER_TIMEOUT_S", "10"))
+EMBEDDING_SERVER_RETRY_S = float(os.getenv("EMBEDDING_SERVER_RETRY_S", "30"))
+
+
+class MicroBatcher:
+    """Coalesces concurrent encode requests into batched model calls on one thread."""
+
+    def __init__(self, model, max_batch: int = EMBEDDING_SERVER_MAX_BATCH,
+                 max_wait_ms: float = EMBEDDING_SERVER_MAX_WAIT_MS):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_ms / 1000
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, texts: list) -> Future:
+        future = Future()
+        self._queue.put((texts, future))
+        return future
+
+    def _collect(self) -> list:
+        pending = [self._queue.get()]
+        size = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait_s
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            texts = [t for batch, _ in pending for t in batch]
+            try:
+                vectors = np.asarray(self.model.encode(texts), dtype="float32")
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            self.requests += len(pending)
+            self.batches += 1
+            self.texts += len(texts)
+            offset = 0
+            for batch, future in pending:
+                future.set_result(vectors[offset:offset + len(batch)])
+                offset += len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "texts": self.texts,
+            "mean_batch": round(self.texts / self.batches, 2) if self.batches else None,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait_s * 1000,
+        }
+
+
+class _EmbeddingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, one connection per client thread
+    # Headers and body go out in separate writes; without TCP_NODELAY each
+    # response waits out the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: dict):
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._send_json(404, {"error": "not found"})
+        server = self.server
+        self._send_json(200, {"model": server.model_name, "dimension": server.dimension, **server.batcher.stats()})
+
+    def do_POST(self):
+        if self.path != "/encode":
+            return self._send_json(404, {"error": "not found"})
+        try:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            texts = json.loads(body)["texts"]
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError("texts must be a list of strings")
+        except (ValueError, KeyError, TypeError) as e:
+            return self._send_json(400, {"error": str(e)})
+        if not texts:
+            vectors = np.zeros((0, self.server.dimension), dtype="float32")
+        else:
+            try:
+                vectors = self.server.batcher.submit(texts).result()
+            except Exception as e:
+                return self._send_json(500, {"error": str(e)})
+        self._send(200, vectors.tobytes(), "application/octet-stream",
+                   {"X-Embedding-Dimension": str(vectors.shape[1])})
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(host: str, port: int, model=None, model_name: str = None, **batcher_kwargs) -> ThreadingHTTPServer:
+    """Start the server on a daemon thread (the model is loaded first, once)."""
+    model = model if model is not None else load_local_model()
+    server = ThreadingHTTPServer((host, port), _EmbeddingHandler)
+    server.daemon_threads = True
+    server.batcher = MicroBatcher(model, **batcher_kwargs)
+    server.model_name = model_name or local_model_name()
+    server.dimension = int(np.asarray(model.encode(["probe"])).shape[1])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class EmbeddingClient:
+    """
+    SentenceTransformer-style encode() against the embedding server. While the
+    server is unreachable, or serves a different model, texts are encoded by an
+    in-process model loaded on first need.
+    """
+
+    def __init__(self, url: str, model_name: str, timeout_s: float = EMBEDDING_SERVER_TIMEOUT_S,
+                 retry_s: float = EMBEDDING_SERVER_RETRY_S):
+        parsed = urlsplit(url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.model_name = model_name
+        self.timeout_s = timeout_s
+        self.retry_s = retry_s
+        self.dimension = None
+        self._checked = False
+        self._down_until = 0.0
+        self._local = threading.local()
+        self._fallback = None
+        self._fallback_lock = threading.Lock()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout_s)
+        return conn
+
+    def _request(self, method: str, path: str, body: bytes = None):
+        conn = self._connection()
+        try:
+            conn.request(method, path, body=body, headers={"Content-Type": "application/json"} if body else {})
+            response = conn.getresponse()
+            data = response.read()
+        except Exception:
+            conn.close()
+            self._local.conn = None
+            raise
+        if response.status != 200:
+            raise http.client.HTTPException(f"{response.status}: {data[:200]!r}")
+        return response, data
+
+    def _check(self):
+        """First contact: the server must serve the model this process would load."""
+        _, data = self._request("GET", "/health")
+        health = json.loads(data)
+        if health["model"] != self.model_name:
+            raise ValueError(f"server serves {health['model']}, expected {self.model_name}")
+        self.dimension = health["dimension"]
+        self._checked = True
+
+    def _remote(self, texts: list) -> np.ndarray:
+        if not self._checked:
+            self._check()
+        response, data = self._request("POST", "/encode", json.dumps({"texts": texts}).encode("utf-8"))
+        dimension = int(response.getheader("X-Embedding-Dimension"))
+        return np.frombuffer(data, dtype="float32").reshape(len(texts), dimension)
+
+    def _local_model(self):
+        with self._fallback_lock:
+            if self._fallback is None:
+                self._fallback = load_local_model()
+        return self._fallback
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension or len(self.encode("probe"))
+
+    def _empty(self) -> np.ndarray:
+        """(0, dimension) result for an empty batch; asks the server for the dimension, never loads a model."""
+        if self.dimension is None and time.monotonic() >= self._down_until:
+            try:
+                self._check()
+            except (OSError, http.client.HTTPException, ValueError):
+                pass
+        return np.zeros((0, self.dimension or 0), dtype="float32")
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        if not batch:
+            return self._empty()
+        if time.monotonic() >= self._down_until:
+            try:
+                vectors = self._remote(batch)
+                return vectors[0] if single else vectors
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                print(f"⚠️ Embedding server at {self.host}:{self.port} unavailable ({e}); "
+                      f"encoding in-process for {self.retry_s:.0f}s.")
+                self._down_until = time.monotonic() + self.retry_s
+        return self._local_model().encode(texts, **kwargs)
+
+
+def main():
+    url = urlsplit(EMBEDDING_SERVER_URL or DEFAULT_SERVER_URL)
+    parser = argparse.ArgumentParser(description="Serve the embedding model to local processes.")
+    parser.add_argument("--host", default=url.hostname)
+    parser.add_argument("--port", type=int, default=url.port or 8765)
+    parser.add_argument("--max-batch", type=int, default=EMBEDDING_SERVER_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=EMBEDDING_SERVER_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    print(f"Embedding server for {server.model_name} (dimension {server.dimension}) "
+          f"on http://{args.host}:{args.port}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
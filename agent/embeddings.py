@@ -0,0 +1,133 @@
+import os
+from dotenv import load_dotenv
+
+import numpy as np
+
+from agent.embedding_cache import cache_key, get_embedding_cache
+from agent.onnx_embedder import default_export_dir, read_config
+from agent.vector_compression import get_transform
+
+load_dotenv()
+
+# Shared sentence-transformers model used for ingest, lookups and retrieval
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+# torch: SentenceTransformer on PyTorch
+# onnx: the model exported by `python -m agent.onnx_embedder export`, run on onnxruntime (no torch import)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR") or default_export_dir(EMBEDDING_MODEL_NAME)
+# int8 weights (default) or the fp32 export
+EMBEDDING_ONNX_QUANTIZED = os.getenv("EMBEDDING_ONNX_QUANTIZED", "true").lower() == "true"
+# onnxruntime intra-op threads; 0 = one per physical core
+EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+# Encode through `python -m agent.embedding_server` at this URL (e.g. http://127.0.0.1:8765)
+# instead of loading the model in every process; empty = in-process
+EMBEDDING_SERVER_URL = os.getenv("EMBEDDING_SERVER_URL", "")
+
+_model = None
+_model_name = EMBEDDING_MODEL_NAME
+
+
+def local_model_name() -> str:
+    """Name the EMBEDDING_BACKEND model's vectors are cached under."""
+    if EMBEDDING_BACKEND == "onnx":
+        # int8 vectors differ slightly from torch ones; keep them apart in the cache
+        return f"{EMBEDDING_MODEL_NAME}:onnx{'-int8' if EMBEDDING_ONNX_QUANTIZED else ''}"
+    return EMBEDDING_MODEL_NAME
+
+
+def load_local_model():
+    """A new in-process instance of the EMBEDDING_BACKEND model."""
+    if EMBEDDING_BACKEND == "onnx":
+        from agent.onnx_embedder import OnnxEmbedder
+        return OnnxEmbedder(EMBEDDING_ONNX_DIR, quantized=EMBEDDING_ONNX_QUANTIZED, threads=EMBEDDING_ONNX_THREADS)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)
+
+
+def get_model():
+    """
+    Load the embedding model once per process: a client of the embedding server
+    when EMBEDDING_SERVER_URL is set, else the EMBEDDING_BACKEND model.
+    """
+    global _model, _model_name
+    if _model is None:
+        _model_name = local_model_name()
+        if EMBEDDING_SERVER_URL:
+            from agent.embedding_server import EmbeddingClient
+            _model = EmbeddingClient(EMBEDDING_SERVER_URL, _model_name)
+        else:
+            _model = load_local_model()
+    return _model
+
+
+def embedding_dimension() -> int:
+    """Vector size of the configured model; an ONNX export answers from its config without loading."""
+    if _model is None and EMBEDDING_BACKEND == "onnx":
+        return read_config(EMBEDDING_ONNX_DIR)["dimension"]
+    model = get_model()
+    if hasattr(model, "get_sentence_embedding_dimension"):
+        return model.get_sentence_embedding_dimension()
+    return len(model.encode("probe"))
+
+
+def index_dimension(transform=None) -> int:
+    """Dimension of the vectors stored in the index: the vector transform's output, else the model's."""
+    transform = transform or get_transform()
+    return transform.output_dim if transform.method != "none" else embedding_dimension()
+
+
+def set_model(model, name: str = None):
+    """
+    Use `model` (anything with a SentenceTransformer-style encode()) for this process.
+    `name` keys its entries in the embedding cache (default: the class name).
+    """
+    global _model, _model_name
+    _model = model
+    _model_name = name or type(model).__name__
+
+
+def encode(texts, model=None):
+    """
+    Embed a string (-> 1-D float32 array) or a list of strings (-> 2-D float32 array).
+    With EMBEDDING_CACHE_ENABLED, cached texts skip the model.
+    """
+    model = model or get_model()
+    cache = get_embedding_cache()
+    if cache is None:
+        return model.encode(texts).astype("float32")
+
+    name = _model_name if model is _model else type(model).__name__
+    if isinstance(texts, str):
+        key = cache_key(name, texts)
+        vector = cache.get(key)
+        if vector is None:
+            vector = model.encode(texts).astype("float32")
+            cache.put(key, vector)
+        return vector
+
+    keys = [cache_key(name, t) for t in texts]
+    found = {}
+    for key in keys:
+        if key not in found:
+            vector = cache.get(key)
+            if vector is not None:
+                found[key] = vector
+    missing = list(dict.fromkeys((k, t) for k, t in zip(keys, texts) if k not in found))
+    if missing:
+        fresh = model.encode([t for _, t in missing]).astype("float32")
+        for (key, _), vector in zip(missing, fresh):
+            found[key] = vector
+            cache.put(key, vector)
+    if not keys:
+        return model.encode(texts).astype("float32")
+    return np.stack([found[k] for k in keys])
+
+
+def encode_for_index(texts, model=None, transform=None):
+    """
+    encode() followed by the vector transform the index was built with (default:
+    the active index's, see agent/vector_compression.py); use this for anything
+    upserted into or queried against the vector index.
+    """
+    transform = transform or get_transform()
+    return transform.reduce(encode(texts, model=model))
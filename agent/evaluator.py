@@ -0,0 +1,285 @@
+"""
+Batch evaluation of finished interviews.
+
+Streams sessions from the transcript store, scores each candidate on the rubric
+below with concurrent, rate-limited LLM calls, and writes one row per session to
+a SQLite table (agent/evaluations/evaluations.db). The table is also the
+checkpoint: rerunning skips sessions already scored with the current rubric, so
+an interrupted run resumes where it stopped.
+
+    python -m agent.evaluator run --since 2025-06-01 --workers 8 --rpm 120
+    python -m agent.evaluator export evaluations.csv
+"""
+import os
+import re
+import csv
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dotenv import load_dotenv
+
+from agent.job_config import JOB_ROLE, EXPERIENCE_AREA, SPECIFY_KEY_SKILLS
+from agent.transcript_store import TranscriptReader
+
+load_dotenv()
+
+EVAL_DB_PATH = os.getenv(
+    "EVAL_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "evaluations", "evaluations.db")
+)
+EVAL_MODEL_NAME = os.getenv("EVAL_MODEL_NAME") or os.getenv("GROQ_MODEL_NAME")
+# Provider limits to stay under (requests and prompt+completion tokens per minute; 0 = none)
+EVAL_RPM = int(os.getenv("EVAL_RPM", "60"))
+EVAL_TPM = int(os.getenv("EVAL_TPM", "0"))
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", "8"))
+# Long transcripts keep their beginning and end
+EVAL_MAX_TRANSCRIPT_CHARS = int(os.getenv("EVAL_MAX_TRANSCRIPT_CHARS", "12000"))
+# Sessions whose last turn is more recent than this may still be running
+EVAL_MIN_IDLE_S = float(os.getenv("EVAL_MIN_IDLE_S", "600"))
+MAX_RETRIES = 4
+
+RUBRIC = {
+    "communication": "Clarity, structure and conciseness of the candidate's answers.",
+    "skill_match": f"Overlap of the candidate's demonstrated skills with the role's key skills ({SPECIFY_KEY_SKILLS}).",
+    "technical_depth": "Depth and correctness of technical answers: design reasoning, trade-offs, concrete details.",
+}
+EVAL_PROMPT = """You are evaluating a screening interview for the {job_role} role ({experience_area}).
+Score the CANDIDATE (not the interviewer) from 1 (poor) to 5 (excellent) on each dimension:
+{rubric}
+Return ONLY a JSON object: {{"communication": <1-5>, "skill_match": <1-5>, "technical_depth": <1-5>, "summary": "<one sentence>"}}
+
+Transcript:
+{transcript}
+"""
+# Changes with the rubric or the prompt; sessions are re-scored under a new version
+RUBRIC_VERSION = hashlib.sha1((json.dumps(RUBRIC, sort_keys=True) + EVAL_PROMPT).encode("utf-8")).hexdigest()[:8]
+
+COLUMNS = ["session_id", "phone", "name", "interviewed_at", "turns",
+           *RUBRIC, "overall", "summary", "rubric_version", "model", "evaluated_at"]
+
+
+class RateLimiter:
+    """Blocking limiter for requests and tokens per minute, shared by all workers."""
+
+    def __init__(self, rpm: int = EVAL_RPM, tpm: int = EVAL_TPM):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._calls = []
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._calls = [(t, n) for t, n in self._calls if t > now - 60]
+                requests_ok = not self.rpm or len(self._calls) < self.rpm
+                tokens_ok = not self.tpm or not self._calls or sum(n for _, n in self._calls) + tokens <= self.tpm
+                if requests_ok and tokens_ok:
+                    self._calls.append((now, tokens))
+                    return
+                wait_s = self._calls[0][0] + 60 - now
+            time.sleep(min(max(wait_s, 0.01), 1.0))
+
+
+def format_transcript(turns: list, max_chars: int = EVAL_MAX_TRANSCRIPT_CHARS) -> str:
+    lines = [f"[{t.get('stage') or '-'}] {'INTERVIEWER' if t['speaker'] == 'ai' else 'CANDIDATE'}: {t['text']}"
+             for t in turns]
+    text = "\n".join(lines)
+    if len(text) > max_chars:
+        half = max_chars // 2
+        text = f"{text[:half]}\n[... transcript shortened ...]\n{text[-half:]}"
+    return text
+
+
+def parse_scores(content: str) -> dict:
+    """Rubric scores (clamped to 1-5) and summary from the model's reply; ValueError if unusable."""
+    match = re.search(r"{.*}", content, re.DOTALL)
+    if not match:
+        raise ValueError("no JSON object in evaluation reply")
+    parsed = json.loads(match.group(0))
+    scores = {}
+    for dimension in RUBRIC:
+        scores[dimension] = min(max(int(round(float(parsed[dimension]))), 1), 5)
+    scores["overall"] = round(sum(scores[d] for d in RUBRIC) / len(RUBRIC), 2)
+    scores["summary"] = str(parsed.get("summary", "")).strip()[:500]
+    return scores
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+class Evaluator:
+    """Scores sessions with `llm` (any LangChain chat model) under a shared rate limiter."""
+
+    def __init__(self, llm=None, limiter: RateLimiter = None):
+        if llm is None:
+            from langchain_groq import ChatGroq
+            llm = ChatGroq(temperature=0, groq_api_key=os.getenv("GROQ_API_KEY"), model_name=EVAL_MODEL_NAME)
+        self.llm = llm
+        self.limiter = limiter or RateLimiter()
+        self.model_name = getattr(llm, "model_name", None) or type(llm).__name__
+
+    def evaluate(self, session_id: str, turns: list) -> dict:
+        """One result row for a session; retries rate-limited calls with backoff."""
+        prompt = EVAL_PROMPT.format(
+            job_role=JOB_ROLE,
+            experience_area=EXPERIENCE_AREA,
+            rubric="\n".join(f"- {name}: {description}" for name, description in RUBRIC.items()),
+            transcript=format_transcript(turns),
+        )
+        for attempt in range(MAX_RETRIES + 1):
+            # ~4 characters per token, plus the short JSON reply
+            self.limiter.acquire(len(prompt) // 4 + 100)
+            try:
+                content = self.llm.invoke(prompt).content
+                break
+            except Exception as e:
+                if not _is_rate_limit(e) or attempt == MAX_RETRIES:
+                    raise
+                time.sleep(2 ** attempt)
+        scores = parse_scores(content)
+        first = turns[0]
+        return {
+            "session_id": session_id,
+            "phone": first.get("phone"),
+            "name": first.get("name"),
+            "interviewed_at": first.get("timestamp"),
+            "turns": len(turns),
+            **scores,
+            "rubric_version": RUBRIC_VERSION,
+            "model": self.model_name,
+            "evaluated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+
+def open_results(path: str = EVAL_DB_PATH) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    score_columns = ", ".join(f"{d} INTEGER" for d in RUBRIC)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS evaluations (
+            session_id TEXT PRIMARY KEY, phone TEXT, name TEXT, interviewed_at TEXT, turns INTEGER,
+            {score_columns}, overall REAL, summary TEXT, rubric_version TEXT, model TEXT, evaluated_at TEXT
+        )
+    """)
+    return conn
+
+
+def _done_sessions(conn: sqlite3.Connection) -> set:
+    rows = conn.execute("SELECT session_id FROM evaluations WHERE rubric_version = ?", (RUBRIC_VERSION,))
+    return {row[0] for row in rows}
+
+
+def _save(conn: sqlite3.Connection, rows: list):
+    placeholders = ", ".join("?" for _ in COLUMNS)
+    conn.executemany(
+        f"INSERT OR REPLACE INTO evaluations ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+        [[row[c] for c in COLUMNS] for row in rows]
+    )
+    conn.commit()
+
+
+def run_evaluations(evaluator: Evaluator, reader: TranscriptReader = None, db_path: str = EVAL_DB_PATH,
+                    workers: int = EVAL_WORKERS, since=None, until=None, candidate: str = None,
+                    limit: int = None, min_idle_s: float = EVAL_MIN_IDLE_S, commit_every: int = 50,
+                    quiet: bool = False) -> dict:
+    """
+    Evaluate every finished, not-yet-scored session. Sessions stream from the
+    store with at most 2 x `workers` in flight, and results are committed every
+    `commit_every` rows, so an interrupted run loses at most that many.
+    """
+    reader = reader or TranscriptReader()
+    conn = open_results(db_path)
+    done = _done_sessions(conn)
+    cutoff = (datetime.now() - timedelta(seconds=min_idle_s)).isoformat()
+    counts = {"evaluated": 0, "skipped": 0, "failed": 0}
+    pending_rows, in_flight = [], {}
+    start = time.perf_counter()
+
+    def collect(finished):
+        for future in finished:
+            session_id = in_flight.pop(future)
+            try:
+                pending_rows.append(future.result())
+                counts["evaluated"] += 1
+            except Exception as e:
+                counts["failed"] += 1
+                if not quiet:
+                    print(f"❗ {session_id}: {type(e).__name__}: {e}")
+        if len(pending_rows) >= commit_every:
+            _save(conn, pending_rows)
+            pending_rows.clear()
+
+    submitted = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for session_id, turns in reader.iter_sessions(candidate=candidate, since=since, until=until):
+            if session_id in done or not turns or (turns[-1].get("timestamp") or "") > cutoff:
+                counts["skipped"] += 1
+                continue
+            if limit and submitted >= limit:
+                break
+            in_flight[pool.submit(evaluator.evaluate, session_id, turns)] = session_id
+            submitted += 1
+            if len(in_flight) >= 2 * workers:
+                finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                collect(finished)
+        while in_flight:
+            finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            collect(finished)
+    if pending_rows:
+        _save(conn, pending_rows)
+    conn.close()
+
+    elapsed = time.perf_counter() - start
+    counts["elapsed_s"] = round(elapsed, 3)
+    counts["per_hour"] = round(counts["evaluated"] / elapsed * 3600, 1) if elapsed else None
+    return counts
+
+
+def export_csv(out_path: str, db_path: str = EVAL_DB_PATH) -> int:
+    """Write the evaluations table (best overall first) to CSV; returns the row count."""
+    conn = open_results(db_path)
+    rows = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM evaluations ORDER BY overall DESC, session_id").fetchall()
+    conn.close()
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score finished interviews per rubric dimension.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="Evaluate sessions not yet scored with the current rubric.")
+    run.add_argument("--since", help="ISO date/time, inclusive.")
+    run.add_argument("--until", help="ISO date/time, inclusive.")
+    run.add_argument("--candidate", help="Phone number or name.")
+    run.add_argument("--limit", type=int)
+    run.add_argument("--workers", type=int, default=EVAL_WORKERS)
+    run.add_argument("--rpm", type=int, default=EVAL_RPM, help="Requests per minute (0 = unlimited).")
+    run.add_argument("--tpm", type=int, default=EVAL_TPM, help="Tokens per minute (0 = unlimited).")
+    run.add_argument("--db", default=EVAL_DB_PATH)
+    export = sub.add_parser("export", help="Write the results table as CSV.")
+    export.add_argument("out")
+    export.add_argument("--db", default=EVAL_DB_PATH)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        evaluator = Evaluator(limiter=RateLimiter(args.rpm, args.tpm))
+        counts = run_evaluations(evaluator, db_path=args.db, workers=args.workers, since=args.since,
+                                 until=args.until, candidate=args.candidate, limit=args.limit)
+        print(f"Evaluated {counts['evaluated']}, skipped {counts['skipped']}, failed {counts['failed']} "
+              f"in {counts['elapsed_s']:.1f}s ({counts['per_hour']} per hour). Results: {args.db}")
+    elif args.command == "export":
+        print(f"Exported {export_csv(args.out, args.db)} evaluation(s) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
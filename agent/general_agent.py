@@ -1,6 +1,7 @@
 import os
 import sys
 from time import time
+from uuid import uuid4
 from dotenv import load_dotenv
 
 from langchain_groq import ChatGroq
@@ -9,20 +10,33 @@ from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_community.chat_message_histories import ChatMessageHistory
 from langchain_core.messages import HumanMessage, AIMessage
 
+from agent.intent_classifier import get_intent_classifier, CONTROL_INTENTS
+from agent.interview_plan import (
+    candidate_details,
+    hr_opening,
+    load_interview_plan,
+    matching_skills as find_matching_skills,
+)
+from agent.llm_cache import configure_llm_cache
+from agent.model_router import estimate_tokens, get_model_router
+from agent.semantic_cache import get_semantic_cache
+
 load_dotenv()
 
 # ----------------------------------------------------------------
 # CONFIGURATION
 # ----------------------------------------------------------------
 
-COMPANY_NAME = "Tech Innovators Inc."
-INTERVIEWER_NAME = "Sophia"
-
-JOB_ROLE = "Gen AI Engineer"
-EXPERIENCE_YEARS_REQUIRED = 0
-EXPERIENCE_AREA = "Machine learning and Agent Engineering"
-JOB_LOCATION = "Hyderabad"
-SPECIFY_KEY_SKILLS = "Python, LLMs, and Agent Engineering, langchain, and Groq"
+# Job constants live in agent/job_config.py so the job ranker shares them
+from agent.job_config import (
+    COMPANY_NAME,
+    INTERVIEWER_NAME,
+    JOB_ROLE,
+    EXPERIENCE_YEARS_REQUIRED,
+    EXPERIENCE_AREA,
+    JOB_LOCATION,
+    SPECIFY_KEY_SKILLS,
+)
 
 # ----------------------------------------------------------------
 # LLM INITIALIZATION
@@ -34,6 +48,9 @@ llm = ChatGroq(
     model_name=os.getenv("GROQ_MODEL_NAME")
 )
 
+# Optional local response cache (LLM_RESPONSE_CACHE); no-op when unset
+configure_llm_cache()
+
 # In‐memory store of chat histories
 session_store = {}
 
@@ -55,7 +72,7 @@ Your goal is to lead a friendly, natural, and structured conversation based on t
 **GENERAL INSTRUCTIONS**
 - Stay conversational and concise—this is a live phone call.
 - Do not invent any facts. If you’re unsure, ask the candidate to clarify.
-- Base all statements on these runtime variables: {{candidate_name}}, {JOB_ROLE}, {EXPERIENCE_YEARS_REQUIRED}, {EXPERIENCE_AREA}, {SPECIFY_KEY_SKILLS}, {JOB_LOCATION}.
+- Base all statements on the candidate context below and these job details: {JOB_ROLE}, {EXPERIENCE_YEARS_REQUIRED}, {EXPERIENCE_AREA}, {SPECIFY_KEY_SKILLS}, {JOB_LOCATION}.
 - Don’t repeat yourself or restate the obvious.
 - Keep the conversation focused on the candidate’s fit for the {JOB_ROLE} role.
 - Use the candidate’s first name naturally throughout the conversation whenever required.
@@ -71,7 +88,7 @@ Your goal is to lead a friendly, natural, and structured conversation based on t
 
 1. **Greeting & Identity Confirmation**
    - Use time-sensitive greetings based on seniority (e.g., "Good morning" for senior roles, "Hello" otherwise).
-   - Ask something like : “Am I speaking with {{candidate_name}}?”
+   - Ask something like : “Am I speaking with <candidate name>?”
      - If wrong number/shared phone:
        - Say something like:  “I was looking to speak with someone who applied to {COMPANY_NAME}. Thanks for your time.”
        - End call gracefully.
@@ -136,7 +153,7 @@ Your goal is to lead a friendly, natural, and structured conversation based on t
      - “Which tools or platforms did you use there?”
 
 10. **Wrap-Up**
-   - Thank them something like: “Thanks for your time, {{candidate_name}}.”
+   - Thank them something like: “Thanks for your time, <candidate first name>.”
    - Close something like: “I’ll share this conversation with our hiring team and we’ll follow up soon. Have a great day!”
 
 ---
@@ -152,8 +169,21 @@ Your goal is to lead a friendly, natural, and structured conversation based on t
 - Keep responses crisp and respectful, as in a real phone call.
 """
 
+# Everything candidate-specific lives in this second system message, so the
+# multi-kilobyte RAW_SYSTEM_PROMPT above is a byte-identical prefix for every
+# call of every session (provider prompt caches key on exact prefixes), and
+# this segment stays fixed for the length of one interview.
+CANDIDATE_CONTEXT_PROMPT = """**CANDIDATE CONTEXT**
+- Candidate name: {candidate_name}
+{details}
+
+**SKILL DISCUSSION OPENER**
+{matching_skills_prompt}
+"""
+
 PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
     ("system", RAW_SYSTEM_PROMPT),
+    ("system", CANDIDATE_CONTEXT_PROMPT),
     MessagesPlaceholder(variable_name="chat_history"),
     ("human", "{input}")
 ])
@@ -162,108 +192,120 @@ PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
 # STEP 2: The interactive loop for general HR questions
 # ----------------------------------------------------------------
 
-def run_general_hr_interview(phone: str, metadata: dict) -> str:
+def run_general_hr_interview(phone: str, metadata: dict, on_turn=None, input_fn=input) -> str:
     """
     Conducts the general HR interview. Returns:
     - session_id (string) if the interview completed normally.
     - None if the candidate declines or exits at any point.
+    on_turn(speaker, text) is called for every candidate and AI turn as it happens.
+    input_fn(prompt) supplies the candidate's answers (scripted runs replace input()).
     """
-    session_id = f"hr_{phone}_{int(time())}"
+    on_turn = on_turn or (lambda speaker, text: None)
+    session_id = f"hr_{phone}_{int(time())}_{uuid4().hex[:8]}"
     history = get_session_history(session_id)
 
-    # Build {details} string from metadata
-    summary_fields = []
-    if metadata.get("name"):
-        summary_fields.append(f"Name: {metadata['name']}")
-    if metadata.get("education"):
-        summary_fields.append(f"Education: {metadata['education']}")
-    if metadata.get("skills"):
-        summary_fields.append(f"Skills: {', '.join(metadata['skills'])}")
-    if metadata.get("experience_years") is not None:
-        summary_fields.append(f"Experience (years): {metadata['experience_years']}")
-    if metadata.get("current_role"):
-        summary_fields.append(f"Current Role: {metadata['current_role']}")
-    details_str = "\n".join(summary_fields)
-
+    # Candidate summary, matching skills and opener come from the interview plan
+    # precomputed at ingest (or built from templates now); without a plan they
+    # are derived from metadata and the opener comes from the LLM
+    plan = load_interview_plan(metadata)
+    details_str = plan["details"] if plan else candidate_details(metadata)
     candidate_name = metadata.get("name", "Candidate")
-
-    # Compute matching skills dynamically from metadata
-    candidate_skills = metadata.get("skills", [])
-    matching_skills = [skill.strip() for skill in SPECIFY_KEY_SKILLS.split(',') if skill.strip() in candidate_skills]
+    matching_skills = plan["matching_skills"] if plan else find_matching_skills(metadata)
     matching_skills_str = ", ".join(matching_skills) if matching_skills else "these technologies"
 
-    # Build runnable chain
-    chain = PROMPT_TEMPLATE | llm
-    runnable = RunnableWithMessageHistory(
-        chain,
-        get_session_history,
-        input_messages_key="input",
-        history_messages_key="chat_history"
-    )
+    # Per-session prompt variables; identical on every turn of this interview
+    session_inputs = {
+        "company": COMPANY_NAME,
+        "name": INTERVIEWER_NAME,
+        "details": details_str,
+        "candidate_name": candidate_name,
+        "job_role": JOB_ROLE,
+        "experience_years_required": EXPERIENCE_YEARS_REQUIRED,
+        "experience_area": EXPERIENCE_AREA,
+        "matching_skills_prompt": (
+            f"- I notice you've worked with {matching_skills_str} - could you tell me about your experience with that?"
+            if matching_skills else
+            "- How familiar are you with these technologies?"
+        ),
+    }
+
+    def build_runnable(model):
+        """The HR chain on `model` (chosen per turn by the model router)."""
+        return RunnableWithMessageHistory(
+            PROMPT_TEMPLATE | model,
+            get_session_history,
+            input_messages_key="input",
+            history_messages_key="chat_history"
+        )
+
+    model_router = get_model_router()
+    semantic_cache = get_semantic_cache()
+    intent_classifier = get_intent_classifier()
 
     print("\n===== GENERAL HR INTERVIEW (STEP 2: Q&A) =====\n")
 
     questions_asked = 0
     while True:
-        if questions_asked == 0:
-            ai_response = runnable.invoke(
-                {
-                    "company": COMPANY_NAME,
-                    "name": INTERVIEWER_NAME,
-                    "details": details_str,
-                    "candidate_name": candidate_name,
-                    "job_role": JOB_ROLE,
-                    "experience_years_required": EXPERIENCE_YEARS_REQUIRED,
-                    "experience_area": EXPERIENCE_AREA,
-                    "matching_skills_prompt": (
-                        f"- I notice you've worked with {matching_skills_str} - could you tell me about your experience with that?"
-                        if matching_skills else
-                        "- How familiar are you with these technologies?"
-                    ),
-                    "input": ""
-                },
-                config={"configurable": {"session_id": session_id}}
+        if questions_asked == 0 and plan:
+            ai_response = AIMessage(content=hr_opening(plan, metadata.get("experience_years")))
+        elif questions_asked == 0:
+            ai_response = model_router.invoke(
+                "greeting",
+                "llm.hr",
+                build_runnable,
+                {**session_inputs, "input": ""},
+                config={"configurable": {"session_id": session_id}},
+                default=llm,
+                prompt_tokens=estimate_tokens(RAW_SYSTEM_PROMPT, details_str)
             )
         else:
-            user_input = input("Candidate: ").strip()
+            user_input = input_fn("Candidate: ").strip()
             if not user_input:
                 continue
+            on_turn("human", user_input)
 
-            # If candidate explicitly declines or isn’t looking:
-            if user_input.lower() in ["no", "not", "busy", "exit", "quit","bye"]:
+            # If candidate explicitly declines, isn’t looking or wants to stop.
+            # A plain "no" answering a question is on-topic and goes to the LLM.
+            intent = intent_classifier.classify(user_input)
+            if intent.label in CONTROL_INTENTS:
                 print("AI: Thank you for your time.")
+                on_turn("ai", "Thank you for your time.")
                 return None  # Signal early exit
 
             history.add_message(HumanMessage(content=user_input))
-            ai_response = runnable.invoke(
-                {
-                    "company": COMPANY_NAME,
-                    "name": INTERVIEWER_NAME,
-                    "details": details_str,
-                    "candidate_name": candidate_name,
-                    "job_role": JOB_ROLE,
-                    "experience_years_required": EXPERIENCE_YEARS_REQUIRED,
-                    "experience_area": EXPERIENCE_AREA,
-                    "matching_skills_prompt": (
-                        f"- I notice you've worked with {matching_skills_str} - could you tell me about your experience with that?"
-                        if matching_skills else
-                        "- How familiar are you with these technologies?"
-                    ),
-                    "input": user_input
-                },
-                config={"configurable": {"session_id": session_id}}
-            )
+
+            # Scripted small talk (salary, relocation, work mode) can be answered
+            # from a template without an LLM round-trip when the cache is enabled
+            cached_answer = semantic_cache.lookup(
+                user_input, candidate_name, session_id=session_id, phone=phone
+            ) if semantic_cache and intent.label == "question" else None
+            if cached_answer:
+                ai_response = AIMessage(content=cached_answer)
+            else:
+                # Screening turns are short; the router escalates long conversations
+                ai_response = model_router.invoke(
+                    "followup",
+                    "llm.hr",
+                    build_runnable,
+                    {**session_inputs, "input": user_input},
+                    config={"configurable": {"session_id": session_id}},
+                    default=llm,
+                    prompt_tokens=estimate_tokens(
+                        RAW_SYSTEM_PROMPT, details_str, *(m.content for m in history.messages)
+                    )
+                )
 
         ai_text = ai_response.content.strip()
         print(f"\nAI: {ai_text}\n")
+        on_turn("ai", ai_text)
         history.add_message(AIMessage(content=ai_text))
 
         # If AI explicitly ends the interview, stop
         if "GENERAL INTERVIEW COMPLETE" in ai_text:
             return session_id
 
-        # Only count if AI’s last line ends with “?”
-        if ai_text.endswith("?"):
+        # Only count turns where the AI actually asked the candidate something
+        if intent_classifier.asks_question(ai_text):
             questions_asked += 1
 
             # End after a certain number of questions, e.g., 5
@@ -0,0 +1,152 @@
+import sys
+import argparse
+
+from agent.embeddings import encode_for_index
+from agent.index_alias import active_lexical_path
+from agent.lexical_index import BM25Index
+
+# Constant from the original RRF paper; dampens the weight of the very top ranks
+RRF_K = 60
+
+_lexical_index = None
+_lexical_path = None
+
+
+def get_lexical_index() -> BM25Index:
+    """
+    Load the BM25 index written by ingest.py once per process, and again when
+    the active index alias moves to one built with a different vector index.
+    """
+    global _lexical_index, _lexical_path
+    path = active_lexical_path()
+    if _lexical_index is None or path != _lexical_path:
+        _lexical_index = BM25Index.load(path)
+        _lexical_path = path
+    return _lexical_index
+
+
+def get_vector_index():
+    """The dense index used by data_loader, or None when running on Postgres."""
+    from agent import data_loader
+    return data_loader.get_index() if data_loader.USE_PINECONE else None
+
+
+def reciprocal_rank_fusion(rankings, k: int = RRF_K, weights=None) -> list:
+    """
+    Fuse several ranked id lists: score(d) = sum_i w_i / (k + rank_i(d)).
+    Returns [(id, fused_score), ...] sorted by descending score.
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda x: x[1], reverse=True)
+
+
+def hybrid_search(query: str, top_k: int = 10, candidate_id: str = None,
+                  index=None, lexical=None, dense_k: int = 50, lexical_k: int = 50) -> list:
+    """
+    Retrieve resume chunks matching `query` from both the dense vector index and
+    the BM25 index, fused with reciprocal rank fusion.
+    Either side may be missing; the other still returns results.
+    Returns a list of dicts: id, candidate_id, text, score, dense_rank, lexical_rank.
+    """
+    index = index if index is not None else get_vector_index()
+    lexical = lexical if lexical is not None else get_lexical_index()
+
+    chunks = {}
+    dense_ids = []
+    if index is not None:
+        flt = {"is_phone_entry": {"$eq": "false"}}
+        if candidate_id:
+            flt["candidate_id"] = {"$eq": candidate_id}
+        try:
+            result = index.query(
+                vector=encode_for_index(query).tolist(),
+                top_k=dense_k,
+                include_metadata=True,
+                filter=flt
+            )
+            for m in result.matches:
+                meta = m.metadata or {}
+                dense_ids.append(m.id)
+                chunks[m.id] = {"candidate_id": meta.get("candidate_id"), "text": meta.get("text", ""), "metadata": meta}
+        except Exception as e:
+            print(f"Error querying vector index: {e}")
+
+    lexical_ids = []
+    for doc_id, _ in lexical.search(query, top_k=lexical_k, candidate_id=candidate_id):
+        lexical_ids.append(doc_id)
+        if doc_id not in chunks:
+            doc = lexical.docs[doc_id]
+            chunks[doc_id] = {"candidate_id": doc["candidate_id"], "text": doc["text"], "metadata": doc.get("metadata", {})}
+
+    dense_rank = {doc_id: r for r, doc_id in enumerate(dense_ids, start=1)}
+    lexical_rank = {doc_id: r for r, doc_id in enumerate(lexical_ids, start=1)}
+
+    results = []
+    for doc_id, score in reciprocal_rank_fusion([dense_ids, lexical_ids])[:top_k]:
+        chunk = chunks[doc_id]
+        results.append({
+            "id": doc_id,
+            "candidate_id": chunk["candidate_id"],
+            "text": chunk["text"],
+            "metadata": chunk["metadata"],
+            "score": score,
+            "dense_rank": dense_rank.get(doc_id),
+            "lexical_rank": lexical_rank.get(doc_id),
+        })
+    return results
+
+
+def search_candidates(query: str, top_k: int = 10, **kwargs) -> list:
+    """
+    Candidate-level hybrid search: chunk hits are grouped by candidate and each
+    candidate keeps its best fused score.
+    """
+    hits = hybrid_search(query, top_k=max(top_k * 5, 50), **kwargs)
+    candidates = {}
+    for hit in hits:
+        cid = hit["candidate_id"]
+        if cid is None:
+            continue
+        entry = candidates.get(cid)
+        if entry is None:
+            meta = hit["metadata"]
+            candidates[cid] = {
+                "candidate_id": cid,
+                "name": meta.get("name"),
+                "phone": meta.get("phone"),
+                "score": hit["score"],
+                "snippets": [hit["text"]],
+            }
+        else:
+            entry["score"] = max(entry["score"], hit["score"])
+            entry["snippets"].append(hit["text"])
+    return sorted(candidates.values(), key=lambda c: c["score"], reverse=True)[:top_k]
+
+
+def retrieve_resume_context(candidate_id: str, query: str, top_k: int = 3) -> str:
+    """The candidate's resume chunks most relevant to `query`, joined for a prompt."""
+    hits = hybrid_search(query, top_k=top_k, candidate_id=candidate_id)
+    return "\n".join(hit["text"] for hit in hits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hybrid (BM25 + vector) search over ingested resumes.")
+    parser.add_argument("query")
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    results = search_candidates(args.query, top_k=args.top_k)
+    if not results:
+        print("No matching candidates found.")
+        sys.exit(0)
+    for rank, cand in enumerate(results, start=1):
+        print(f"{rank}. {cand['name'] or cand['candidate_id']} ({cand['phone'] or 'no phone'}) score={cand['score']:.4f}")
+        print(f"   {cand['snippets'][0][:160].replace(chr(10), ' ')}")
+
+
+if __name__ == "__main__":
+    main()
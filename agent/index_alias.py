@@ -0,0 +1,136 @@
+"""
+Active vector index alias for blue/green rebuilds.
+
+Pinecone has no index aliases, so the name of the live index (and the BM25
+index built with it) is kept in a small JSON file that data_loader, hybrid
+search and ingest resolve on use:
+
+    {"active": {"index": "resumes-index-20250601120000", "lexical_path": "...", ...},
+     "history": [<previously active entries, most recent last>]}
+
+Without the file everything uses PINECONE_INDEX_NAME and LEXICAL_INDEX_PATH as
+before. The file is replaced atomically, so readers see the old or the new
+entry, never a mix.
+"""
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from dotenv import load_dotenv
+
+from agent.lexical_index import LEXICAL_INDEX_PATH
+
+load_dotenv()
+
+PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "resumes-index")
+ACTIVE_INDEX_PATH = os.getenv(
+    "ACTIVE_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "index_data", "active_index.json")
+)
+
+_lock = threading.Lock()
+_cached = (None, {})  # ((path, inode, mtime), parsed file)
+
+
+def read_alias(path: str = ACTIVE_INDEX_PATH) -> dict:
+    """The alias file, re-read only when it changes; {} when absent."""
+    global _cached
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {}
+    # os.replace gives the new file a new inode, even within one mtime tick
+    key = (path, st.st_ino, st.st_mtime_ns)
+    with _lock:
+        if _cached[0] != key:
+            with open(path, "r", encoding="utf-8") as f:
+                _cached = (key, json.load(f))
+        return _cached[1]
+
+
+def active_entry(path: str = ACTIVE_INDEX_PATH) -> dict:
+    return read_alias(path).get("active") or {}
+
+
+def active_index_name(path: str = ACTIVE_INDEX_PATH) -> str:
+    return active_entry(path).get("index") or PINECONE_INDEX_NAME
+
+
+def active_lexical_path(path: str = ACTIVE_INDEX_PATH) -> str:
+    return active_entry(path).get("lexical_path") or LEXICAL_INDEX_PATH
+
+
+def _write(data: dict, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def switch(entry: dict, path: str = ACTIVE_INDEX_PATH) -> dict:
+    """Make `entry` the active index; the current one moves to the history for rollback."""
+    data = dict(read_alias(path))
+    history = list(data.get("history", []))
+    if data.get("active"):
+        history.append(data["active"])
+    entry = {**entry, "activated_at": datetime.now().isoformat(timespec="seconds")}
+    _write({**data, "active": entry, "history": history}, path)
+    return entry
+
+
+def rollback(path: str = ACTIVE_INDEX_PATH) -> dict:
+    """Re-activate the most recent previous index; the current one is kept in `rolled_back`."""
+    data = dict(read_alias(path))
+    history = list(data.get("history", []))
+    if not history:
+        raise ValueError("No previous index to roll back to.")
+    previous = history.pop()
+    rolled_back = list(data.get("rolled_back", []))
+    if data.get("active"):
+        rolled_back.append(data["active"])
+    previous = {**previous, "activated_at": datetime.now().isoformat(timespec="seconds")}
+    _write({**data, "active": previous, "history": history, "rolled_back": rolled_back}, path)
+    return previous
+
+
+def trim_history(keep: int, path: str = ACTIVE_INDEX_PATH) -> list:
+    """Keep the `keep` most recent previous entries; returns the dropped ones (oldest first)."""
+    data = dict(read_alias(path))
+    history = list(data.get("history", []))
+    cut = max(len(history) - keep, 0)
+    if cut:
+        _write({**data, "history": history[cut:]}, path)
+    return history[:cut]
+
+
+def clear(path: str = ACTIVE_INDEX_PATH):
+    """Drop the alias so PINECONE_INDEX_NAME is used again."""
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def wait_until_ready(pc, name: str, timeout_s: float = 600, poll_s: float = 2.0) -> float:
+    """Poll describe_index until the index reports ready; returns the seconds waited."""
+    start = time.monotonic()
+    while True:
+        status = pc.describe_index(name).status
+        if status["ready"]:
+            return time.monotonic() - start
+        if time.monotonic() - start > timeout_s:
+            raise TimeoutError(f"Index '{name}' not ready after {timeout_s:.0f}s")
+        time.sleep(poll_s)
+
+
+def wait_for_vector_count(index, expected: int, timeout_s: float = 300, poll_s: float = 2.0) -> int:
+    """
+    Poll describe_index_stats until `expected` vectors are visible (upserts are
+    eventually consistent); returns the last count seen, which may fall short on timeout.
+    """
+    start = time.monotonic()
+    while True:
+        count = index.describe_index_stats()["total_vector_count"]
+        if count >= expected or time.monotonic() - start > timeout_s:
+            return count
+        time.sleep(poll_s)
@@ -0,0 +1,346 @@
+"""
+Columnar snapshots of the vector index, reloadable without the parser or the model.
+
+    python -m agent.index_snapshot export agent/snapshots/latest
+    python -m agent.index_snapshot import agent/snapshots/latest --index resumes-index-restore --activate
+
+A snapshot directory holds:
+    snapshot.json          dimension, row count, embedding model, vector transform, format and part files
+    vectors-00000.arrow    id, candidate_id, chunk_id, is_phone_entry, text, extra, vector
+    candidates.arrow       candidate_id, metadata: the parsed-resume fields, once per candidate
+
+Every chunk and phone vector repeats the whole parsed resume in its metadata;
+the snapshot keeps it once per candidate and re-attaches it on import. Arrow IPC
+parts (the default) are memory-mapped when read; `--format parquet` writes
+compressed Parquet instead, which is smaller to move around. Needs pyarrow.
+"""
+import os
+import json
+import time
+import hashlib
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from agent.local_index import LocalIndex
+from agent.upsert_pool import UpsertPool
+
+SNAPSHOT_MANIFEST = "snapshot.json"
+SNAPSHOT_VERSION = 1
+# Metadata stored in their own columns; everything else is candidate-level
+ROW_KEYS = ("candidate_id", "chunk_id", "text", "is_phone_entry")
+# Per-row metadata that is not shared by the candidate's other vectors
+ROW_ONLY_KEYS = ("interview_plan",)
+BATCH_ROWS = 10000
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Index snapshots need pyarrow (pip install pyarrow).") from e
+    return pa, ipc, pq
+
+
+def _fetched(response) -> dict:
+    """id -> vector from a fetch() response (Pinecone's FetchResponse or LocalIndex's dict)."""
+    return response.vectors if hasattr(response, "vectors") else response["vectors"]
+
+
+class _PartWriter:
+    """Appends record batches to numbered part files; a new file starts once one holds `rows_per_part` rows."""
+
+    def __init__(self, out_dir: str, stem: str, fmt: str, rows_per_part: int = None):
+        self.pa, self.ipc, self.pq = _arrow()
+        self.out_dir, self.stem, self.fmt = out_dir, stem, fmt
+        self.rows_per_part = rows_per_part
+        self.parts = []
+        self._writer = None
+        self._part_rows = 0
+
+    def _open(self, schema):
+        suffix = f"-{len(self.parts):05d}" if self.rows_per_part else ""
+        name = f"{self.stem}{suffix}.{'parquet' if self.fmt == 'parquet' else 'arrow'}"
+        path = os.path.join(self.out_dir, name)
+        self._writer = (self.pq.ParquetWriter(path, schema, compression="zstd") if self.fmt == "parquet"
+                        else self.ipc.new_file(path, schema))
+        self.parts.append(name)
+        self._part_rows = 0
+
+    def write(self, batch):
+        if self._writer is None or (self.rows_per_part and self._part_rows >= self.rows_per_part):
+            self.close()
+            self._open(batch.schema)
+        if self.fmt == "parquet":
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write(batch)
+        self._part_rows += batch.num_rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def split_metadata(metadata: dict):
+    """(row columns, candidate-level fields, row-only extras) of one vector's metadata."""
+    metadata = dict(metadata or {})
+    row = {k: metadata.pop(k, None) for k in ROW_KEYS}
+    extra = {k: metadata.pop(k) for k in ROW_ONLY_KEYS if k in metadata}
+    return row, metadata, extra
+
+
+def export_snapshot(index, out_dir: str, fmt: str = "arrow", page_size: int = 100,
+                    rows_per_part: int = 1_000_000, model_name: str = None) -> dict:
+    """Write every vector of `index` (Pinecone or LocalIndex) to a snapshot directory."""
+    pa, _, _ = _arrow()
+    os.makedirs(out_dir, exist_ok=True)
+    vectors_out = _PartWriter(out_dir, "vectors", fmt, rows_per_part)
+    candidates_out = _PartWriter(out_dir, "candidates", fmt)
+    # candidate_id -> digest of its stored fields; a vector whose fields differ keeps them as extras
+    seen = {}
+    columns = {k: [] for k in ("id", "candidate_id", "chunk_id", "is_phone_entry", "text", "extra")}
+    rows, candidate_rows, dimension, normalized = [], {"candidate_id": [], "metadata": []}, None, True
+    count = 0
+    transforms = set()  # vector_transform versions (agent/vector_compression.py) seen
+
+    def flush():
+        nonlocal rows, normalized
+        if not rows:
+            return
+        matrix = np.asarray(rows, dtype="float32")
+        normalized &= bool(np.allclose(np.linalg.norm(matrix, axis=1), 1.0, atol=1e-3))
+        vector = pa.FixedSizeListArray.from_arrays(pa.array(matrix.ravel()), dimension)
+        vectors_out.write(pa.record_batch([pa.array(columns[k]) for k in columns] + [vector],
+                                          names=list(columns) + ["vector"]))
+        for values in columns.values():
+            values.clear()
+        rows = []
+        if candidate_rows["candidate_id"]:
+            candidates_out.write(pa.record_batch([pa.array(v, pa.string()) for v in candidate_rows.values()],
+                                                 names=list(candidate_rows)))
+            for values in candidate_rows.values():
+                values.clear()
+
+    for page in index.list(limit=page_size):
+        for vid, vector in _fetched(index.fetch(ids=list(page))).items():
+            values = vector.values
+            dimension = dimension or len(values)
+            transforms.add((vector.metadata or {}).get("vector_transform", "none"))
+            row, fields, extra = split_metadata(vector.metadata)
+            candidate_id = row["candidate_id"]
+            if candidate_id is not None:
+                encoded = json.dumps(fields, sort_keys=True)
+                digest = hashlib.blake2b(encoded.encode("utf-8"), digest_size=8).digest()
+                if candidate_id not in seen:
+                    seen[candidate_id] = digest
+                    candidate_rows["candidate_id"].append(candidate_id)
+                    candidate_rows["metadata"].append(encoded)
+                elif seen[candidate_id] != digest:
+                    extra.update(fields)
+            else:
+                extra.update(fields)
+            columns["id"].append(vid)
+            columns["candidate_id"].append(candidate_id)
+            columns["chunk_id"].append(int(row["chunk_id"]) if row["chunk_id"] is not None else None)
+            columns["is_phone_entry"].append(None if row["is_phone_entry"] is None
+                                             else row["is_phone_entry"] == "true")
+            columns["text"].append(row["text"])
+            columns["extra"].append(json.dumps(extra) if extra else None)
+            rows.append(values)
+            count += 1
+            if len(rows) >= BATCH_ROWS:
+                flush()
+    flush()
+    vectors_out.close()
+    candidates_out.close()
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "format": fmt,
+        "dimension": dimension,
+        "count": count,
+        "candidates": len(seen),
+        "normalized": normalized,
+        "model": model_name,
+        "vector_transform": transforms.pop() if len(transforms) == 1 else ("mixed" if transforms else "none"),
+        "parts": vectors_out.parts,
+        "candidate_parts": candidates_out.parts,
+    }
+    with open(os.path.join(out_dir, SNAPSHOT_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(snapshot_dir: str) -> dict:
+    with open(os.path.join(snapshot_dir, SNAPSHOT_MANIFEST), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {manifest.get('version')} in {snapshot_dir}")
+    return manifest
+
+
+def _read_table(path: str):
+    """A part file as an Arrow table; IPC files are memory-mapped rather than read."""
+    pa, ipc, pq = _arrow()
+    if path.endswith(".parquet"):
+        return pq.read_table(path)
+    return ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def _candidates(snapshot_dir: str, manifest: dict) -> dict:
+    fields = {}
+    for name in manifest["candidate_parts"]:
+        table = _read_table(os.path.join(snapshot_dir, name))
+        fields.update(zip(table.column("candidate_id").to_pylist(), table.column("metadata").to_pylist()))
+    return fields
+
+
+def iter_snapshot(snapshot_dir: str):
+    """Yields (ids, float32 vector matrix, metadata dicts) per record batch, metadata as at export."""
+    manifest = read_manifest(snapshot_dir)
+    candidates = _candidates(snapshot_dir, manifest)
+    parsed = {}
+    dimension = manifest["dimension"]
+    for name in manifest["parts"]:
+        for batch in _read_table(os.path.join(snapshot_dir, name)).to_batches():
+            cols = {k: batch.column(k).to_pylist() for k in ("id", "candidate_id", "chunk_id",
+                                                               "is_phone_entry", "text", "extra")}
+            # Zero-copy view of the mapped vector buffer
+            vectors = batch.column("vector").flatten().to_numpy(zero_copy_only=False).reshape(-1, dimension)
+            metadata = []
+            for i, candidate_id in enumerate(cols["candidate_id"]):
+                if candidate_id is not None and candidate_id not in parsed:
+                    parsed[candidate_id] = json.loads(candidates.get(candidate_id) or "{}")
+                meta = dict(parsed.get(candidate_id, {}))
+                meta.update({k: v for k, v in (
+                    ("candidate_id", candidate_id),
+                    ("chunk_id", None if cols["chunk_id"][i] is None else str(cols["chunk_id"][i])),
+                    ("text", cols["text"][i]),
+                    ("is_phone_entry", None if cols["is_phone_entry"][i] is None
+                     else ("true" if cols["is_phone_entry"][i] else "false")),
+                ) if v is not None})
+                if cols["extra"][i]:
+                    meta.update(json.loads(cols["extra"][i]))
+                metadata.append(meta)
+            yield cols["id"], vectors, metadata
+
+
+def load_local_index(snapshot_dir: str) -> LocalIndex:
+    """A LocalIndex straight from a snapshot: one matrix copy, no per-vector upserts."""
+    manifest = read_manifest(snapshot_dir)
+    ids, blocks, metadata = [], [], []
+    for batch_ids, vectors, batch_metadata in iter_snapshot(snapshot_dir):
+        ids += batch_ids
+        blocks.append(vectors)
+        metadata += batch_metadata
+    matrix = np.concatenate(blocks) if blocks else np.zeros((0, manifest["dimension"]), dtype="float32")
+    return LocalIndex.from_arrays(ids, matrix, metadata, normalized=manifest["normalized"])
+
+
+def import_snapshot(index, snapshot_dir: str, batch_size: int = 200, workers: int = 8) -> dict:
+    """Upsert a snapshot into `index` with up to `workers` requests in flight."""
+    start = time.perf_counter()
+    upserted = 0
+    # Bounded in-flight work keeps memory flat for snapshots of any size
+    with UpsertPool(index, workers=workers) as pool:
+        for ids, vectors, metadata in iter_snapshot(snapshot_dir):
+            for lo in range(0, len(ids), batch_size):
+                batch = [
+                    {"id": ids[i], "values": vectors[i].tolist(), "metadata": metadata[i]}
+                    for i in range(lo, min(lo + batch_size, len(ids)))
+                ]
+                pool.upsert(vectors=batch)
+                upserted += len(batch)
+        failures = pool.drain()
+    if failures:
+        raise next(iter(failures.values()))
+    elapsed = time.perf_counter() - start
+    return {"upserted": upserted, "elapsed_s": round(elapsed, 2),
+            "vectors_per_s": round(upserted / elapsed, 1) if elapsed else None}
+
+
+def lexical_from_snapshot(snapshot_dir: str):
+    """The BM25 index of a snapshot's resume chunks (same ids as the vectors)."""
+    from agent.lexical_index import BM25Index
+
+    lexical = BM25Index()
+    for ids, _, metadata in iter_snapshot(snapshot_dir):
+        for vid, meta in zip(ids, metadata):
+            if meta.get("is_phone_entry") == "false":
+                lexical.add(vid, meta.get("text", ""), meta.get("candidate_id"),
+                            {"name": meta.get("name", ""), "phone": meta.get("phone", "")})
+    return lexical
+
+
+def main():
+    from agent.embeddings import local_model_name
+
+    parser = argparse.ArgumentParser(description="Export or import a columnar snapshot of the vector index.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("snapshot_dir")
+    parser.add_argument("--index", default=None,
+                        help="Pinecone index (default: the active index for export; required for import).")
+    parser.add_argument("--format", choices=["arrow", "parquet"], default="arrow")
+    parser.add_argument("--batch-size", type=int, default=200, help="Vectors per upsert request.")
+    parser.add_argument("--workers", type=int, default=8, help="Upsert requests in flight.")
+    parser.add_argument("--activate", action="store_true",
+                        help="After import, validate the count and switch the active index alias to it.")
+    parser.add_argument("--transform", default=None,
+                        help="Vector transform file the snapshot was built with (needed to --activate a compressed one).")
+    args = parser.parse_args()
+
+    from pinecone import Pinecone
+    from agent import index_alias
+    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+
+    if args.command == "export":
+        name = args.index or index_alias.active_index_name()
+        t0 = time.perf_counter()
+        manifest = export_snapshot(pc.Index(name), args.snapshot_dir, fmt=args.format, model_name=local_model_name())
+        print(f"Exported {manifest['count']} vector(s) of {manifest['candidates']} candidate(s) from '{name}' "
+              f"to {args.snapshot_dir} in {time.perf_counter() - t0:.1f}s")
+        return
+
+    if not args.index:
+        parser.error("import needs --index (use a new index, then --activate to switch to it)")
+    manifest = read_manifest(args.snapshot_dir)
+    if manifest["model"] and manifest["model"] != local_model_name():
+        print(f"⚠️ Snapshot was embedded with {manifest['model']}, this process uses {local_model_name()}")
+    transform_path = None
+    if args.activate and manifest.get("vector_transform", "none") != "none":
+        from agent.vector_compression import VectorTransform
+        if not args.transform or VectorTransform.load(args.transform).version != manifest["vector_transform"]:
+            parser.error(f"--activate needs --transform with the snapshot's transform ({manifest['vector_transform']})")
+        transform_path = os.path.abspath(args.transform)
+    if args.index not in pc.list_indexes().names():
+        from pinecone import ServerlessSpec
+        pc.create_index(name=args.index, dimension=manifest["dimension"], metric="cosine",
+                        spec=ServerlessSpec(cloud="aws", region="us-east-1"))
+        index_alias.wait_until_ready(pc, args.index)
+    index = pc.Index(args.index)
+    stats = import_snapshot(index, args.snapshot_dir, batch_size=args.batch_size, workers=args.workers)
+    print(f"Upserted {stats['upserted']} vector(s) into '{args.index}' in {stats['elapsed_s']}s "
+          f"({stats['vectors_per_s']} vectors/s)")
+
+    if args.activate:
+        count = index_alias.wait_for_vector_count(index, manifest["count"])
+        if count != manifest["count"]:
+            raise SystemExit(f"❌ '{args.index}' holds {count} vector(s), snapshot has {manifest['count']}; not switching")
+        from agent.lexical_index import LEXICAL_INDEX_PATH
+        root, ext = os.path.splitext(LEXICAL_INDEX_PATH)
+        lexical_path = f"{root}-{args.index}{ext}"
+        lexical_from_snapshot(args.snapshot_dir).save(lexical_path)
+        index_alias.switch({"index": args.index, "lexical_path": lexical_path, "candidates": manifest["candidates"],
+                            "vectors": count, "snapshot": os.path.abspath(args.snapshot_dir),
+                            "vector_transform": transform_path})
+        print(f"✅ Active index is now '{args.index}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,28 @@
 import os
-import time
 import json
+import argparse
 import requests
 from tqdm import tqdm
-from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
 
+from agent.embedding_cache import get_embedding_cache
+from agent.embeddings import encode_for_index, get_model, index_dimension
+from agent.index_alias import active_index_name, active_lexical_path, wait_until_ready
+from agent.ingest_journal import INGEST_RUNS_DIR, IngestJournal, candidate_id_for, file_digest
+from agent.interview_plan import INTERVIEW_PLAN_MODE, build_interview_plan
+from agent.lexical_index import BM25Index
+from agent.upsert_pool import UPSERT_WORKERS, UpsertPool
+from agent.vector_compression import get_transform
+
 load_dotenv()
 
 API_URL = "http://127.0.0.1:8000/api/parse/"
-RESUME_FOLDER = "resumes"
+RESUME_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resumes")
 USE_PINECONE = os.getenv("USE_PINECONE", "true").lower() == "true"
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY", "")
 PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "resumes-index")
+# Resumes between run-journal checkpoints (how much a crash can cost)
+INGEST_CHECKPOINT_EVERY = int(os.getenv("INGEST_CHECKPOINT_EVERY", "50"))
 
 
 def _sanitize_metadata(value):
@@ -42,6 +52,16 @@ def generate_resume_text(data):
     return "\n".join(parts)
 
 
+def chunk_resume(resume_text, chunk_size=1000):
+    """Fixed-size chunks, one vector each (plus one phone vector per candidate)."""
+    return [resume_text[i:i + chunk_size] for i in range(0, len(resume_text), chunk_size)] or [resume_text]
+
+
+def list_resumes(folder_path):
+    """Resume files (PDF / DOCX) in `folder_path`, sorted by name."""
+    return sorted(f for f in os.listdir(folder_path) if f.lower().endswith(('.pdf', '.docx')))
+
+
 def upload_resume_and_get_data(api_url, resume_path):
     try:
         with open(resume_path, 'rb') as f:
@@ -66,37 +86,50 @@ def initialize_pinecone():
         from pinecone import Pinecone, ServerlessSpec
         pc = Pinecone(api_key=PINECONE_API_KEY)
 
-        if PINECONE_INDEX_NAME not in pc.list_indexes().names():
-            print(f"📦 Creating Pinecone index: {PINECONE_INDEX_NAME}")
+        # New resumes go into the live index (see `python -m agent.resetIndex rebuild`)
+        index_name = active_index_name()
+        if index_name not in pc.list_indexes().names():
+            print(f"📦 Creating Pinecone index: {index_name}")
             pc.create_index(
-                name=PINECONE_INDEX_NAME,
-                dimension=384,
+                name=index_name,
+                dimension=index_dimension(),
                 metric="cosine",
                 spec=ServerlessSpec(cloud="aws", region="us-east-1")
             )
-            time.sleep(60)
+            waited = wait_until_ready(pc, index_name)
+            print(f"✅ Index ready after {waited:.0f}s")
         else:
-            print(f"✅ Using existing Pinecone index: {PINECONE_INDEX_NAME}")
+            print(f"✅ Using existing Pinecone index: {index_name}")
 
-        return pc.Index(PINECONE_INDEX_NAME)
+        return pc.Index(index_name)
     except Exception as e:
         print(f"❌ Failed to initialize Pinecone: {e}")
         return None
 
 
-def embed_and_upsert(index, model, candidate_id, candidate_data):
+def embed_and_upsert(index, model, candidate_id, candidate_data, lexical_index=None, interview_plan=None,
+                     transform=None):
+    """
+    Upsert a candidate's chunk vectors and phone vector, embedded through
+    `transform` (default: the active index's; see agent/vector_compression.py).
+    """
     try:
+        transform = transform or get_transform()
         phone_number = candidate_data.get("phone", "")
         resume_text = candidate_data.get("resume_text", "") or generate_resume_text(candidate_data)
 
-        chunk_size = 1000
-        chunks = [resume_text[i:i + chunk_size] for i in range(0, len(resume_text), chunk_size)] or [resume_text]
+        chunks = chunk_resume(resume_text)
         base_metadata = {k: _sanitize_metadata(v) for k, v in candidate_data.items()}
+        if transform.version != "none":
+            # Lets lookups and snapshots tell which transform produced the vectors
+            base_metadata["vector_transform"] = transform.version
 
+        # One batch for all chunks; re-ingested chunks come from the embedding cache
+        chunk_embeddings = encode_for_index(chunks, model=model, transform=transform)
         vectors = []
         for i, chunk in enumerate(chunks):
             vector_id = f"{candidate_id}_chunk_{i}"
-            embedding = model.encode(chunk).astype("float32").tolist()
+            embedding = chunk_embeddings[i].tolist()
             metadata = {
                 "candidate_id": candidate_id,
                 "chunk_id": str(i),
@@ -112,7 +145,7 @@ def embed_and_upsert(index, model, candidate_id, candidate_data):
 
         phone_vector_id = f"{candidate_id}_phone"
         phone_text = f"Phone number: {phone_number}"
-        phone_embedding = model.encode(phone_text).astype("float32").tolist()
+        phone_embedding = encode_for_index(phone_text, model=model, transform=transform).tolist()
         phone_metadata = {
             "candidate_id": candidate_id,
             "chunk_id": "-1",
@@ -121,6 +154,9 @@ def embed_and_upsert(index, model, candidate_id, candidate_data):
             "phone": phone_number  # ✅ This is essential
         }
         phone_metadata.update(base_metadata)
+        if interview_plan:
+            # Stored once, on the entry phone lookups return (see agent/interview_plan.py)
+            phone_metadata["interview_plan"] = json.dumps(interview_plan)
         vectors.append({
             "id": phone_vector_id,
             "values": phone_embedding,
@@ -132,26 +168,112 @@ def embed_and_upsert(index, model, candidate_id, candidate_data):
             batch = vectors[start:start + batch_size]
             index.upsert(vectors=batch)
 
+        # Mirror the chunks into the BM25 index under the same ids for hybrid search
+        if lexical_index is not None:
+            lexical_index.remove_candidate(candidate_id)
+            slim_metadata = {"name": candidate_data.get("name", ""), "phone": phone_number}
+            for i, chunk in enumerate(chunks):
+                lexical_index.add(f"{candidate_id}_chunk_{i}", chunk, candidate_id, slim_metadata)
+
         return True
     except Exception as e:
         print(f"❌ Error during embedding/upsert: {e}")
         return False
 
 
-def ingest_all_resumes(folder_path, api_url):
+def _filtered_vectors(index, filter, top_k=1000) -> list:
+    """Matches of a metadata filter (the query vector is arbitrary; only the filter matters)."""
+    index = index.index if isinstance(index, UpsertPool) else index
+    probe = [1.0] + [0.0] * (index_dimension() - 1)
+    return index.query(vector=probe, top_k=top_k, include_metadata=True, filter=filter).matches
+
+
+def is_indexed(index, resume_id) -> bool:
+    """Whether parser record `resume_id` has a phone entry in the index."""
+    return bool(_filtered_vectors(index, {"id": {"$eq": resume_id}, "is_phone_entry": {"$eq": "true"}}, top_k=1))
+
+
+def retire_replaced_vectors(index, resume_id, candidate_id, lexical_index=None) -> int:
+    """
+    Delete the vectors (and BM25 chunks) of earlier uploads of parser record
+    `resume_id` other than `candidate_id`, after a near-duplicate upload
+    replaced or versioned it. Returns the number of vectors deleted.
+    """
+    index = index.index if isinstance(index, UpsertPool) else index
+    matches = _filtered_vectors(index, {"id": {"$eq": resume_id}, "candidate_id": {"$ne": candidate_id}})
+    if not matches:
+        return 0
+    index.delete(ids=[match.id for match in matches])
+    if lexical_index is not None:
+        for old_candidate in {match.metadata.get("candidate_id") for match in matches}:
+            lexical_index.remove_candidate(old_candidate)
+    return len(matches)
+
+
+def index_candidate(index, model, candidate_id, parsed_data, lexical_index=None, plan_llm=None):
+    """
+    Build the interview plan (per INTERVIEW_PLAN_MODE), then embed_and_upsert one parsed resume.
+    Near-duplicates the parser skipped are not embedded again when their record
+    is already in the index; otherwise (e.g. its earlier upserts were lost to a
+    crash) they are indexed like any other resume.
+    """
+    duplicate = parsed_data.get("near_duplicate")
+    if duplicate and isinstance(index, UpsertPool):
+        # An earlier upload of the same record may still be in flight; the checks below must see it
+        index.settle()
+    if duplicate:
+        parsed_data = {k: v for k, v in parsed_data.items() if k != "near_duplicate"}
+        if duplicate["action"] == "skipped":
+            if is_indexed(index, duplicate["resume_id"]):
+                print(f"🔁 Near-duplicate of resume {duplicate['resume_id']} "
+                      f"(similarity {duplicate['similarity']}), already indexed")
+                return True
+            # No vectors for the parser's record (e.g. lost to a crash): index this upload,
+            # then clear any partial leftovers below
+            print(f"🔁 Near-duplicate of resume {duplicate['resume_id']} is not in the index yet, indexing it")
+    plan = None
+    if INTERVIEW_PLAN_MODE != "off":
+        plan = build_interview_plan(parsed_data, generate_resume_text(parsed_data), llm=plan_llm)
+    ok = embed_and_upsert(index, model, candidate_id, parsed_data, lexical_index, plan)
+    if ok and duplicate:
+        retired = retire_replaced_vectors(index, duplicate["resume_id"], candidate_id, lexical_index)
+        if retired:
+            print(f"🔁 Near-duplicate of resume {duplicate['resume_id']}: {retired} earlier vector(s) removed")
+    return ok
+
+
+def load_plan_llm():
+    """Chat model that writes seed questions for INTERVIEW_PLAN_MODE=llm."""
+    from langchain_groq import ChatGroq
+    return ChatGroq(
+        temperature=0.3,
+        groq_api_key=os.getenv("GROQ_API_KEY"),
+        model_name=os.getenv("GROQ_MODEL_NAME")
+    )
+
+
+def ingest_all_resumes(folder_path, api_url, resume=None, workers=UPSERT_WORKERS,
+                       checkpoint_every=INGEST_CHECKPOINT_EVERY, runs_dir=INGEST_RUNS_DIR):
+    """
+    Parse, embed and index every resume in `folder_path`. Upserts run on
+    `workers` threads while the next resume is parsed; every `checkpoint_every`
+    resumes they are drained, the BM25 index is saved and the run journal
+    (agent/ingest_journal.py) commits them. `resume` ("latest" or a run id)
+    continues a crashed run, skipping resumes it already committed.
+    """
     if not os.path.exists(folder_path):
         os.makedirs(folder_path)
         print(f"📁 Created missing folder: {folder_path}")
         print("⚠️ Please add resumes to this folder.")
         return
 
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    model = get_model()
     pinecone_index = initialize_pinecone()
+    lexical_path = active_lexical_path()
+    lexical_index = BM25Index.load(lexical_path)
+    plan_llm = load_plan_llm() if INTERVIEW_PLAN_MODE == "llm" else None
 
-    resume_files = [
-        f for f in os.listdir(folder_path)
-        if f.lower().endswith(('.pdf', '.docx'))
-    ]
+    resume_files = list_resumes(folder_path)
 
     if not resume_files:
         print("⚠️ No resumes found in the folder.")
@@ -159,27 +281,92 @@ def ingest_all_resumes(folder_path, api_url):
 
     print(f"📄 Found {len(resume_files)} resumes.\n")
 
-    success_count = 0
-    for i, resume_file in enumerate(tqdm(resume_files, desc="Processing Resumes")):
+    if resume:
+        journal = IngestJournal.reopen(None if resume == "latest" else resume, runs_dir)
+        print(f"↪️ Resuming run {journal.run_id}: {len(journal.committed)} resume(s) already committed")
+        if journal.start.get("index") != active_index_name():
+            print(f"⚠️ Run {journal.run_id} wrote to '{journal.start.get('index')}', "
+                  f"the active index is now '{active_index_name()}'")
+    else:
+        journal = IngestJournal.begin(folder_path, active_index_name(), runs_dir)
+    pool = UpsertPool(pinecone_index, workers=workers) if pinecone_index is not None else None
+    upserted_before = journal.upserted
+
+    def checkpoint():
+        failures = pool.drain() if pool else {}
+        if len(lexical_index):
+            lexical_index.save(lexical_path)
+        return journal.checkpoint(upserted_before + (pool.upserted if pool else 0), failures)
+
+    success_count = skipped = failed = since_checkpoint = 0
+    progress = tqdm(resume_files, desc="Processing Resumes")
+    for resume_file in progress:
         full_path = os.path.join(folder_path, resume_file)
+        digest = file_digest(full_path)
+        if digest in journal.committed:
+            skipped += 1
+            continue
         parsed_data = upload_resume_and_get_data(api_url, full_path)
 
         if parsed_data:
-            candidate_id = f"candidate_{int(time.time())}_{i+1}"
-            if pinecone_index:
-                ok = embed_and_upsert(pinecone_index, model, candidate_id, parsed_data)
+            # Derived from the file content: re-ingesting overwrites instead of duplicating
+            candidate_id = candidate_id_for(digest)
+            if pool is not None:
+                pool.tag = candidate_id
+                ok = index_candidate(pool, model, candidate_id, parsed_data, lexical_index, plan_llm)
                 if ok:
-                    success_count += 1
+                    journal.record(resume_file, digest, candidate_id)
                 else:
+                    journal.fail(resume_file, digest, "embedding failed")
                     print(f"⚠️ Failed indexing {resume_file}")
+                progress.set_postfix({"vectors/s": f"{pool.vectors_per_s():.0f}"}, refresh=False)
             else:
                 print(f"✅ Parsed (no Pinecone): {resume_file}")
-                success_count += 1
+                journal.record(resume_file, digest, candidate_id)
         else:
             print(f"❌ Failed to parse {resume_file}")
-
-    print(f"\n🎉 Done. Processed {success_count}/{len(resume_files)} resume(s).")
+            journal.fail(resume_file, digest, "parse failed")
+
+        since_checkpoint += 1
+        if since_checkpoint >= checkpoint_every:
+            committed, failed_now = checkpoint()
+            success_count += committed
+            failed += failed_now
+            since_checkpoint = 0
+
+    committed, failed_now = checkpoint()
+    success_count += committed
+    failed += failed_now
+    if pool is not None:
+        pool.close()
+        print(f"⬆️ Upserted {pool.upserted} vector(s) at {pool.vectors_per_s():.0f} vectors/s "
+              f"({workers} upsert worker(s))")
+    journal.finish(upserted_before + (pool.upserted if pool else 0))
+
+    if len(lexical_index):
+        print(f"🔎 Lexical index saved with {len(lexical_index)} chunk(s): {lexical_path}")
+
+    print(f"\n🎉 Done. Processed {success_count}/{len(resume_files) - skipped} resume(s)"
+          + (f", {failed} failed" if failed else "")
+          + (f", {skipped} already committed" if skipped else "") + f" (run {journal.run_id}).")
+    embedding_cache = get_embedding_cache()
+    if embedding_cache:
+        stats = embedding_cache.stats()
+        print(f"🧠 Embedding cache: hit rate {stats['hit_rate']}, {stats['entries']} entries, "
+              f"{stats['bytes_used'] / 1e6:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse, embed and index the resumes in agent/resumes.")
+    parser.add_argument("--resume", nargs="?", const="latest", default=None, metavar="RUN_ID",
+                        help="Continue a crashed run (default: the latest unfinished one).")
+    parser.add_argument("--workers", type=int, default=UPSERT_WORKERS, help="Parallel upsert requests.")
+    parser.add_argument("--checkpoint-every", type=int, default=INGEST_CHECKPOINT_EVERY,
+                        help="Resumes between journal checkpoints.")
+    args = parser.parse_args()
+    ingest_all_resumes(RESUME_FOLDER, API_URL, resume=args.resume, workers=args.workers,
+                       checkpoint_every=args.checkpoint_every)
 
 
 if __name__ == "__main__":
-    ingest_all_resumes(RESUME_FOLDER, API_URL)
\ No newline at end of file
+    main()
@@ -0,0 +1,139 @@
+"""
+Run journal for crash-resumable ingest.
+
+Every `python -m agent.ingest` run appends JSON lines to
+agent/index_data/ingest_runs/<run id>.jsonl:
+
+    {"event": "start", "run": ..., "index": ..., "folder": ..., "at": ...}
+    {"event": "checkpoint", "committed": [{"file", "sha1", "candidate_id"}, ...], "failed": [...], "upserted": n, "at": ...}
+    {"event": "finish", "upserted": n, "at": ...}
+
+A checkpoint is written only once every upsert before it has completed and the
+BM25 index has been saved, so whatever it lists is durable. `--resume` reopens
+the latest unfinished run and skips files whose content hash is committed;
+work after the last checkpoint is redone. Candidate ids derive from the file
+content, so redone upserts overwrite their vectors instead of duplicating them.
+"""
+import os
+import json
+import hashlib
+from datetime import datetime
+
+INGEST_RUNS_DIR = os.getenv(
+    "INGEST_RUNS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "index_data", "ingest_runs")
+)
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def candidate_id_for(digest: str) -> str:
+    """Stable candidate id for a resume file: the same file always maps to the same vectors."""
+    return f"candidate_{digest[:16]}"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class IngestJournal:
+    def __init__(self, path: str):
+        self.path = path
+        self.run_id = os.path.splitext(os.path.basename(path))[0]
+        self.start = {}
+        self.committed = {}  # sha1 -> candidate_id
+        self.upserted = 0  # vectors upserted by earlier sessions of this run
+        self.finished = False
+        self._pending = []
+        self._failed = []
+        if os.path.exists(path):
+            self._replay()
+
+    def _replay(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn last line from a crash mid-write
+                if entry["event"] == "start":
+                    self.start = entry
+                elif entry["event"] == "checkpoint":
+                    for item in entry["committed"]:
+                        self.committed[item["sha1"]] = item["candidate_id"]
+                    self.upserted = entry["upserted"]
+                elif entry["event"] == "finish":
+                    self.finished = True
+
+    @classmethod
+    def begin(cls, folder: str, index_name: str, runs_dir: str = INGEST_RUNS_DIR) -> "IngestJournal":
+        os.makedirs(runs_dir, exist_ok=True)
+        stamp = run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+        attempt = 1
+        while os.path.exists(os.path.join(runs_dir, f"{run_id}.jsonl")):
+            attempt += 1
+            run_id = f"{stamp}-{attempt}"
+        journal = cls(os.path.join(runs_dir, f"{run_id}.jsonl"))
+        journal.start = {"event": "start", "run": run_id, "index": index_name,
+                         "folder": os.path.abspath(folder), "at": _now()}
+        journal._append(journal.start)
+        return journal
+
+    @classmethod
+    def reopen(cls, run_id: str = None, runs_dir: str = INGEST_RUNS_DIR) -> "IngestJournal":
+        """The run `run_id`, or the most recent unfinished one."""
+        if run_id:
+            path = os.path.join(runs_dir, f"{run_id}.jsonl")
+            if not os.path.exists(path):
+                raise ValueError(f"No ingest run '{run_id}' in {runs_dir}")
+            return cls(path)
+        paths = [os.path.join(runs_dir, name) for name in os.listdir(runs_dir)
+                 if name.endswith(".jsonl")] if os.path.isdir(runs_dir) else []
+        for path in sorted(paths, key=os.path.getmtime, reverse=True):
+            journal = cls(path)
+            if not journal.finished:
+                return journal
+        raise ValueError(f"No unfinished ingest run to resume in {runs_dir}")
+
+    def _append(self, entry: dict):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record(self, file: str, sha1: str, candidate_id: str):
+        """Candidate whose upserts were submitted; committed at the next checkpoint."""
+        self._pending.append({"file": file, "sha1": sha1, "candidate_id": candidate_id})
+
+    def fail(self, file: str, sha1: str, error: str):
+        self._failed.append({"file": file, "sha1": sha1, "error": error})
+
+    def checkpoint(self, upserted: int, failed_ids: dict = None):
+        """
+        Commit the recorded candidates; call only after their upserts completed.
+        `failed_ids` ({candidate_id: error}) moves candidates whose upserts failed to `failed`.
+        """
+        failed_ids = failed_ids or {}
+        committed = []
+        for item in self._pending:
+            error = failed_ids.get(item["candidate_id"])
+            if error is None:
+                committed.append(item)
+                self.committed[item["sha1"]] = item["candidate_id"]
+            else:
+                self._failed.append({"file": item["file"], "sha1": item["sha1"], "error": str(error)})
+        self.upserted = upserted
+        self._append({"event": "checkpoint", "committed": committed, "failed": self._failed,
+                      "upserted": upserted, "at": _now()})
+        failed, self._pending, self._failed = len(self._failed), [], []
+        return len(committed), failed
+
+    def finish(self, upserted: int):
+        self.finished = True
+        self._append({"event": "finish", "upserted": upserted, "at": _now()})
@@ -0,0 +1,342 @@
+"""
+Lease records that partition a resume folder between ingest workers on
+several machines (see agent/distributed_ingest.py).
+
+A worker leases one file at a time for INGEST_LEASE_TTL_S seconds and keeps
+renewing its leases while it works. It marks a file done only after the file's
+upserts have completed. A lease that is not renewed in time belongs to a dead
+worker, and the next worker to look reclaims it. Candidate ids come from file
+content, so the rare file processed twice (a worker stalled past its TTL) is
+overwritten rather than duplicated in the index.
+
+Two stores share one interface:
+    postgres   rows in ingest_leases / ingest_workers in the parser's Postgres
+               database; the next file is picked with FOR UPDATE SKIP LOCKED
+    directory  small JSON files under <folder>/.ingest_leases/<run>/, for a
+               shared folder without a database (and for local testing)
+"""
+import os
+import json
+import time
+import zlib
+import socket
+import hashlib
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# postgres | directory
+INGEST_LEASE_STORE = os.getenv("INGEST_LEASE_STORE", "directory").lower()
+# Seconds a lease lasts without renewal; workers renew every third of it
+INGEST_LEASE_TTL_S = float(os.getenv("INGEST_LEASE_TTL_S", "300"))
+# Leases and per-worker files live here, inside the shared resume folder
+LEASE_DIR_NAME = ".ingest_leases"
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def shared_dir(folder: str, run: str) -> str:
+    """Per-run directory in the shared folder (directory leases and BM25 shards)."""
+    return os.path.join(folder, LEASE_DIR_NAME, run)
+
+
+def _write_json(path: str, data: dict):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class DirectoryLeaseStore:
+    """
+    <root>/<key hash>.lease|.done|.failed per file and <root>/workers/<worker>.json.
+    A lease is created with O_EXCL. To reclaim an expired lease, a worker first
+    creates (O_EXCL) a marker named after that lease's holder and expiry, so only
+    one of several workers that saw the same expired lease goes on to replace it.
+    If the lease changed after it was read (renewed, or already replaced), the
+    reclaim is undone.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(os.path.join(root, "workers"), exist_ok=True)
+        self._finished = set()  # keys known done or failed (both are final)
+
+    def _base(self, key: str) -> str:
+        return os.path.join(self.root, hashlib.sha1(key.encode("utf-8")).hexdigest()[:20])
+
+    def _is_finished(self, key: str) -> bool:
+        if key in self._finished:
+            return True
+        base = self._base(key)
+        if os.path.exists(f"{base}.done") or os.path.exists(f"{base}.failed"):
+            self._finished.add(key)
+            return True
+        return False
+
+    def _create_lease(self, key: str, worker: str, ttl_s: float) -> bool:
+        try:
+            fd = os.open(f"{self._base(key)}.lease", os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "worker": worker, "expires": time.time() + ttl_s}, f)
+        # Finished by someone else between the check and the create
+        if self._is_finished(key):
+            os.remove(f"{self._base(key)}.lease")
+            return False
+        return True
+
+    def seed(self, keys: list):
+        """Nothing to do: the folder listing is the work list."""
+
+    def acquire(self, worker: str, keys: list, ttl_s: float = INGEST_LEASE_TTL_S):
+        """Lease the next unfinished, unleased (or expired) key; None when there is none right now."""
+        if not keys:
+            return None
+        # Workers start at different offsets so they rarely race for the same file
+        start = zlib.crc32(worker.encode("utf-8")) % len(keys)
+        for key in keys[start:] + keys[:start]:
+            if self._is_finished(key):
+                continue
+            if self._create_lease(key, worker, ttl_s):
+                return key
+            if self._reclaim(key, worker, ttl_s):
+                return key
+        return None
+
+    def _reclaim(self, key: str, worker: str, ttl_s: float) -> bool:
+        lease_path = f"{self._base(key)}.lease"
+        lease = _read_json(lease_path)
+        if lease is None:
+            # Unreadable: still being written by its creator, unless it was abandoned mid-write
+            try:
+                if os.path.getmtime(lease_path) >= time.time() - ttl_s:
+                    return False
+            except FileNotFoundError:
+                return False
+            lease = {"worker": None, "expires": None}
+        elif lease["expires"] >= time.time():
+            return False
+        # One marker per expired lease: of the workers that read it, only the first gets past here
+        generation = hashlib.sha1(f"{lease['worker']}|{lease['expires']}".encode("utf-8")).hexdigest()[:12]
+        try:
+            os.close(os.open(f"{self._base(key)}.reclaimed-{generation}", os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+        stale_path = f"{lease_path}.{worker}.stale"
+        try:
+            os.rename(lease_path, stale_path)
+        except FileNotFoundError:
+            return False  # finished (or released) meanwhile
+        moved = _read_json(stale_path) or {"worker": None, "expires": None}
+        if (moved["worker"], moved["expires"]) != (lease["worker"], lease["expires"]):
+            # Renewed by its holder after we read it: put it back
+            try:
+                os.link(stale_path, lease_path)
+            except FileExistsError:
+                pass  # someone leased the free slot meanwhile; its holder keeps it
+            os.remove(stale_path)
+            return False
+        os.remove(stale_path)
+        return self._create_lease(key, worker, ttl_s)
+
+    def renew(self, worker: str, keys: list, ttl_s: float = INGEST_LEASE_TTL_S):
+        for key in keys:
+            lease_path = f"{self._base(key)}.lease"
+            lease = _read_json(lease_path)
+            if lease is not None and lease["worker"] == worker:
+                _write_json(lease_path, {**lease, "expires": time.time() + ttl_s})
+
+    def _finish(self, worker: str, key: str, suffix: str, record: dict) -> bool:
+        """Record the outcome, unless `worker` no longer holds the lease (it was reclaimed): False then."""
+        lease_path = f"{self._base(key)}.lease"
+        lease = _read_json(lease_path)
+        if lease is None or lease["worker"] != worker:
+            return False
+        _write_json(f"{self._base(key)}.{suffix}", {"key": key, "worker": worker, "at": time.time(), **record})
+        self._finished.add(key)
+        os.remove(lease_path)
+        return True
+
+    def complete(self, worker: str, key: str, candidate_id: str) -> bool:
+        return self._finish(worker, key, "done", {"candidate_id": candidate_id})
+
+    def fail(self, worker: str, key: str, error: str) -> bool:
+        return self._finish(worker, key, "failed", {"error": error})
+
+    def unfinished(self, keys: list) -> int:
+        return sum(not self._is_finished(key) for key in keys)
+
+    def retry_failed(self) -> int:
+        names = [n for n in os.listdir(self.root) if n.endswith(".failed")]
+        for name in names:
+            os.remove(os.path.join(self.root, name))
+        self._finished.clear()
+        return len(names)
+
+    def report(self, worker: str, stats: dict):
+        _write_json(os.path.join(self.root, "workers", f"{worker}.json"),
+                    {"worker": worker, "last_seen": time.time(), **stats})
+
+    def progress(self, keys: list) -> dict:
+        now = time.time()
+        counts = {"done": 0, "failed": 0, "leased": 0, "expired": 0}
+        for name in os.listdir(self.root):
+            suffix = name.rsplit(".", 1)[-1]
+            if suffix in ("done", "failed"):
+                counts[suffix] += 1
+            elif suffix == "lease":
+                lease = _read_json(os.path.join(self.root, name))
+                counts["expired" if lease is None or lease["expires"] < now else "leased"] += 1
+        counts["pending"] = max(len(keys) - sum(counts.values()), 0)
+        counts["total"] = len(keys)
+        workers_dir = os.path.join(self.root, "workers")
+        workers = [w for w in (_read_json(os.path.join(workers_dir, n)) for n in sorted(os.listdir(workers_dir)))
+                   if w is not None]
+        return {"files": counts, "workers": workers}
+
+
+class PostgresLeaseStore:
+    """ingest_leases (one row per run and file) and ingest_workers (one row per run and worker)."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS ingest_leases (
+            run TEXT NOT NULL,
+            file TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT 'pending',  -- pending | leased | done | failed
+            worker TEXT,
+            lease_expires TIMESTAMPTZ,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            candidate_id TEXT,
+            error TEXT,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (run, file)
+        );
+        CREATE INDEX IF NOT EXISTS ingest_leases_open ON ingest_leases (run, state, lease_expires);
+        CREATE TABLE IF NOT EXISTS ingest_workers (
+            run TEXT NOT NULL,
+            worker TEXT NOT NULL,
+            stats JSONB NOT NULL,
+            last_seen TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (run, worker)
+        );
+    """
+
+    def __init__(self, run: str):
+        import psycopg2
+
+        self.run = run
+        self.conn = psycopg2.connect(
+            host=os.getenv("POSTGRES_HOST", "localhost"),
+            port=os.getenv("POSTGRES_PORT", "5432"),
+            user=os.getenv("POSTGRES_USER"),
+            password=os.getenv("POSTGRES_PASSWORD"),
+            database=os.getenv("POSTGRES_DB"),
+        )
+        self.conn.autocommit = True
+        with self.conn.cursor() as cur:
+            cur.execute(self.SCHEMA)
+
+    def seed(self, keys: list):
+        """Register the folder's files; rows that already exist (from other workers) are kept."""
+        from psycopg2.extras import execute_values
+        with self.conn.cursor() as cur:
+            execute_values(cur, "INSERT INTO ingest_leases (run, file) VALUES %s ON CONFLICT DO NOTHING",
+                           [(self.run, key) for key in keys], page_size=1000)
+
+    def acquire(self, worker: str, keys: list = None, ttl_s: float = INGEST_LEASE_TTL_S):
+        # SKIP LOCKED: concurrent workers each get a different row instead of queueing on one
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                WITH next AS (
+                    SELECT file FROM ingest_leases
+                    WHERE run = %s AND (state = 'pending' OR (state = 'leased' AND lease_expires < now()))
+                    ORDER BY file LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                UPDATE ingest_leases l
+                SET state = 'leased', worker = %s, lease_expires = now() + %s * interval '1 second',
+                    attempts = l.attempts + 1, updated_at = now()
+                FROM next WHERE l.run = %s AND l.file = next.file
+                RETURNING l.file
+            """, (self.run, worker, ttl_s, self.run))
+            row = cur.fetchone()
+        return row[0] if row else None
+
+    def renew(self, worker: str, keys: list, ttl_s: float = INGEST_LEASE_TTL_S):
+        if not keys:
+            return
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE ingest_leases SET lease_expires = now() + %s * interval '1 second'
+                WHERE run = %s AND worker = %s AND state = 'leased' AND file = ANY(%s)
+            """, (ttl_s, self.run, worker, list(keys)))
+
+    def complete(self, worker: str, key: str, candidate_id: str) -> bool:
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE ingest_leases SET state = 'done', candidate_id = %s, lease_expires = NULL, updated_at = now()
+                WHERE run = %s AND file = %s AND worker = %s
+            """, (candidate_id, self.run, key, worker))
+            return cur.rowcount == 1
+
+    def fail(self, worker: str, key: str, error: str) -> bool:
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE ingest_leases SET state = 'failed', error = %s, lease_expires = NULL, updated_at = now()
+                WHERE run = %s AND file = %s AND worker = %s
+            """, (error, self.run, key, worker))
+            return cur.rowcount == 1
+
+    def unfinished(self, keys: list = None) -> int:
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT count(*) FROM ingest_leases WHERE run = %s AND state IN ('pending', 'leased')",
+                        (self.run,))
+            return cur.fetchone()[0]
+
+    def retry_failed(self) -> int:
+        with self.conn.cursor() as cur:
+            cur.execute("UPDATE ingest_leases SET state = 'pending', error = NULL WHERE run = %s AND state = 'failed'",
+                        (self.run,))
+            return cur.rowcount
+
+    def report(self, worker: str, stats: dict):
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO ingest_workers (run, worker, stats) VALUES (%s, %s, %s)
+                ON CONFLICT (run, worker) DO UPDATE SET stats = EXCLUDED.stats, last_seen = now()
+            """, (self.run, worker, json.dumps(stats)))
+
+    def progress(self, keys: list = None) -> dict:
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT CASE WHEN state = 'leased' AND lease_expires < now() THEN 'expired' ELSE state END, count(*)
+                FROM ingest_leases WHERE run = %s GROUP BY 1
+            """, (self.run,))
+            counts = {"done": 0, "failed": 0, "leased": 0, "expired": 0, "pending": 0, **dict(cur.fetchall())}
+            cur.execute("""
+                SELECT worker, stats, extract(epoch FROM last_seen) FROM ingest_workers
+                WHERE run = %s ORDER BY worker
+            """, (self.run,))
+            workers = [{"worker": w, "last_seen": float(seen), **stats} for w, stats, seen in cur.fetchall()]
+        counts["total"] = sum(counts.values())
+        return {"files": counts, "workers": workers}
+
+
+def open_store(folder: str, run: str, kind: str = INGEST_LEASE_STORE):
+    if kind == "postgres":
+        return PostgresLeaseStore(run)
+    if kind == "directory":
+        return DirectoryLeaseStore(shared_dir(folder, run))
+    raise ValueError(f"Unknown INGEST_LEASE_STORE: {kind}")
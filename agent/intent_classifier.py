@@ -0,0 +1,188 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+from dotenv import load_dotenv
+
+import numpy as np
+
+from agent.embeddings import encode
+from agent.tracing import span
+
+load_dotenv()
+
+# A control intent (decline / end) must reach this cosine score and beat
+# "on_topic" by this margin; otherwise the turn is treated as an answer.
+# Ending an interview by mistake costs more than one extra LLM turn.
+INTENT_MIN_SCORE = float(os.getenv("INTENT_MIN_SCORE", "0.45"))
+INTENT_MARGIN = float(os.getenv("INTENT_MARGIN", "0.05"))
+CONTROL_INTENTS = ("decline", "end")
+
+# Bare one-word commands map straight to their intent, whatever the embedding model says
+COMMAND_INTENTS = {
+    "busy": "decline",
+    "exit": "end",
+    "quit": "end",
+    "stop": "end",
+    "bye": "end",
+    "goodbye": "end",
+}
+
+# Labelled prototypes; each intent is scored against the centroid of its examples
+INTENT_PROTOTYPES = {
+    "decline": [
+        "I'm not interested in this role.",
+        "I'm busy right now, I can't talk.",
+        "This is not a good time, call me later.",
+        "I am not looking for a job at the moment.",
+        "You have the wrong number.",
+        "Please don't call me again.",
+        "I already accepted another offer.",
+        "Not interested, thanks.",
+    ],
+    "end": [
+        "bye",
+        "goodbye",
+        "exit",
+        "quit",
+        "I want to end the interview now.",
+        "That's all from me, bye.",
+        "Let's stop here, thank you.",
+        "I have to go now, goodbye.",
+        "Can we end the call?",
+    ],
+    "question": [
+        "What is the salary for this role?",
+        "Can you tell me more about the team?",
+        "When will I hear back from you?",
+        "Is this position remote?",
+        "What does the interview process look like?",
+        "Could you explain what the role involves?",
+        "What technologies does your team use?",
+        "Do you offer relocation assistance?",
+    ],
+    "on_topic": [
+        "no",
+        "nope, not really",
+        "yes",
+        "Yes, this is a good time.",
+        "No, I haven't used Kubernetes in production.",
+        "I built a recommendation system using PyTorch and FastAPI.",
+        "I have three years of experience in machine learning.",
+        "We used Redis to cache the most frequent queries.",
+        "I graduated in 2022 with a degree in computer science.",
+        "I'm currently based in Bengaluru.",
+        "I handled missing values by imputing them with the median.",
+        "My notice period is 30 days.",
+    ],
+}
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+# Interviewer requests phrased without a question mark ("Tell me about ...", "Walk me through ...")
+_REQUEST_OPENER = re.compile(r"^(tell me|walk me through|talk me through|describe|explain|share)\b", re.IGNORECASE)
+
+
+class Intent(NamedTuple):
+    label: str
+    score: float
+    scores: dict
+
+
+class IntentClassifier:
+    """
+    Nearest-centroid classifier over sentence-transformer embeddings. Scoring an
+    utterance is one (intents x dim) matrix-vector product; embeddings of recent
+    utterances are memoized, so repeated phrases ("yes", "bye") skip the model.
+    """
+
+    def __init__(self, prototypes: dict = None, memo_size: int = 4096):
+        prototypes = prototypes or INTENT_PROTOTYPES
+        self.labels = list(prototypes)
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+        examples = [text for label in self.labels for text in prototypes[label]]
+        vectors = self._normalize(encode(examples))
+        centroids, start = [], 0
+        for label in self.labels:
+            count = len(prototypes[label])
+            centroids.append(vectors[start:start + count].mean(axis=0))
+            start += count
+        self._centroids = self._normalize(np.stack(centroids))
+        self._on_topic = self.labels.index("on_topic") if "on_topic" in self.labels else None
+
+    @staticmethod
+    def _normalize(vectors):
+        vectors = np.atleast_2d(np.asarray(vectors, dtype="float32"))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def _embed(self, texts: list) -> np.ndarray:
+        """Unit vectors for `texts`, encoding only the ones not memoized (in one batch)."""
+        keys = [" ".join(t.lower().split()) for t in texts]
+        with self._lock:
+            found = {k: self._memo[k] for k in keys if k in self._memo}
+            for k in found:
+                self._memo.move_to_end(k)
+        missing = list(dict.fromkeys(k for k in keys if k not in found))
+        if missing:
+            fresh = self._normalize(encode(missing))
+            with self._lock:
+                for k, v in zip(missing, fresh):
+                    found[k] = v
+                    self._memo[k] = v
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return np.stack([found[k] for k in keys])
+
+    def _decide(self, scores: np.ndarray) -> Intent:
+        best = int(np.argmax(scores))
+        label, score = self.labels[best], float(scores[best])
+        if label in CONTROL_INTENTS and self._on_topic is not None:
+            if score < INTENT_MIN_SCORE or score - float(scores[self._on_topic]) < INTENT_MARGIN:
+                label = "on_topic"
+        return Intent(label, score, {l: round(float(s), 4) for l, s in zip(self.labels, scores)})
+
+    def classify(self, text: str) -> Intent:
+        """Label one candidate utterance: decline, end, question or on_topic."""
+        if not text or not text.strip():
+            return Intent("on_topic", 0.0, {})
+        command = COMMAND_INTENTS.get(text.strip(" .!").lower())
+        if command:
+            return Intent(command, 1.0, {})
+        with span("intent_classify"):
+            scores = self._centroids @ self._embed([text])[0]
+            return self._decide(scores)
+
+    def classify_many(self, texts: list) -> list:
+        if not texts:
+            return []
+        scores = self._embed(texts) @ self._centroids.T
+        return [self._decide(row) for row in scores]
+
+    def is_exit(self, text: str) -> bool:
+        return self.classify(text).label in CONTROL_INTENTS
+
+    def asks_question(self, text: str) -> bool:
+        """
+        Whether an interviewer turn asks the candidate something: a sentence ends
+        with "?" or opens with a request. No embedding; the prototypes describe
+        candidate utterances, not interviewer ones.
+        """
+        sentences = [s.strip() for s in _SENTENCE_SPLIT.split(text.strip()) if s.strip()]
+        return any(s.endswith("?") or _REQUEST_OPENER.match(s) for s in sentences)
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """Process-wide classifier; prototype centroids are embedded on first use."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = IntentClassifier()
+    return _classifier
@@ -1,19 +1,24 @@
 import os
 import sys
-import json
 from time import time
+from functools import partial
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Import the general and technical interview functions
 from agent.general_agent import run_general_hr_interview, get_session_history as get_hr_history
-from agent.technical_agent import interview_loop as run_technical_interview, get_session_history as get_tech_history
+from agent.technical_agent import interview_loop as run_technical_interview
+from agent.interview_plan import load_interview_plan
+from agent.transcript_store import TranscriptWriter
 
 # Pinecone lookup
 from agent.data_loader import get_candidate_by_phone, load_full_resume_text
 
 load_dotenv()
 
+# Ground technical questions in hybrid-search excerpts instead of the whole resume
+TECH_CONTEXT_RETRIEVAL = os.getenv("TECH_CONTEXT_RETRIEVAL", "false").lower() == "true"
+
 # ----------------------------------------------------------------
 # STEP 1: fetch_and_confirm_candidate
 # ----------------------------------------------------------------
@@ -68,13 +73,20 @@ def fetch_and_confirm_candidate():
 # ----------------------------------------------------------------
 
 def main():
+    # Turns are appended to the transcript store as they happen, so a crash
+    # mid-interview keeps everything said up to that point.
+    writer = TranscriptWriter()
     try:
         # STEP 1: Lookup & confirm candidate
         phone_number, metadata = fetch_and_confirm_candidate()
-        candidate_name = metadata.get("name", "Candidate").replace(" ", "_")
+        candidate_name = metadata.get("name", "Candidate")
+        interview_id = f"{candidate_name.replace(' ', '_')}-{phone_number}-{int(time())}"
+
+        def turn_recorder(stage):
+            return partial(writer.append, interview_id, phone=phone_number, name=candidate_name, stage=stage)
 
         # STEP 2: Run general HR interview
-        hr_session_id = run_general_hr_interview(phone_number, metadata)
+        hr_session_id = run_general_hr_interview(phone_number, metadata, on_turn=turn_recorder("hr"))
         
         # STEP 3: Extract general history
         hr_msgs = get_hr_history(hr_session_id).messages
@@ -90,38 +102,26 @@ def main():
         resume_text = load_full_resume_text(phone_number)
         if not resume_text:
             print("❗ Could not retrieve full resume. Skipping technical interview.")
-            technical_history = []
         else:
             # STEP 5: Run technical interview (seed with general_history)
-            tech_session_id = run_technical_interview(resume_text, general_history)
-
-            # STEP 6: Extract technical history, skipping the seeded general messages
-            tech_msgs = get_tech_history(tech_session_id).messages
-            tech_only = tech_msgs[len(general_history):]
-            technical_history = []
-            for msg in tech_only:
-                technical_history.append({
-                    "speaker": msg.type,
-                    "text": msg.content,
-                    "timestamp": datetime.now().isoformat()
-                })
-
-        # STEP 7: Combine and save all in one JSON under agent/conversation/
-        combined = general_history + technical_history
-        out_dir = os.path.join("agent", "conversations")
-        os.makedirs(out_dir, exist_ok=True)
-
-        filename = f"{candidate_name}-{phone_number}.json"
-        filepath = os.path.join(out_dir, filename)
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(combined, f, indent=2)
-
-        print(f"\n✅ Interview saved to {filepath}")
+            context_retriever = None
+            if TECH_CONTEXT_RETRIEVAL and metadata.get("candidate_id"):
+                from agent.hybrid_search import retrieve_resume_context
+                context_retriever = partial(retrieve_resume_context, metadata["candidate_id"])
+            run_technical_interview(
+                resume_text, general_history, context_retriever, on_turn=turn_recorder("technical"),
+                interview_plan=load_interview_plan(metadata)
+            )
+
+        writer.close()
+        print(f"\n✅ Interview saved to the transcript store as session {interview_id}")
 
     except KeyboardInterrupt:
+        writer.close()
         print("\nInterview interrupted. Exiting.")
         sys.exit(0)
     except Exception as e:
+        writer.close()
         print(f"\n❗ An error occurred: {e}")
         sys.exit(1)
 
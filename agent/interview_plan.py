@@ -0,0 +1,204 @@
+import os
+import re
+import json
+import hashlib
+from datetime import datetime
+from dotenv import load_dotenv
+
+from agent.job_config import (
+    COMPANY_NAME,
+    JOB_ROLE,
+    EXPERIENCE_YEARS_REQUIRED,
+    SPECIFY_KEY_SKILLS,
+)
+
+load_dotenv()
+
+# off: no plans, every opener comes from the LLM (previous behaviour)
+# template: plans from project/skill templates, no LLM call (ingest and runtime fallback)
+# llm: at ingest, seed questions are written by the LLM (one call per candidate)
+INTERVIEW_PLAN_MODE = os.getenv("INTERVIEW_PLAN_MODE", "template").lower()
+PLAN_VERSION = 1
+SEEDS_PER_CATEGORY = 2
+# Candidates with at least this many years get a time-of-day greeting
+SENIOR_EXPERIENCE_YEARS = 8
+
+# First HR turn: identity confirmation ({greeting} is filled in at call time)
+HR_OPENING_TEMPLATE = "{greeting}, am I speaking with {candidate_name}?"
+
+# Seed questions per technical category, grounded in a project, skill or degree
+PROJECT_SEED_TEMPLATES = {
+    "tech_most_challenging_project": "Your resume mentions {project}. What made it technically challenging, and how did you get past the hardest obstacles?",
+    "tech_project_deep_dive": "In {project}, how did you structure the architecture, and which libraries or frameworks did you rely on?",
+    "tech_project_impact": "What measurable impact did {project} have, for example on cost, speed or reliability?",
+    "tech_scalability_decision": "How did you make {project} scale, and how did you balance throughput, latency and resource costs?",
+    "tech_performance_tuning": "Was there a performance bottleneck in {project}? How did you find it and what did you change?",
+}
+SKILL_SEED_TEMPLATES = {
+    "tech_platform_choice": "Why did you choose {skill} over the alternatives, and what trade-offs did you weigh?",
+    "tech_syntax_and_language": "Which {skill} idioms or features do you rely on most in day-to-day work, and why?",
+    "tech_function_design": "How would you design a {skill} module that ingests and validates incoming records: inputs, outputs and error handling?",
+    "tech_problem_solving": "Suppose a {skill} service you own starts running out of memory in production. How would you track the problem down?",
+}
+EDUCATION_SEED_TEMPLATE = "Which concept from your {education} have you applied most directly in your projects, and how?"
+
+# Used when the resume names no project
+DEFAULT_FIRST_TECH_QUESTION = (
+    "Based on your resume, can you explain the most technically challenging project you've worked on, "
+    "including any architecture or design decisions?"
+)
+
+SEED_PROMPT = """You are preparing a technical interview. From the resume below, write {count} interview questions
+for each of these categories, each grounded in a specific project, skill or degree from the resume:
+{categories}
+Return ONLY a JSON object mapping each category name to a list of question strings.
+
+Resume:
+{resume}
+"""
+
+
+def _as_list(value) -> list:
+    """Metadata fields arrive as lists or, from the vector index, as JSON strings."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return [value] if value.strip() else []
+    return value if isinstance(value, list) else []
+
+
+def candidate_details(metadata: dict) -> str:
+    """The candidate summary shown to the HR agent (CANDIDATE_CONTEXT_PROMPT's {details})."""
+    summary_fields = []
+    if metadata.get("name"):
+        summary_fields.append(f"Name: {metadata['name']}")
+    if metadata.get("education"):
+        summary_fields.append(f"Education: {metadata['education']}")
+    if metadata.get("skills"):
+        summary_fields.append(f"Skills: {', '.join(_as_list(metadata['skills']))}")
+    if metadata.get("experience_years") is not None:
+        summary_fields.append(f"Experience (years): {metadata['experience_years']}")
+    if metadata.get("current_role"):
+        summary_fields.append(f"Current Role: {metadata['current_role']}")
+    return "\n".join(summary_fields)
+
+
+def matching_skills(metadata: dict) -> list:
+    """Job key skills (SPECIFY_KEY_SKILLS) the candidate lists, in the job's order."""
+    candidate_skills = _as_list(metadata.get("skills"))
+    return [skill.strip() for skill in SPECIFY_KEY_SKILLS.split(',') if skill.strip() in candidate_skills]
+
+
+def job_fingerprint() -> str:
+    """Plans depend on the job; a plan built for another job is rebuilt."""
+    job = f"{COMPANY_NAME}|{JOB_ROLE}|{EXPERIENCE_YEARS_REQUIRED}|{SPECIFY_KEY_SKILLS}"
+    return hashlib.sha1(job.encode("utf-8")).hexdigest()[:12]
+
+
+def template_seed_questions(metadata: dict) -> dict:
+    """Seed questions per category from the candidate's projects, skills and education."""
+    projects = [p.get("title") or p.get("description", "")[:60] for p in _as_list(metadata.get("projects"))
+                if isinstance(p, dict) and (p.get("title") or p.get("description"))]
+    # Job-relevant skills first
+    matching = matching_skills(metadata)
+    skills = matching + [s for s in _as_list(metadata.get("skills")) if s not in matching]
+    education = [e for e in _as_list(metadata.get("education")) if isinstance(e, str) and e.strip()]
+
+    seeds = {}
+    for category, template in PROJECT_SEED_TEMPLATES.items():
+        if projects:
+            seeds[category] = [template.format(project=f'"{p}"') for p in projects[:SEEDS_PER_CATEGORY]]
+    for category, template in SKILL_SEED_TEMPLATES.items():
+        if skills:
+            seeds[category] = [template.format(skill=s) for s in skills[:SEEDS_PER_CATEGORY]]
+    if education:
+        seeds["tech_education_application"] = [
+            EDUCATION_SEED_TEMPLATE.format(education=e) for e in education[:SEEDS_PER_CATEGORY]
+        ]
+    return seeds
+
+
+def llm_seed_questions(resume_text: str, llm, categories: list) -> dict:
+    """Seed questions written by `llm` in one call; {} when the reply isn't usable JSON."""
+    prompt = SEED_PROMPT.format(count=SEEDS_PER_CATEGORY, categories="\n".join(f"- {c}" for c in categories),
+                                resume=resume_text)
+    content = llm.invoke(prompt).content
+    match = re.search(r"{.*}", content, re.DOTALL)
+    try:
+        parsed = json.loads(match.group(0)) if match else {}
+    except ValueError:
+        return {}
+    return {
+        category: [q.strip() for q in questions if isinstance(q, str) and q.strip()][:SEEDS_PER_CATEGORY]
+        for category, questions in parsed.items()
+        if category in categories and isinstance(questions, list)
+    }
+
+
+def build_interview_plan(metadata: dict, resume_text: str = "", llm=None) -> dict:
+    """
+    Compact per-candidate plan: the HR candidate summary, matching skills, the HR
+    opener and seed technical questions per category. With `llm`, seed questions
+    come from one LLM call over `resume_text`, with templates filling any gaps.
+    """
+    seeds = template_seed_questions(metadata)
+    if llm is not None and resume_text:
+        categories = list(PROJECT_SEED_TEMPLATES) + list(SKILL_SEED_TEMPLATES) + ["tech_education_application"]
+        try:
+            seeds.update({c: q for c, q in llm_seed_questions(resume_text, llm, categories).items() if q})
+        except Exception as e:
+            print(f"⚠️ LLM seed questions failed, using templates: {e}")
+
+    return {
+        "version": PLAN_VERSION,
+        "job": job_fingerprint(),
+        "candidate_name": metadata.get("name", "Candidate"),
+        "details": candidate_details(metadata),
+        "matching_skills": matching_skills(metadata),
+        "hr_opening": HR_OPENING_TEMPLATE.format(greeting="{greeting}", candidate_name=metadata.get("name", "Candidate")),
+        "seed_questions": seeds,
+    }
+
+
+def load_interview_plan(metadata: dict) -> dict:
+    """
+    The plan stored with the candidate record (`interview_plan` metadata, a JSON
+    string in the vector index). Missing or stale plans are rebuilt from templates,
+    which needs no LLM call. None when INTERVIEW_PLAN_MODE=off.
+    """
+    if INTERVIEW_PLAN_MODE == "off":
+        return None
+    plan = metadata.get("interview_plan")
+    if isinstance(plan, str):
+        try:
+            plan = json.loads(plan)
+        except ValueError:
+            plan = None
+    if not isinstance(plan, dict) or plan.get("version") != PLAN_VERSION or plan.get("job") != job_fingerprint():
+        plan = build_interview_plan(metadata)
+    return plan
+
+
+def hr_opening(plan: dict, experience_years=None, now: datetime = None) -> str:
+    """The plan's HR opener, with a time-of-day greeting for senior candidates."""
+    greeting = "Hello"
+    try:
+        senior = float(experience_years or 0) >= SENIOR_EXPERIENCE_YEARS
+    except (TypeError, ValueError):
+        senior = False
+    if senior:
+        hour = (now or datetime.now()).hour
+        greeting = "Good morning" if hour < 12 else "Good afternoon" if hour < 17 else "Good evening"
+    return plan["hr_opening"].replace("{greeting}", greeting)
+
+
+def seed_questions(plan: dict, category: str) -> list:
+    """The plan's seed questions for `category` ([] without a plan or seeds)."""
+    return list((plan or {}).get("seed_questions", {}).get(category) or [])
+
+
+def first_technical_question(plan: dict) -> str:
+    """Opening technical question: the plan's most-challenging-project seed, if any."""
+    seeds = seed_questions(plan, "tech_most_challenging_project")
+    return seeds[0] if seeds else DEFAULT_FIRST_TECH_QUESTION
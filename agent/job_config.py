@@ -0,0 +1,51 @@
+import os
+import json
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ----------------------------------------------------------------
+# DEFAULT JOB (used by the HR agent and the job ranker)
+# ----------------------------------------------------------------
+
+COMPANY_NAME = "Tech Innovators Inc."
+INTERVIEWER_NAME = "Sophia"
+
+JOB_ROLE = "Gen AI Engineer"
+EXPERIENCE_YEARS_REQUIRED = 0
+EXPERIENCE_AREA = "Machine learning and Agent Engineering"
+JOB_LOCATION = "Hyderabad"
+SPECIFY_KEY_SKILLS = "Python, LLMs, and Agent Engineering, langchain, and Groq"
+
+# Optional JSON file describing a different job (same keys as default_job())
+JOB_DESCRIPTION_PATH = os.getenv("JOB_DESCRIPTION_PATH")
+
+
+def parse_skill_list(skills) -> list:
+    """Split "Python, LLMs, and Groq" style strings into ["Python", "LLMs", "Groq"]."""
+    if isinstance(skills, list):
+        return [s.strip() for s in skills if str(s).strip()]
+    parts = [p.strip() for p in str(skills or "").split(",")]
+    return [p[4:].strip() if p.lower().startswith("and ") else p for p in parts if p]
+
+
+def default_job() -> dict:
+    return {
+        "role": JOB_ROLE,
+        "key_skills": parse_skill_list(SPECIFY_KEY_SKILLS),
+        "experience_years_required": EXPERIENCE_YEARS_REQUIRED,
+        "experience_area": EXPERIENCE_AREA,
+        "location": JOB_LOCATION,
+        "description": "",
+    }
+
+
+def load_job(path: str = None) -> dict:
+    """Load a job description JSON file, filling missing keys from the default job."""
+    job = default_job()
+    path = path or JOB_DESCRIPTION_PATH
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            job.update(json.load(f))
+        job["key_skills"] = parse_skill_list(job.get("key_skills"))
+    return job
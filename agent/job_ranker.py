@@ -0,0 +1,183 @@
+import os
+import re
+import sys
+import json
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from agent.embeddings import encode_for_index
+from agent.job_config import load_job
+
+# Weights of the final score; each signal is scaled to [0, 1] first
+DEFAULT_WEIGHTS = {"semantic": 0.6, "skills": 0.3, "experience": 0.1}
+SHORTLIST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shortlists")
+
+
+def job_query_text(job: dict) -> str:
+    """Text embedded for a job; mirrors the fields generate_resume_text() puts in chunks."""
+    parts = [
+        f"Current Role: {job['role']}",
+        f"Skills: {', '.join(job['key_skills'])}",
+        f"Experience: {job['experience_years_required']} years in {job['experience_area']}",
+    ]
+    if job.get("description"):
+        parts.append(job["description"])
+    return "\n".join(parts)
+
+
+def _normalize_skill(skill: str) -> str:
+    return " ".join(str(skill).lower().split())
+
+
+def _candidate_skills(meta: dict) -> set:
+    skills = meta.get("skills") or []
+    if isinstance(skills, str):
+        # Metadata may hold a JSON list or a comma-separated string
+        try:
+            skills = json.loads(skills)
+        except ValueError:
+            skills = skills.split(",")
+    return {_normalize_skill(s) for s in skills}
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def retrieve_pool(index, job_vector, pool_size: int) -> list:
+    """
+    Top resume chunks for a job vector, collapsed to one entry per candidate
+    (best chunk score). Returns [(metadata, semantic_score), ...].
+    """
+    result = index.query(
+        vector=job_vector.tolist(),
+        top_k=pool_size,
+        include_metadata=True,
+        filter={"is_phone_entry": {"$eq": "false"}}
+    )
+    best = {}
+    for m in result.matches:
+        meta = m.metadata or {}
+        cid = meta.get("candidate_id", m.id)
+        if cid not in best or m.score > best[cid][1]:
+            best[cid] = (meta, m.score)
+    return list(best.values())
+
+
+def score_pool(pool: list, job: dict, weights: dict = None, top_k: int = None) -> list:
+    """
+    Re-rank retrieved candidates with vectorized structured signals:
+    semantic similarity, required-skill coverage and experience fit.
+    Returns the best `top_k` (default: all) candidate dicts by descending score.
+    """
+    if not pool:
+        return []
+    weights = weights or DEFAULT_WEIGHTS
+    required = [_normalize_skill(s) for s in job["key_skills"]]
+    metas = [meta for meta, _ in pool]
+
+    semantic = np.fromiter((score for _, score in pool), dtype="float32", count=len(pool))
+    span = semantic.max() - semantic.min()
+    semantic_scaled = (semantic - semantic.min()) / span if span > 0 else np.ones_like(semantic)
+
+    # candidates x required-skills membership matrix
+    has_skill = np.zeros((len(pool), max(len(required), 1)), dtype=bool)
+    for row, meta in enumerate(metas):
+        skills = _candidate_skills(meta)
+        for col, skill in enumerate(required):
+            has_skill[row, col] = skill in skills
+    skill_overlap = has_skill.mean(axis=1) if required else np.zeros(len(pool), dtype="float32")
+
+    experience = np.array([_to_float(meta.get("experience_years")) for meta in metas], dtype="float32")
+    needed = float(job.get("experience_years_required") or 0)
+    # 1.0 once the requirement is met, falling off linearly with the shortfall
+    experience_fit = np.clip(1.0 - np.maximum(needed - experience, 0) / max(needed, 1.0), 0.0, 1.0)
+
+    total = (
+        weights["semantic"] * semantic_scaled
+        + weights["skills"] * skill_overlap
+        + weights["experience"] * experience_fit
+    )
+    order = np.argsort(-total, kind="stable")[:top_k]
+
+    ranked = []
+    for rank, i in enumerate(order, start=1):
+        meta = metas[i]
+        ranked.append({
+            "rank": rank,
+            "candidate_id": meta.get("candidate_id"),
+            "name": meta.get("name", ""),
+            "phone": meta.get("phone", ""),
+            "email": meta.get("email", ""),
+            "score": round(float(total[i]), 4),
+            "semantic": round(float(semantic[i]), 4),
+            "skill_overlap": round(float(skill_overlap[i]), 4),
+            "matched_skills": [job["key_skills"][c] for c in np.flatnonzero(has_skill[i, :len(required)])],
+            "experience_years": float(experience[i]),
+        })
+    return ranked
+
+
+def rank_candidates(jobs: list, index=None, top_k: int = 20, pool_size: int = 500, weights: dict = None) -> list:
+    """
+    Batch ranking: embed every job description in one encode call, retrieve a
+    candidate pool per job and re-rank it. Returns one shortlist per job.
+    """
+    if index is None:
+        from agent import data_loader
+        if not data_loader.USE_PINECONE:
+            raise ValueError("Job ranking needs a vector index (set USE_PINECONE=true).")
+        index = data_loader.get_index()
+
+    job_vectors = encode_for_index([job_query_text(job) for job in jobs])
+    shortlists = []
+    for job, vector in zip(jobs, job_vectors):
+        pool = retrieve_pool(index, vector, pool_size)
+        shortlists.append(score_pool(pool, job, weights, top_k=top_k))
+    return shortlists
+
+
+def save_shortlist(job: dict, shortlist: list, out_dir: str = SHORTLIST_DIR) -> str:
+    """Write a shortlist the interview scheduler can consume (phone is the lookup key)."""
+    os.makedirs(out_dir, exist_ok=True)
+    slug = re.sub(r"[^a-z0-9]+", "_", job["role"].lower()).strip("_")
+    path = os.path.join(out_dir, f"{slug}-{datetime.now().strftime('%Y%m%d%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "job": job,
+            "generated_at": datetime.now().isoformat(),
+            "candidates": shortlist,
+        }, f)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank candidates in the vector index against job descriptions.")
+    parser.add_argument("--job", action="append", default=[],
+                        help="Job description JSON file (repeatable). Defaults to the configured job.")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--pool", type=int, default=500, help="Chunks retrieved before re-ranking.")
+    args = parser.parse_args()
+
+    jobs = [load_job(path) for path in args.job] or [load_job()]
+    try:
+        shortlists = rank_candidates(jobs, top_k=args.top_k, pool_size=args.pool)
+    except ValueError as e:
+        print(f"❗ {e}")
+        sys.exit(1)
+
+    for job, shortlist in zip(jobs, shortlists):
+        print(f"\n===== {job['role']}: top {len(shortlist)} =====")
+        for cand in shortlist:
+            print(f"{cand['rank']:>3}. {cand['name']:<25} {cand['phone']:<15} score={cand['score']:.3f} "
+                  f"skills={', '.join(cand['matched_skills']) or '-'} exp={cand['experience_years']:g}")
+        print(f"Saved shortlist: {save_shortlist(job, shortlist)}")
+
+
+if __name__ == "__main__":
+    main()
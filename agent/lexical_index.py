@@ -0,0 +1,106 @@
+import os
+import re
+import json
+import math
+from collections import Counter, defaultdict
+
+# Default on-disk location of the BM25 index built by ingest.py
+LEXICAL_INDEX_PATH = os.getenv(
+    "LEXICAL_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "index_data", "lexical_index.json")
+)
+
+# Keeps tokens like "c++", "c#", "node.js" and "gpt-4" intact
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#._\-]*")
+
+
+def tokenize(text: str) -> list:
+    return [tok.rstrip(".-_") for tok in _TOKEN_RE.findall((text or "").lower())]
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index over resume chunks.
+    Documents share their ids with the vectors in the dense index
+    ("{candidate_id}_chunk_{i}"), so the two rankings can be fused.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs = {}                      # doc_id -> {"candidate_id", "text", "length", "metadata"}
+        self.postings = defaultdict(dict)   # term -> {doc_id: term frequency}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc_id: str, text: str, candidate_id: str = None, metadata: dict = None):
+        if doc_id in self.docs:
+            self.remove(doc_id)
+        counts = Counter(tokenize(text))
+        length = sum(counts.values())
+        self.docs[doc_id] = {
+            "candidate_id": candidate_id,
+            "text": text,
+            "length": length,
+            "metadata": metadata or {},
+        }
+        self.total_length += length
+        for term, tf in counts.items():
+            self.postings[term][doc_id] = tf
+
+    def remove(self, doc_id: str):
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self.total_length -= doc["length"]
+        for term in set(tokenize(doc["text"])):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+
+    def remove_candidate(self, candidate_id: str):
+        for doc_id in [d for d, doc in self.docs.items() if doc["candidate_id"] == candidate_id]:
+            self.remove(doc_id)
+
+    def search(self, query: str, top_k: int = 10, candidate_id: str = None) -> list:
+        """Return [(doc_id, score), ...] sorted by descending BM25 score."""
+        n_docs = len(self.docs)
+        if not n_docs:
+            return []
+        avg_len = self.total_length / n_docs
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, tf in posting.items():
+                doc = self.docs[doc_id]
+                if candidate_id is not None and doc["candidate_id"] != candidate_id:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * doc["length"] / avg_len)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_k]
+
+    def save(self, path: str = LEXICAL_INDEX_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"k1": self.k1, "b": self.b, "docs": self.docs}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = LEXICAL_INDEX_PATH) -> "BM25Index":
+        """Load a saved index (postings are rebuilt from the stored chunk text)."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(k1=data.get("k1", 1.5), b=data.get("b", 0.75))
+        for doc_id, doc in data.get("docs", {}).items():
+            index.add(doc_id, doc["text"], doc.get("candidate_id"), doc.get("metadata"))
+        return index
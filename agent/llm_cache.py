@@ -0,0 +1,82 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+from langchain_core.caches import BaseCache, InMemoryCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
+
+load_dotenv()
+
+# Local cache of complete LLM responses, keyed on the exact rendered prompt and
+# model settings. Off by default: with it on, an identical request (same
+# prompt prefix, history and instruction) is answered without a Groq call.
+#   LLM_RESPONSE_CACHE=memory  in-process LRU of LLM_CACHE_MAXSIZE entries
+#   LLM_RESPONSE_CACHE=sqlite  persistent, shared by processes, at LLM_CACHE_PATH
+LLM_RESPONSE_CACHE = os.getenv("LLM_RESPONSE_CACHE", "").lower()
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "llm_cache.db")
+)
+LLM_CACHE_MAXSIZE = int(os.getenv("LLM_CACHE_MAXSIZE", "10000"))
+
+
+class CountingCache(BaseCache):
+    """Wraps another LangChain cache and counts lookups and hits."""
+
+    def __init__(self, inner: BaseCache):
+        self.inner = inner
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt, llm_string):
+        value = self.inner.lookup(prompt, llm_string)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def update(self, prompt, llm_string, return_val):
+        self.inner.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs):
+        self.inner.clear(**kwargs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+def configure_llm_cache(mode: str = None) -> CountingCache:
+    """
+    Install the response cache selected by `mode` (default LLM_RESPONSE_CACHE)
+    as LangChain's global LLM cache. Safe to call more than once.
+    """
+    mode = LLM_RESPONSE_CACHE if mode is None else mode
+    current = get_llm_cache()
+    if isinstance(current, CountingCache) or not mode:
+        return current
+    if mode == "memory":
+        inner = InMemoryCache(maxsize=LLM_CACHE_MAXSIZE)
+    elif mode == "sqlite":
+        from langchain_community.cache import SQLiteCache
+        os.makedirs(os.path.dirname(LLM_CACHE_PATH), exist_ok=True)
+        inner = SQLiteCache(database_path=LLM_CACHE_PATH)
+    else:
+        raise ValueError(f"Unknown LLM_RESPONSE_CACHE mode: {mode!r} (use 'memory' or 'sqlite').")
+    cache = CountingCache(inner)
+    set_llm_cache(cache)
+    return cache
+
+
+def cache_stats() -> dict:
+    """Hit/miss counts of the installed response cache, or None when caching is off."""
+    current = get_llm_cache()
+    return current.stats() if isinstance(current, CountingCache) else None
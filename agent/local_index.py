@@ -0,0 +1,232 @@
+import json
+import threading
+
+import numpy as np
+
+# Rows converted to float32 at a time when scoring float16 / int8 storage (small enough to stay in cache).
+# NumPy's float16 -> float32 conversion is slow (~15x a float32 query at 4k x 384), so float16
+# storage trades query latency for memory; int8 converts fast and is usually the better choice.
+SCORE_BLOCK = 1024
+
+
+class Match:
+    """One query hit, shaped like a Pinecone match (attribute and dict access)."""
+
+    def __init__(self, id, score, metadata=None, values=None):
+        self.id = id
+        self.score = score
+        self.metadata = metadata
+        self.values = values
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+
+class QueryResult:
+    def __init__(self, matches):
+        self.matches = matches
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+
+def _matches_filter(metadata: dict, flt: dict) -> bool:
+    """Subset of Pinecone's metadata filter language: $eq, $ne, $in, $nin and bare values."""
+    for key, cond in flt.items():
+        value = metadata.get(key)
+        if not isinstance(cond, dict):
+            cond = {"$eq": cond}
+        for op, target in cond.items():
+            if op == "$eq" and value != target:
+                return False
+            if op == "$ne" and value == target:
+                return False
+            if op == "$in" and value not in target:
+                return False
+            if op == "$nin" and value in target:
+                return False
+    return True
+
+
+class LocalIndex:
+    """
+    In-process cosine-similarity index with the subset of the Pinecone Index
+    API this project uses (upsert / query / fetch / list / delete / describe_index_stats).
+    Vectors live in one contiguous float32 matrix, so a query is a single matmul.
+    With `quantization` "float16" or "int8" the matrix holds that type instead
+    (int8 codes times the per-dimension `scale`; see agent/vector_compression.py)
+    and is scored in float32 blocks. float16 only saves memory: its queries are
+    an order of magnitude slower than float32 ones. Writes are serialised, so parallel upserters
+    (agent/upsert_pool.py) can share one index.
+    """
+
+    def __init__(self, dimension: int = 384, capacity: int = 1024, quantization: str = "float32",
+                 scale: np.ndarray = None):
+        if quantization == "int8" and scale is None:
+            raise ValueError("int8 storage needs per-dimension scales")
+        self.dimension = dimension
+        self.quantization = quantization
+        self.scale = np.asarray(scale, dtype="float32") if scale is not None else None
+        self._vectors = np.zeros((capacity, dimension), dtype=quantization)
+        self._ids = []
+        self._metadata = []
+        self._slots = {}
+        # Filter -> boolean row mask, reused until the next write
+        self._mask_cache = {}
+        self._write_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    @classmethod
+    def from_arrays(cls, ids: list, vectors: np.ndarray, metadata: list, normalized: bool = False) -> "LocalIndex":
+        """
+        Bulk load without per-vector upserts (e.g. from an index snapshot). `vectors`
+        is used as-is when already unit-length float32, so a writable array is not copied.
+        """
+        vectors = np.asarray(vectors, dtype="float32")
+        if not normalized:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms, norms, 1.0)
+        index = cls(dimension=vectors.shape[1], capacity=1)
+        if not len(vectors):
+            return index
+        index._vectors = vectors if vectors.flags.writeable else vectors.copy()
+        index._ids = list(ids)
+        index._metadata = list(metadata)
+        index._slots = {vid: i for i, vid in enumerate(index._ids)}
+        return index
+
+    def _grow(self, needed: int):
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        grown = np.zeros((capacity, self.dimension), dtype=self._vectors.dtype)
+        grown[:len(self._ids)] = self._vectors[:len(self._ids)]
+        self._vectors = grown
+
+    def _store(self, vec: np.ndarray) -> np.ndarray:
+        if self.quantization == "int8":
+            return np.clip(np.rint(vec / self.scale), -127, 127)
+        return vec
+
+    def _restore(self, row: np.ndarray) -> np.ndarray:
+        if self.quantization == "int8":
+            return row.astype("float32") * self.scale
+        return row.astype("float32")
+
+    def _scores(self, q: np.ndarray, count: int) -> np.ndarray:
+        if self.quantization == "float32":
+            return self._vectors[:count] @ q
+        if self.quantization == "int8":
+            q = q * self.scale  # (codes * scale) @ q == codes @ (q * scale)
+        scores = np.empty(count, dtype="float32")
+        for start in range(0, count, SCORE_BLOCK):
+            block = self._vectors[start:min(start + SCORE_BLOCK, count)]
+            scores[start:start + len(block)] = block.astype("float32") @ q
+        return scores
+
+    def _filter_mask(self, flt: dict):
+        key = json.dumps(flt, sort_keys=True, default=str)
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            mask = np.fromiter(
+                (_matches_filter(meta, flt) for meta in self._metadata),
+                dtype=bool, count=len(self._metadata)
+            )
+            self._mask_cache[key] = mask
+        return mask
+
+    def upsert(self, vectors, **kwargs):
+        with self._write_lock:
+            return self._upsert(vectors)
+
+    def _upsert(self, vectors):
+        self._mask_cache.clear()
+        self._grow(len(self._ids) + len(vectors))
+        for item in vectors:
+            if isinstance(item, dict):
+                vid, values, metadata = item["id"], item["values"], item.get("metadata") or {}
+            else:
+                vid, values = item[0], item[1]
+                metadata = item[2] if len(item) > 2 else {}
+            vec = np.asarray(values, dtype="float32")
+            norm = np.linalg.norm(vec)
+            if norm:
+                vec = vec / norm
+            slot = self._slots.get(vid)
+            if slot is None:
+                slot = len(self._ids)
+                self._slots[vid] = slot
+                self._ids.append(vid)
+                self._metadata.append(metadata)
+            else:
+                self._metadata[slot] = metadata
+            self._vectors[slot] = self._store(vec)
+        return {"upserted_count": len(vectors)}
+
+    def query(self, vector=None, top_k=10, include_metadata=False, include_values=False, filter=None, **kwargs):
+        count = len(self._ids)
+        if not count:
+            return QueryResult([])
+        q = np.asarray(vector, dtype="float32")
+        norm = np.linalg.norm(q)
+        if norm:
+            q = q / norm
+        scores = self._scores(q, count)
+
+        if filter:
+            scores = np.where(self._filter_mask(filter), scores, -np.inf)
+
+        k = min(top_k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        matches = [
+            Match(
+                self._ids[i],
+                float(scores[i]),
+                self._metadata[i] if include_metadata else None,
+                self._restore(self._vectors[i]).tolist() if include_values else None,
+            )
+            for i in top if np.isfinite(scores[i])
+        ]
+        return QueryResult(matches)
+
+    def fetch(self, ids, **kwargs):
+        found = {}
+        for vid in ids:
+            slot = self._slots.get(vid)
+            if slot is not None:
+                found[vid] = Match(vid, None, self._metadata[slot], self._restore(self._vectors[slot]).tolist())
+        return {"vectors": found}
+
+    def list(self, prefix: str = None, limit: int = 100, **kwargs):
+        """Pages of vector ids, like Pinecone's serverless Index.list()."""
+        ids = [vid for vid in self._ids if not prefix or vid.startswith(prefix)]
+        for start in range(0, len(ids), limit):
+            yield ids[start:start + limit]
+
+    def delete(self, ids=None, delete_all=False, filter=None, **kwargs):
+        with self._write_lock:
+            self._delete(ids, delete_all, filter)
+
+    def _delete(self, ids, delete_all, filter):
+        self._mask_cache.clear()
+        if delete_all:
+            keep = []
+        else:
+            drop = set(ids or [])
+            keep = [
+                i for i, vid in enumerate(self._ids)
+                if vid not in drop and not (filter and _matches_filter(self._metadata[i], filter))
+            ]
+        self._vectors = self._vectors[keep] if keep else np.zeros((1024, self.dimension), dtype=self._vectors.dtype)
+        self._ids = [self._ids[i] for i in keep]
+        self._metadata = [self._metadata[i] for i in keep]
+        self._slots = {vid: i for i, vid in enumerate(self._ids)}
+
+    def describe_index_stats(self, **kwargs):
+        return {"dimension": self.dimension, "total_vector_count": len(self._ids),
+                "vector_bytes": self._vectors[:len(self._ids)].nbytes}
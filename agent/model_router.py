@@ -0,0 +1,195 @@
+import os
+import time
+import threading
+from collections import deque
+from dotenv import load_dotenv
+
+from groq import RateLimitError
+from langchain_groq import ChatGroq
+
+from agent.tracing import traced_invoke, token_usage
+
+load_dotenv()
+
+# Small, fast model for cheap turns. Unset: every route uses the agent's own
+# model (GROQ_MODEL_NAME) and routing only adds metrics.
+GROQ_SMALL_MODEL_NAME = os.getenv("GROQ_SMALL_MODEL_NAME")
+# Small-model routes escalate to the large model above this prompt size
+MODEL_ROUTER_SMALL_MAX_PROMPT_TOKENS = int(os.getenv("MODEL_ROUTER_SMALL_MAX_PROMPT_TOKENS", "4000"))
+# After a 429 a model is skipped for this many seconds
+MODEL_ROUTER_COOLDOWN_S = float(os.getenv("MODEL_ROUTER_COOLDOWN_S", "20"))
+
+# Task type -> preferred tier and a tokens-per-minute budget for that tier
+# (0 = unlimited). Over budget, in cooldown or rate-limited, a call goes to the other tier.
+ROUTES = {
+    "greeting": {"tier": "small", "tpm": int(os.getenv("MODEL_ROUTER_TPM_GREETING", "0"))},
+    "followup": {"tier": "small", "tpm": int(os.getenv("MODEL_ROUTER_TPM_FOLLOWUP", "0"))},
+    "deep_technical": {"tier": "large", "tpm": int(os.getenv("MODEL_ROUTER_TPM_DEEP_TECHNICAL", "0"))},
+}
+
+MAX_SAMPLES = 10000
+
+
+def estimate_tokens(*texts) -> int:
+    """Rough prompt size: ~4 characters per token."""
+    return sum(len(t or "") for t in texts) // 4
+
+
+def _model_name(model) -> str:
+    return getattr(model, "model_name", None) or type(model).__name__
+
+
+def _percentile(samples: list, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+class ModelRouter:
+    """
+    Picks the model for each LLM call from its task type (route) and prompt
+    size, falls back to the other tier on rate limits, and keeps per-route
+    latency and token metrics. The "large" tier is the calling agent's own
+    model, so replacing an agent's `llm` (e.g. with a fake) still works.
+    """
+
+    def __init__(self, small_model_name: str = GROQ_SMALL_MODEL_NAME):
+        self.small_model_name = small_model_name
+        self._small_model = None
+        self._lock = threading.Lock()
+        self._cooldown_until = {}
+        self._spent = {route: deque() for route in ROUTES}
+        self._stats = {}
+
+    @property
+    def small_model(self):
+        if self._small_model is None and self.small_model_name:
+            self._small_model = ChatGroq(
+                temperature=0.3,
+                groq_api_key=os.getenv("GROQ_API_KEY"),
+                model_name=self.small_model_name
+            )
+        return self._small_model
+
+    @small_model.setter
+    def small_model(self, model):
+        self._small_model = model
+
+    def _available(self, tier: str) -> bool:
+        if tier == "small" and self.small_model is None:
+            return False
+        return time.monotonic() >= self._cooldown_until.get(tier, 0)
+
+    def _over_budget(self, route: str) -> bool:
+        budget = ROUTES[route]["tpm"]
+        if not budget:
+            return False
+        spent = self._spent[route]
+        with self._lock:
+            while spent and spent[0][0] < time.monotonic() - 60:
+                spent.popleft()
+            return sum(tokens for _, tokens in spent) >= budget
+
+    def select(self, route: str, prompt_tokens: int = 0) -> tuple:
+        """(tier, reason) for a call: reason is "routed", "escalated", "over_budget" or "cooldown"."""
+        tier, reason = ROUTES[route]["tier"], "routed"
+        if tier == "small" and (self.small_model is None or prompt_tokens > MODEL_ROUTER_SMALL_MAX_PROMPT_TOKENS):
+            return "large", "escalated"
+        other = "large" if tier == "small" else "small"
+        if self._over_budget(route) and self._available(other):
+            return other, "over_budget"
+        if not self._available(tier) and self._available(other):
+            return other, "cooldown"
+        return tier, reason
+
+    def invoke(self, route: str, span_name: str, build, inputs: dict, config: dict = None,
+               default=None, prompt_tokens: int = 0, **attrs):
+        """
+        Run one LLM call on the routed model. `build(model)` returns the runnable
+        (prompt | model, usually wrapped with message history); `default` is the
+        agent's large model. A 429 puts the model in cooldown and retries once on
+        the other tier.
+        """
+        tier, reason = self.select(route, prompt_tokens)
+        tiers = [tier]
+        other = "large" if tier == "small" else "small"
+        if other == "large" or self.small_model is not None:
+            tiers.append(other)
+
+        for attempt, current in enumerate(tiers):
+            model = default if current == "large" else self.small_model
+            start = time.perf_counter()
+            try:
+                message = traced_invoke(span_name, build(model), inputs, config=config,
+                                        route=route, model=_model_name(model), **attrs)
+            except RateLimitError:
+                with self._lock:
+                    self._cooldown_until[current] = time.monotonic() + MODEL_ROUTER_COOLDOWN_S
+                self._record(route, model, None, None, rate_limited=True)
+                if attempt == len(tiers) - 1:
+                    raise
+                reason = "rate_limited"
+                continue
+            self._record(route, model, (time.perf_counter() - start) * 1000, message,
+                         reason=reason, primary=current == ROUTES[route]["tier"])
+            return message
+
+    def _record(self, route: str, model, latency_ms, message, reason: str = None,
+                primary: bool = True, rate_limited: bool = False):
+        tokens_in, tokens_out, _ = token_usage(message) if message is not None else (None, None, None)
+        with self._lock:
+            stats = self._stats.setdefault(route, {
+                "calls": 0, "by_model": {}, "reasons": {}, "rate_limited": 0,
+                "tokens_in": 0, "tokens_out": 0, "latency_samples": [],
+            })
+            if rate_limited:
+                stats["rate_limited"] += 1
+                return
+            stats["calls"] += 1
+            name = _model_name(model)
+            stats["by_model"][name] = stats["by_model"].get(name, 0) + 1
+            stats["reasons"][reason] = stats["reasons"].get(reason, 0) + 1
+            stats["tokens_in"] += tokens_in or 0
+            stats["tokens_out"] += tokens_out or 0
+            if len(stats["latency_samples"]) < MAX_SAMPLES:
+                stats["latency_samples"].append(latency_ms)
+            if primary and ROUTES[route]["tpm"]:
+                self._spent[route].append((time.monotonic(), (tokens_in or 0) + (tokens_out or 0)))
+
+    def stats(self) -> dict:
+        """Per-route calls, models used, routing reasons, tokens and latency p50/p95."""
+        with self._lock:
+            return {
+                route: {
+                    "calls": s["calls"],
+                    "by_model": dict(s["by_model"]),
+                    "reasons": dict(s["reasons"]),
+                    "rate_limited": s["rate_limited"],
+                    "tokens_in": s["tokens_in"],
+                    "tokens_out": s["tokens_out"],
+                    "latency_p50_ms": round(_percentile(s["latency_samples"], 0.5), 3),
+                    "latency_p95_ms": round(_percentile(s["latency_samples"], 0.95), 3),
+                }
+                for route, s in self._stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._cooldown_until.clear()
+            for spent in self._spent.values():
+                spent.clear()
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Process-wide router shared by both agents."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+    return _router
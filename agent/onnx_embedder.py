@@ -0,0 +1,168 @@
+"""
+ONNX Runtime backend for the sentence-transformers embedding model.
+
+Export once (needs torch and sentence-transformers; the runtime needs only
+onnxruntime and tokenizers):
+
+    python -m agent.onnx_embedder export
+    python -m agent.onnx_embedder export --model all-MiniLM-L6-v2 --out agent/models/all-MiniLM-L6-v2-onnx
+
+The export directory holds the fp32 graph, a dynamically int8-quantized copy,
+the tokenizer and embedder.json (dimension, pooling, normalisation). Select it
+with EMBEDDING_BACKEND=onnx.
+"""
+import os
+import json
+import argparse
+from dotenv import load_dotenv
+
+import numpy as np
+
+load_dotenv()
+
+EMBEDDER_CONFIG = "embedder.json"
+FP32_FILE = "model.onnx"
+INT8_FILE = "model_int8.onnx"
+
+
+def default_export_dir(model_name: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "models",
+                        f"{model_name.rsplit('/', 1)[-1]}-onnx")
+
+
+def read_config(export_dir: str) -> dict:
+    with open(os.path.join(export_dir, EMBEDDER_CONFIG), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class OnnxEmbedder:
+    """Tokenizer + ONNX transformer + pooling, with the SentenceTransformer encode() signature."""
+
+    def __init__(self, export_dir: str, quantized: bool = True, threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.config = read_config(export_dir)
+        self.dimension = self.config["dimension"]
+        self.tokenizer = Tokenizer.from_file(os.path.join(export_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(self.config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.config["pad_token_id"], pad_token=self.config["pad_token"])
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # 0 lets onnxruntime use one thread per physical core
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        path = os.path.join(export_dir, INT8_FILE if quantized else FP32_FILE)
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def _embed_batch(self, texts: list) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        mask = np.array([e.attention_mask for e in encodings], dtype="int64")
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype="int64"),
+            "attention_mask": mask,
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype="int64"),
+        }
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+        if self.config["pooling"] == "cls":
+            pooled = hidden[:, 0]
+        else:
+            weights = mask[:, :, None].astype("float32")
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        if self.config["normalize"]:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype("float32")
+
+    def encode(self, texts, batch_size: int = 32, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        if not texts:
+            return np.zeros((0, self.dimension), dtype="float32")
+        # Batch texts of similar length together to keep padding short
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out = np.empty((len(texts), self.dimension), dtype="float32")
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            out[rows] = self._embed_batch([texts[i] for i in rows])
+        return out[0] if single else out
+
+
+def export(model_name: str, export_dir: str, opset: int = 17) -> dict:
+    """Export the transformer of `model_name` to ONNX and write an int8-quantized copy."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    pooling_modes = [m.get_pooling_mode_str() for m in model if hasattr(m, "get_pooling_mode_str")]
+    if pooling_modes and pooling_modes[0] not in ("mean", "cls"):
+        raise ValueError(f"Unsupported pooling mode for ONNX export: {pooling_modes[0]}")
+    os.makedirs(export_dir, exist_ok=True)
+
+    tokenizer = transformer.tokenizer
+    sample = tokenizer(["an example sentence"], return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+    dynamic_axes = {n: {0: "batch", 1: "sequence"} for n in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    class LastHiddenState(torch.nn.Module):
+        """Pins the input order (forward's positional order varies across transformers versions)."""
+
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, *inputs):
+            return self.auto_model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    fp32_path = os.path.join(export_dir, FP32_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            LastHiddenState(transformer.auto_model).eval(),
+            tuple(sample[n] for n in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            dynamo=False,
+        )
+    quantize_dynamic(fp32_path, os.path.join(export_dir, INT8_FILE), weight_type=QuantType.QInt8)
+    tokenizer.save_pretrained(export_dir)
+
+    config = {
+        "model_name": model_name,
+        "dimension": model.get_sentence_embedding_dimension(),
+        "max_seq_length": model.max_seq_length,
+        "pooling": pooling_modes[0] if pooling_modes else "mean",
+        "normalize": any(type(m).__name__ == "Normalize" for m in model),
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+    }
+    with open(os.path.join(export_dir, EMBEDDER_CONFIG), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    return config
+
+
+def main():
+    from agent.embeddings import EMBEDDING_MODEL_NAME, EMBEDDING_ONNX_DIR
+
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX (fp32 + int8).")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--out", default=None, help="Export directory (default: EMBEDDING_ONNX_DIR).")
+    args = parser.parse_args()
+    export_dir = args.out or (EMBEDDING_ONNX_DIR if args.model == EMBEDDING_MODEL_NAME
+                              else default_export_dir(args.model))
+    config = export(args.model, export_dir)
+    print(f"Exported {args.model} (dimension {config['dimension']}, {config['pooling']} pooling) to {export_dir}")
+
+
+if __name__ == "__main__":
+    main()
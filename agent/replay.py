@@ -0,0 +1,418 @@
+"""
+Replay candidate answers through the HR and technical agents without a human.
+
+Answers come from recorded interviews (legacy agent/conversations/*.json files
+or the transcript store) or from synthetic answer scripts. Many replays run in
+parallel; the report gives per-turn latency, LLM tokens and whether each agent
+ended the interview at the same point as the recording.
+
+    python -m agent.replay legacy agent/conversations --parallel 8
+    python -m agent.replay store --since 2025-06-01 --limit 50
+    python -m agent.replay scripts my_scripts.json --repeat 20
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import statistics
+import contextlib
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from agent import tracing
+from agent import general_agent, technical_agent
+from agent.embedding_cache import get_embedding_cache
+from agent.intent_classifier import get_intent_classifier
+from agent.interview_plan import load_interview_plan
+from agent.model_router import get_model_router
+from agent.semantic_cache import get_semantic_cache
+
+REPLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replays")
+HR_COMPLETE_MARKER = "GENERAL INTERVIEW COMPLETE"
+
+# Built-in synthetic scripts: one interview that runs to the end, one early decline
+SYNTHETIC_SCRIPTS = [
+    {
+        "id": "synthetic_complete",
+        "name": "Test Candidate",
+        "phone": None,
+        "hr": [
+            "Yes, now is a good time.",
+            "I am a backend engineer working on Python services and data pipelines.",
+            "I am expecting around 18 LPA.",
+            "Yes, I can relocate.",
+            "My notice period is 30 days.",
+            "No questions from my side, thank you.",
+        ],
+        "technical": [
+            "I built a retrieval service that combined keyword and vector search.",
+            "We partitioned the index and cached frequent queries.",
+            "Bad records were routed to a dead-letter queue and alerted on.",
+            "bye",
+        ],
+        "expect": {"hr": "completed"},
+    },
+    {
+        "id": "synthetic_decline",
+        "name": "Busy Candidate",
+        "phone": None,
+        "hr": ["busy"],
+        "technical": [],
+        "expect": {"hr": "declined"},
+    },
+]
+
+_local = threading.local()
+
+
+class ScriptedInput:
+    """
+    input() replacement returning scripted answers in order, then `final`
+    (an exit word both agents recognise) once the script runs out.
+    """
+
+    def __init__(self, answers, final: str = "bye"):
+        self._answers = iter(answers)
+        self.final = final
+        self.calls = 0
+
+    def __call__(self, prompt: str = "") -> str:
+        self.calls += 1
+        return next(self._answers, self.final)
+
+
+# ----------------------------------------------------------------
+# Loading recorded interviews as replay scripts
+# ----------------------------------------------------------------
+
+def _human_answers(turns: list) -> list:
+    """
+    Candidate answers in order. Legacy files store each human message twice
+    (chat history plus the explicit add) and an empty opener; drop both.
+    """
+    answers = []
+    for turn in turns:
+        if turn["speaker"] not in ("human", "user", "candidate"):
+            continue
+        text = (turn["text"] or "").strip()
+        if text and (not answers or answers[-1] != text):
+            answers.append(text)
+    return answers
+
+
+def _script_from_turns(script_id: str, name: str, phone: str, hr_turns: list, tech_turns: list) -> dict:
+    hr_completed = bool(tech_turns) or any(
+        HR_COMPLETE_MARKER in (t["text"] or "") for t in hr_turns if t["speaker"] in ("ai", "assistant")
+    )
+    return {
+        "id": script_id,
+        "name": name,
+        "phone": phone,
+        "hr": _human_answers(hr_turns),
+        "technical": _human_answers(tech_turns),
+        "expect": {"hr": "completed" if hr_completed else "declined"},
+    }
+
+
+def load_legacy_scripts(folder: str) -> list:
+    """Scripts from old {Name}-{Phone}.json files (HR history followed by technical history)."""
+    scripts = []
+    for filename in sorted(os.listdir(folder)):
+        if not filename.endswith(".json"):
+            continue
+        stem = filename[:-len(".json")]
+        name, _, phone = stem.rpartition("-")
+        with open(os.path.join(folder, filename), "r", encoding="utf-8") as f:
+            turns = json.load(f)
+        # The HR part ends with the completion marker; everything after is technical
+        split = 0
+        for i, turn in enumerate(turns):
+            if turn["speaker"] in ("ai", "assistant") and HR_COMPLETE_MARKER in (turn["text"] or ""):
+                split = i + 1
+        if not split:
+            split = len(turns)
+        scripts.append(_script_from_turns(f"legacy_{stem}", name.replace("_", " "), phone,
+                                          turns[:split], turns[split:]))
+    return scripts
+
+
+def load_store_scripts(candidate: str = None, since=None, until=None, limit: int = None) -> list:
+    """Scripts from transcript-store sessions, using the stage recorded on each turn."""
+    from agent.transcript_store import TranscriptReader
+
+    scripts = []
+    for session_id, turns in TranscriptReader().iter_sessions(candidate=candidate, since=since, until=until):
+        hr_turns = [t for t in turns if t.get("stage") != "technical"]
+        tech_turns = [t for t in turns if t.get("stage") == "technical"]
+        scripts.append(_script_from_turns(session_id, turns[0].get("name"), turns[0].get("phone"),
+                                          hr_turns, tech_turns))
+        if limit and len(scripts) >= limit:
+            break
+    return scripts
+
+
+def load_script_file(path: str) -> list:
+    """Synthetic scripts: a JSON list of {id, name, phone, hr: [...], technical: [...], expect}."""
+    with open(path, "r", encoding="utf-8") as f:
+        scripts = json.load(f)
+    for i, script in enumerate(scripts):
+        script.setdefault("id", f"script_{i}")
+        script.setdefault("technical", [])
+        script.setdefault("expect", {})
+    return scripts
+
+
+# ----------------------------------------------------------------
+# Running one replay
+# ----------------------------------------------------------------
+
+def _on_span(record: dict):
+    """Tracing listener: attribute LLM spans to the replay running in this thread."""
+    collector = getattr(_local, "collector", None)
+    if collector is not None and record["name"].startswith("llm."):
+        collector["tokens_in"] += record.get("tokens_in", 0)
+        collector["tokens_out"] += record.get("tokens_out", 0)
+        collector["tokens_cached"] += record.get("tokens_cached", 0)
+        collector["llm_calls"] += 1
+
+
+def _turn_recorder(stage: str, turns: list):
+    """on_turn callback logging the latency and tokens of every AI reply."""
+    collector = _local.collector
+    state = {"since": time.perf_counter(), "tokens_in": collector["tokens_in"], "tokens_out": collector["tokens_out"]}
+
+    def on_turn(speaker, text):
+        now = time.perf_counter()
+        if speaker == "ai":
+            turns.append({
+                "stage": stage,
+                "latency_ms": round((now - state["since"]) * 1000, 3),
+                "tokens_in": collector["tokens_in"] - state["tokens_in"],
+                "tokens_out": collector["tokens_out"] - state["tokens_out"],
+            })
+        state.update(since=now, tokens_in=collector["tokens_in"], tokens_out=collector["tokens_out"])
+
+    return on_turn
+
+
+def _candidate_context(script: dict, lookup: bool) -> tuple:
+    """(metadata, resume_text) for the replayed candidate, from the live store when possible."""
+    metadata, resume_text = None, ""
+    if lookup and script.get("phone"):
+        from agent.data_loader import get_candidate_by_phone, load_full_resume_text
+        try:
+            metadata = get_candidate_by_phone(script["phone"])
+            resume_text = load_full_resume_text(script["phone"]) or ""
+        except Exception as e:
+            print(f"⚠️ Lookup failed for {script['id']}: {e}", file=sys.stderr)
+    return metadata or {"name": script.get("name") or "Candidate"}, resume_text
+
+
+def replay_one(script: dict, lookup: bool = True) -> dict:
+    """Drive both agents with one script; returns timings, tokens and end-detection results."""
+    _local.collector = {"tokens_in": 0, "tokens_out": 0, "tokens_cached": 0, "llm_calls": 0}
+    turns = []
+    result = {"id": script["id"], "phone": script.get("phone")}
+    start = time.perf_counter()
+    try:
+        metadata, resume_text = _candidate_context(script, lookup)
+
+        hr_input = ScriptedInput(script["hr"])
+        hr_session = general_agent.run_general_hr_interview(
+            script.get("phone") or "0000000000", metadata,
+            on_turn=_turn_recorder("hr", turns), input_fn=hr_input
+        )
+        hr_outcome = "completed" if hr_session else "declined"
+        expected_hr = script["expect"].get("hr")
+        result["hr"] = {
+            "outcome": hr_outcome,
+            "expected": expected_hr,
+            "answers_used": hr_input.calls,
+            "answers_scripted": len(script["hr"]),
+            # Same outcome, reached on the same answer as the recording
+            "end_correct": None if expected_hr is None else (
+                hr_outcome == expected_hr and hr_input.calls == len(script["hr"])
+            ),
+        }
+
+        if hr_session:
+            history = [
+                {"speaker": m.type, "text": m.content, "timestamp": None}
+                for m in general_agent.get_session_history(hr_session).messages
+            ]
+            tech_input = ScriptedInput(script["technical"])
+            tech_session = technical_agent.interview_loop(
+                resume_text, history, on_turn=_turn_recorder("technical", turns), input_fn=tech_input,
+                interview_plan=load_interview_plan(metadata)
+            )
+            answers = script["technical"]
+            ends_on_exit = bool(answers) and get_intent_classifier().is_exit(answers[-1])
+            expected_calls = len(answers) if ends_on_exit else len(answers) + 1
+            result["technical"] = {
+                "answers_used": tech_input.calls,
+                "answers_scripted": len(answers),
+                "end_correct": tech_input.calls == expected_calls,
+            }
+            technical_agent.session_store.pop(tech_session, None)
+            technical_agent.category_history.pop(tech_session, None)
+            technical_agent.category_schedulers.pop(tech_session, None)
+            general_agent.session_store.pop(hr_session, None)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result.update(_local.collector)
+        _local.collector = None
+
+    result["wall_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    result["turns"] = turns
+    return result
+
+
+# ----------------------------------------------------------------
+# Batch runs and reporting
+# ----------------------------------------------------------------
+
+def _percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)] if ordered else 0.0
+
+
+def run_replays(scripts: list, parallel: int = 4, lookup: bool = True, quiet: bool = True) -> dict:
+    """Replay every script with `parallel` workers and aggregate the results."""
+    # Token counts come from the LLM spans; keep the JSONL export only if tracing was already on
+    was_enabled, export_path = tracing.TRACING_ENABLED, tracing.TRACE_EXPORT_PATH
+    tracing.enable(None if was_enabled else "")
+    tracing.add_listener(_on_span)
+    output = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    start = time.perf_counter()
+    try:
+        with output, ThreadPoolExecutor(max_workers=parallel) as pool:
+            results = list(pool.map(lambda s: replay_one(s, lookup), scripts))
+    finally:
+        tracing.remove_listener(_on_span)
+        tracing.enable(export_path)
+        if not was_enabled:
+            tracing.disable()
+    elapsed = time.perf_counter() - start
+    return {"summary": summarize(results, elapsed, parallel), "replays": results}
+
+
+def summarize(results: list, elapsed_s: float, parallel: int) -> dict:
+    latencies = {"hr": [], "technical": []}
+    for r in results:
+        for turn in r["turns"]:
+            latencies[turn["stage"]].append(turn["latency_ms"])
+
+    def accuracy(stage):
+        checked = [r[stage]["end_correct"] for r in results
+                   if stage in r and r[stage]["end_correct"] is not None]
+        return round(sum(checked) / len(checked), 4) if checked else None
+
+    finished = [r for r in results if "error" not in r]
+    semantic_cache = get_semantic_cache()
+    return {
+        "replays": len(results),
+        "errors": len(results) - len(finished),
+        "parallel": parallel,
+        "wall_s": round(elapsed_s, 3),
+        "replays_per_min": round(len(results) / elapsed_s * 60, 2) if elapsed_s else None,
+        "turn_latency_ms": {
+            stage: {"count": len(v), "p50": round(_percentile(v, 0.5), 3), "p95": round(_percentile(v, 0.95), 3)}
+            for stage, v in latencies.items()
+        },
+        "llm_calls": sum(r["llm_calls"] for r in results),
+        "tokens_in": sum(r["tokens_in"] for r in results),
+        "tokens_out": sum(r["tokens_out"] for r in results),
+        "tokens_cached": sum(r["tokens_cached"] for r in results),
+        "tokens_per_interview": round(
+            statistics.fmean(r["tokens_in"] + r["tokens_out"] for r in finished), 1
+        ) if finished else None,
+        "semantic_cache": semantic_cache.stats() if semantic_cache else None,
+        "model_routes": get_model_router().stats(),
+        "embedding_cache": get_embedding_cache().stats() if get_embedding_cache() else None,
+        "hr_end_accuracy": accuracy("hr"),
+        "technical_end_accuracy": accuracy("technical"),
+    }
+
+
+def print_report(report: dict):
+    s = report["summary"]
+    print("\n===== Replay Report =====")
+    print(f"Replays: {s['replays']} ({s['errors']} errors), {s['parallel']} parallel, "
+          f"{s['wall_s']:.1f}s wall, {s['replays_per_min']} replays/min")
+    for stage, lat in s["turn_latency_ms"].items():
+        print(f"  {stage:<10} turns={lat['count']:<5} p50={lat['p50']:.1f} ms  p95={lat['p95']:.1f} ms")
+    print(f"LLM calls: {s['llm_calls']}, tokens in/out: {s['tokens_in']}/{s['tokens_out']} "
+          f"(~{s['tokens_per_interview']} per interview), prompt-cached: {s['tokens_cached']}")
+    print(f"End-of-interview detection: HR {s['hr_end_accuracy']}, technical {s['technical_end_accuracy']}")
+    if s["semantic_cache"]:
+        sc = s["semantic_cache"]
+        print(f"Semantic cache: {sc['hits']} hit(s) / {sc['hits'] + sc['misses']} lookup(s), "
+              f"hit rate {sc['hit_rate']}, by intent {sc['by_intent']}")
+    if s.get("embedding_cache"):
+        ec = s["embedding_cache"]
+        print(f"Embedding cache: {ec['hits']} hit(s) / {ec['hits'] + ec['misses']} lookup(s), "
+              f"hit rate {ec['hit_rate']}, {ec['bytes_used'] / 1e6:.1f} MB used")
+    for route, rs in s.get("model_routes", {}).items():
+        print(f"  route {route:<15} calls={rs['calls']:<5} p50={rs['latency_p50_ms']:.1f} ms  "
+              f"p95={rs['latency_p95_ms']:.1f} ms  tokens in/out={rs['tokens_in']}/{rs['tokens_out']}  "
+              f"models={rs['by_model']}  rate-limited={rs['rate_limited']}")
+    for r in report["replays"]:
+        if "error" in r:
+            print(f"  ❗ {r['id']}: {r['error']}")
+        elif r["hr"]["end_correct"] is False or r.get("technical", {}).get("end_correct") is False:
+            print(f"  ⚠️ {r['id']}: HR {r['hr']['outcome']} after {r['hr']['answers_used']}/"
+                  f"{r['hr']['answers_scripted']} answers (expected {r['hr']['expected']})")
+
+
+def save_report(report: dict, out_dir: str = REPLAY_DIR) -> str:
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"replay-{datetime.now().strftime('%Y%m%d%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded or scripted interviews through the agents.")
+    parser.add_argument("source", choices=["legacy", "store", "scripts", "synthetic"])
+    parser.add_argument("path", nargs="?", help="Conversations folder (legacy) or script JSON file (scripts).")
+    parser.add_argument("--candidate", help="store: phone number or name")
+    parser.add_argument("--since", help="store: ISO date/time")
+    parser.add_argument("--until", help="store: ISO date/time")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--repeat", type=int, default=1, help="Replay each script this many times.")
+    parser.add_argument("--parallel", type=int, default=4)
+    parser.add_argument("--no-lookup", action="store_true",
+                        help="Skip candidate/resume lookups; replay with the recorded name only.")
+    parser.add_argument("--verbose", action="store_true", help="Show the agents' console output.")
+    args = parser.parse_args()
+
+    if args.source == "legacy":
+        scripts = load_legacy_scripts(args.path or os.path.join(os.path.dirname(os.path.abspath(__file__)), "conversations"))
+    elif args.source == "store":
+        scripts = load_store_scripts(args.candidate, args.since, args.until, args.limit)
+    elif args.source == "scripts":
+        if not args.path:
+            parser.error("scripts needs a JSON file path")
+        scripts = load_script_file(args.path)
+    else:
+        scripts = SYNTHETIC_SCRIPTS
+    scripts = scripts[:args.limit] if args.limit else scripts
+    scripts = [dict(s, id=f"{s['id']}#{n}") if args.repeat > 1 else s
+               for s in scripts for n in range(args.repeat)]
+    if not scripts:
+        print("⚠️ Nothing to replay.")
+        return
+
+    print(f"Replaying {len(scripts)} interview(s) with {args.parallel} worker(s)...")
+    report = run_replays(scripts, args.parallel, lookup=not args.no_lookup, quiet=not args.verbose)
+    print_report(report)
+    print(f"\nSaved report: {save_report(report)}")
+
+
+if __name__ == "__main__":
+    main()
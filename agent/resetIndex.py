@@ -1,49 +1,218 @@
+"""
+Pinecone index maintenance.
+
+    python -m agent.resetIndex             # reset: delete and recreate PINECONE_INDEX_NAME (downtime)
+    python -m agent.resetIndex rebuild     # blue/green: build a new index from the candidate store, then switch
+    python -m agent.resetIndex rollback    # switch back to the previously active index
+    python -m agent.resetIndex status
+
+`rebuild` leaves the live index serving lookups while a new versioned index
+(<PINECONE_INDEX_NAME>-<timestamp>) is created, loaded from the Postgres
+candidate table and validated. Only then does the active index alias
+(agent/index_alias.py) switch to it. Older rebuilds beyond --keep are deleted.
+`rebuild --transform <file>` embeds the new index through a fitted vector
+transform (agent/vector_compression.py); the alias records it for queries.
+"""
 import os
+import argparse
+from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()  # Load environment variables from .env file
 
 from pinecone import Pinecone, ServerlessSpec
-from langchain_huggingface import HuggingFaceEmbeddings
 
-PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "rag-resume-index")  # Pinecone index name from env
-EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"  # Embedding model name from env
-EMBEDDING_MODEL_KWARGS = {"device": "cpu"}  # Embedding model config
+from agent import index_alias
+from agent.embeddings import EMBEDDING_BACKEND, encode_for_index, get_model, index_dimension
+from agent.index_alias import PINECONE_INDEX_NAME, wait_for_vector_count, wait_until_ready
+from agent.ingest import chunk_resume, embed_and_upsert, generate_resume_text
+from agent.interview_plan import INTERVIEW_PLAN_MODE, build_interview_plan
+from agent.lexical_index import BM25Index, LEXICAL_INDEX_PATH
+from agent.vector_compression import VECTOR_TRANSFORM_PATH, get_transform, transform_path
+
+SPEC = ServerlessSpec(cloud="aws", region="us-east-1")  # Pinecone serverless spec
+# Parsed-resume columns read back from the candidate store
+STORE_COLUMNS = ["name", "email", "phone", "location", "experience_years", "skills", "current_role",
+                 "company", "education", "projects", "work_experience"]
+
+
+def create_index(pc, name, transform):
+    dim = index_dimension(transform)  # Same model (and backend) and vector transform as ingest
+    print(f"Embedding dimension detected: {dim} ({EMBEDDING_BACKEND} backend, transform {transform.version})")
+    pc.create_index(name=name, dimension=dim, metric="cosine", spec=SPEC)
+    waited = wait_until_ready(pc, name)  # Poll instead of a fixed sleep
+    print(f"Index '{name}' created with dimension={dim}, metric='cosine', spec={SPEC}, ready after {waited:.0f}s")
+
+
+def reset(pc):
+    """Delete and recreate PINECONE_INDEX_NAME; lookups fail until it is re-ingested."""
+    existing = pc.list_indexes().names()  # List existing indexes
+    if PINECONE_INDEX_NAME in existing:
+        print(f"Deleting existing index '{PINECONE_INDEX_NAME}'...")
+        pc.delete_index(name=PINECONE_INDEX_NAME)  # Delete existing index
+    else:
+        print(f"No existing index named '{PINECONE_INDEX_NAME}' found. Creating new one.")
+    create_index(pc, PINECONE_INDEX_NAME, get_transform(VECTOR_TRANSFORM_PATH))
+    index_alias.clear()  # Lookups go to PINECONE_INDEX_NAME again
+
 
-def initialize_embeddings():
-    # Initialize HuggingFace embeddings
-    return HuggingFaceEmbeddings(
-        model_name=EMBEDDING_MODEL_NAME,
-        model_kwargs=EMBEDDING_MODEL_KWARGS
+def iter_store_candidates(batch_size=500):
+    """(store id, parsed resume) for every row of the Postgres candidate table, streamed."""
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+
+    conn = psycopg2.connect(
+        host=os.getenv("POSTGRES_HOST", "localhost"),
+        port=os.getenv("POSTGRES_PORT", "5432"),
+        user=os.getenv("POSTGRES_USER"),
+        password=os.getenv("POSTGRES_PASSWORD"),
+        database=os.getenv("POSTGRES_DB"),
     )
+    table = os.getenv("POSTGRES_TABLENAME", "parser_parsedresume")
+    try:
+        # Named (server-side) cursor: rows arrive in batches instead of all at once
+        with conn.cursor(name="rebuild_candidates", cursor_factory=RealDictCursor) as cur:
+            cur.itersize = batch_size
+            cur.execute(f"SELECT id, {', '.join(STORE_COLUMNS)} FROM {table} ORDER BY id")
+            for row in cur:
+                row = dict(row)
+                # "id" stays in the row: ingest finds a replaced resume's vectors by it
+                yield row["id"], row
+    finally:
+        conn.close()
+
+
+def validate(index, expected_vectors, sample, transform):
+    """Vector count matches what was upserted, and a sample phone lookup finds its candidate."""
+    count = wait_for_vector_count(index, expected_vectors)
+    problems = []
+    if count != expected_vectors:
+        problems.append(f"index holds {count} vectors, expected {expected_vectors}")
+    if sample:
+        candidate_id, phone = sample
+        vector = encode_for_index(f"Phone number: {phone}", transform=transform)
+        result = index.query(vector=vector.tolist(), top_k=1, include_metadata=True,
+                             filter={"is_phone_entry": {"$eq": "true"}})
+        matches = result["matches"]
+        if not matches or matches[0]["metadata"].get("candidate_id") != candidate_id:
+            problems.append(f"phone lookup for {phone} did not return {candidate_id}")
+    return count, problems
+
+
+def rebuild(pc, candidates, keep=2, version=None, alias_path=index_alias.ACTIVE_INDEX_PATH,
+            vector_transform_path=""):
+    """
+    Build <PINECONE_INDEX_NAME>-<version> from `candidates` ((store id, parsed
+    resume) pairs), validate it and make it the active index. The previously
+    active index keeps serving until the switch and stays available for rollback.
+    Vectors go through the transform at `vector_transform_path` ("" = none).
+    Returns the new alias entry; raises (without switching) when validation fails.
+    """
+    version = version or datetime.now().strftime("%Y%m%d%H%M%S")
+    name = f"{PINECONE_INDEX_NAME}-{version}"
+    transform = get_transform(vector_transform_path)
+    print(f"Building '{name}' (live index '{index_alias.active_index_name(alias_path)}' keeps serving)...")
+    create_index(pc, name, transform)
+    index = pc.Index(name)
+
+    model = get_model()
+    lexical = BM25Index()
+    loaded = failed = expected_vectors = 0
+    sample = None
+    for store_id, data in candidates:
+        candidate_id = f"candidate_{store_id}"
+        resume_text = data.get("resume_text", "") or generate_resume_text(data)
+        plan = build_interview_plan(data, resume_text) if INTERVIEW_PLAN_MODE != "off" else None
+        if embed_and_upsert(index, model, candidate_id, data, lexical, plan, transform):
+            loaded += 1
+            expected_vectors += len(chunk_resume(resume_text)) + 1
+            if sample is None and data.get("phone"):
+                sample = (candidate_id, data["phone"])
+        else:
+            failed += 1
+        if (loaded + failed) % 500 == 0:
+            print(f"  {loaded + failed} candidate(s) loaded...")
+
+    count, problems = validate(index, expected_vectors, sample, transform)
+    if failed:
+        problems.append(f"{failed} candidate(s) failed to load")
+    if not loaded:
+        problems.append("no candidates loaded")
+    if problems:
+        raise RuntimeError(f"Not switching to '{name}' (left in place for inspection): " + "; ".join(problems))
+
+    root, ext = os.path.splitext(LEXICAL_INDEX_PATH)
+    lexical_path = f"{root}-{version}{ext}"
+    lexical.save(lexical_path)
+    entry = index_alias.switch({
+        "index": name,
+        "lexical_path": lexical_path,
+        "version": version,
+        "candidates": loaded,
+        "vectors": count,
+        "vector_transform": os.path.abspath(vector_transform_path) if vector_transform_path else None,
+        "vector_transform_version": transform.version,
+    }, alias_path)
+    print(f"✅ Active index is now '{name}' ({loaded} candidate(s), {count} vector(s))")
+    prune(pc, keep, alias_path)
+    return entry
+
+
+def prune(pc, keep, alias_path=index_alias.ACTIVE_INDEX_PATH):
+    """Delete rebuilt indexes beyond the active one and the `keep - 1` most recent previous ones."""
+    stale = index_alias.trim_history(max(keep - 1, 0), alias_path)
+    data = index_alias.read_alias(alias_path)
+    live = {e["index"] for e in [data.get("active", {})] + data.get("history", []) if e}
+    existing = set(pc.list_indexes().names())
+    for entry in stale:
+        if entry["index"] in existing and entry["index"] not in live | {PINECONE_INDEX_NAME}:
+            print(f"Deleting old index '{entry['index']}'")
+            pc.delete_index(name=entry["index"])
+        lexical_path = entry.get("lexical_path")
+        if lexical_path and lexical_path != LEXICAL_INDEX_PATH and os.path.exists(lexical_path):
+            os.remove(lexical_path)
+
+
+def status(alias_path=index_alias.ACTIVE_INDEX_PATH):
+    data = index_alias.read_alias(alias_path)
+    if not data.get("active"):
+        print(f"No alias; lookups use '{PINECONE_INDEX_NAME}'.")
+        return
+    active = data["active"]
+    print(f"Active:   {active['index']} ({active.get('candidates')} candidate(s), "
+          f"{active.get('vectors')} vector(s), transform {active.get('vector_transform_version', 'none')}, "
+          f"activated {active.get('activated_at')})")
+    for entry in reversed(data.get("history", [])):
+        print(f"Previous: {entry['index']} (activated {entry.get('activated_at')})")
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Reset, rebuild or roll back the Pinecone index.")
+    parser.add_argument("command", nargs="?", default="reset", choices=["reset", "rebuild", "rollback", "status"])
+    parser.add_argument("--keep", type=int, default=2,
+                        help="Rebuilt indexes to keep, including the active one (rebuild).")
+    parser.add_argument("--transform", default=None,
+                        help="Vector transform file for the new index, or 'none' (rebuild; default: the active one's).")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        return status()
+    if args.command == "rollback":
+        entry = index_alias.rollback()
+        print(f"↩️ Active index is now '{entry['index']}'")
+        return
+
     # Initialize Pinecone client
     pc = Pinecone(
         api_key=os.getenv("PINECONE_API_KEY"),
         environment=os.getenv("PINECONE_ENVIRONMENT")
     )
-
-    existing = pc.list_indexes().names()  # List existing indexes
-    if PINECONE_INDEX_NAME in existing:
-        print(f"Deleting existing index '{PINECONE_INDEX_NAME}'...")
-        pc.delete_index(name=PINECONE_INDEX_NAME)  # Delete existing index
+    if args.command == "reset":
+        reset(pc)
     else:
-        print(f"No existing index named '{PINECONE_INDEX_NAME}' found. Creating new one.")
+        path = transform_path() if args.transform is None else args.transform
+        rebuild(pc, iter_store_candidates(), keep=args.keep, vector_transform_path="" if path == "none" else path)
 
-    embeddings = initialize_embeddings()  # Create embedding model
-    test_vec = embeddings.embed_query("test")  # Get embedding vector for test query
-    dim = len(test_vec)  # Determine embedding dimension
-    print(f"Embedding dimension detected: {dim}")
-
-    spec = ServerlessSpec(cloud="aws", region="us-east-1")  # Pinecone serverless spec
-    pc.create_index(
-        name=PINECONE_INDEX_NAME,
-        dimension=dim,
-        metric="cosine",
-        spec=spec
-    )  # Create new index
-    print(f"Index '{PINECONE_INDEX_NAME}' created with dimension={dim}, metric='cosine', spec={spec}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,227 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from dotenv import load_dotenv
+
+import numpy as np
+
+from agent.embeddings import encode
+from agent.job_config import COMPANY_NAME, JOB_LOCATION
+from agent.tracing import span
+
+load_dotenv()
+
+# Opt-in: answer recurring HR small-talk questions from templates instead of the LLM
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+# Minimum cosine similarity between the candidate's utterance and a known intent
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.8"))
+# Learned utterances expire after this many seconds and are LRU-capped
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "86400"))
+SEMANTIC_CACHE_MAXSIZE = int(os.getenv("SEMANTIC_CACHE_MAXSIZE", "5000"))
+# Longer utterances usually carry more than one point and go to the LLM
+SEMANTIC_CACHE_MAX_WORDS = int(os.getenv("SEMANTIC_CACHE_MAX_WORDS", "25"))
+SEMANTIC_CACHE_AUDIT_PATH = os.getenv(
+    "SEMANTIC_CACHE_AUDIT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "semantic_cache_audit.jsonl")
+)
+
+# Intents RAW_SYSTEM_PROMPT already scripts, with example candidate questions and
+# the scripted answer ({first_name}, {company} and {location} are filled per candidate)
+INTENTS = {
+    "salary": {
+        "examples": [
+            "What is the salary for this role?",
+            "How much does this position pay?",
+            "What's the compensation package?",
+            "Can you tell me the CTC for this job?",
+            "What is the salary range?",
+            "How much will I be paid?",
+        ],
+        "template": "Good question, {first_name}. We can discuss compensation later in the process, "
+                    "but we do offer competitive packages based on experience and market standards. "
+                    "Shall we continue?",
+    },
+    "relocation": {
+        "examples": [
+            "Do you offer relocation assistance?",
+            "Will the company help me relocate?",
+            "Is relocation support provided?",
+            "Do I have to move to {location}?",
+            "Would I need to relocate for this job?",
+        ],
+        "template": "We do offer relocation assistance depending on the role, {first_name}. "
+                    "Would relocating to {location} work for you?",
+    },
+    "work_mode": {
+        "examples": [
+            "Is this role remote?",
+            "Can I work from home?",
+            "Is this a hybrid or onsite position?",
+            "Is remote work allowed?",
+            "How many days a week are in the office?",
+        ],
+        "template": "This is primarily onsite in {location}, with possible hybrid flexibility after onboarding, "
+                    "{first_name}. Does that work for you?",
+    },
+}
+# Candidate statements that resemble the intents but must reach the LLM
+# (e.g. stating an expectation is an answer, not a question)
+NEGATIVE_EXAMPLES = [
+    "My expected salary is 18 LPA.",
+    "My current CTC is 12 lakhs.",
+    "I am currently working remotely.",
+    "I am based in Bengaluru right now.",
+    "I have already relocated once before.",
+]
+
+
+class SemanticCache:
+    """
+    Matches candidate utterances to known HR intents by embedding similarity and
+    serves the intent's templated answer. Utterances that matched are remembered
+    (TTL + LRU), so a repeated phrasing is answered without re-embedding and
+    close paraphrases of it match too.
+    """
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, ttl: float = SEMANTIC_CACHE_TTL,
+                 maxsize: int = SEMANTIC_CACHE_MAXSIZE, max_words: int = SEMANTIC_CACHE_MAX_WORDS,
+                 audit_path: str = SEMANTIC_CACHE_AUDIT_PATH):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_words = max_words
+        self.audit_path = audit_path
+        self._lock = threading.Lock()
+        # normalized utterance -> (unit vector, intent, expires_at)
+        self._learned = OrderedDict()
+        self._metrics = {"lookups": 0, "hits": 0, "exact_hits": 0, "misses": 0, "skipped": 0,
+                         "evictions": 0, "by_intent": {name: 0 for name in INTENTS}}
+
+        seeds, labels = [], []
+        for name, intent in INTENTS.items():
+            for example in intent["examples"]:
+                seeds.append(example.format(location=JOB_LOCATION))
+                labels.append(name)
+        for example in NEGATIVE_EXAMPLES:
+            seeds.append(example)
+            labels.append(None)
+        self._seed_labels = labels
+        self._seed_vectors = self._normalize(encode(seeds))
+
+    @staticmethod
+    def _normalize(vectors):
+        vectors = np.atleast_2d(np.asarray(vectors, dtype="float32"))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    @staticmethod
+    def _key(utterance: str) -> str:
+        return " ".join(utterance.lower().split()).rstrip("?.! ")
+
+    def _expire(self, now: float):
+        expired = [k for k, (_, _, expires_at) in self._learned.items() if expires_at <= now]
+        for k in expired:
+            del self._learned[k]
+        self._metrics["evictions"] += len(expired)
+
+    def _match(self, key: str, utterance: str) -> tuple:
+        """(intent or None, score, exact) for an utterance, learned entries first."""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            entry = self._learned.get(key)
+            if entry is not None:
+                self._learned.move_to_end(key)
+                return entry[1], 1.0, True
+            learned = list(self._learned.values())
+
+        vector = self._normalize(encode(utterance))[0]
+        seed_scores = self._seed_vectors @ vector
+        best = int(np.argmax(seed_scores))
+        intent, score = self._seed_labels[best], float(seed_scores[best])
+        if learned:
+            learned_scores = np.stack([v for v, _, _ in learned]) @ vector
+            i = int(np.argmax(learned_scores))
+            if learned_scores[i] > score:
+                intent, score = learned[i][1], float(learned_scores[i])
+
+        if intent is not None and score >= self.threshold:
+            with self._lock:
+                self._learned[key] = (vector, intent, now + self.ttl)
+                self._learned.move_to_end(key)
+                while len(self._learned) > self.maxsize:
+                    self._learned.popitem(last=False)
+                    self._metrics["evictions"] += 1
+        return intent, score, False
+
+    def lookup(self, utterance: str, candidate_name: str = None, session_id: str = None, phone: str = None):
+        """The templated answer for `utterance`, or None to fall back to the LLM."""
+        with self._lock:
+            self._metrics["lookups"] += 1
+        if not utterance or len(utterance.split()) > self.max_words:
+            with self._lock:
+                self._metrics["skipped"] += 1
+            return None
+
+        with span("semantic_cache") as sp:
+            intent, score, exact = self._match(self._key(utterance), utterance)
+            hit = intent is not None and score >= self.threshold
+            sp.set(hit=hit, intent=intent, score=round(score, 4))
+
+        with self._lock:
+            if not hit:
+                self._metrics["misses"] += 1
+                return None
+            self._metrics["hits"] += 1
+            self._metrics["exact_hits"] += exact
+            self._metrics["by_intent"][intent] += 1
+
+        first_name = (candidate_name or "").split()[0] if candidate_name else "there"
+        answer = INTENTS[intent]["template"].format(
+            first_name=first_name, company=COMPANY_NAME, location=JOB_LOCATION
+        )
+        self._audit(session_id, phone, utterance, intent, score, exact, answer)
+        return answer
+
+    def _audit(self, session_id, phone, utterance, intent, score, exact, answer):
+        if not self.audit_path:
+            return
+        os.makedirs(os.path.dirname(self.audit_path), exist_ok=True)
+        line = json.dumps({
+            "timestamp": datetime.now().isoformat(),
+            "session_id": session_id,
+            "phone": phone,
+            "utterance": utterance,
+            "intent": intent,
+            "score": round(score, 4),
+            "exact": exact,
+            "answer": answer,
+        }, ensure_ascii=False)
+        with self._lock, open(self.audit_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def stats(self) -> dict:
+        with self._lock:
+            metrics = dict(self._metrics, by_intent=dict(self._metrics["by_intent"]))
+            metrics["learned_entries"] = len(self._learned)
+        considered = metrics["hits"] + metrics["misses"]
+        metrics["hit_rate"] = round(metrics["hits"] / considered, 4) if considered else None
+        return metrics
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache():
+    """The process-wide cache when SEMANTIC_CACHE_ENABLED, else None."""
+    global _cache
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache()
+    return _cache
@@ -1,5 +1,6 @@
 import os
 from time import time
+from uuid import uuid4
 from dotenv import load_dotenv
 
 # LangChain and Groq LLM imports
@@ -9,80 +10,58 @@ from langchain_community.chat_message_histories import ChatMessageHistory
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
+from agent.category_scheduler import CATEGORY_SCHEDULER, CategoryScheduler
+from agent.intent_classifier import get_intent_classifier
+from agent.interview_plan import first_technical_question, seed_questions
+from agent.llm_cache import configure_llm_cache
+from agent.model_router import estimate_tokens, get_model_router
+from agent.tracing import traced
+
 load_dotenv()
 
 # In-memory store of chat histories per session
 session_store = {}
 # Tracks which categories have been used in a session
 category_history = {}
-
-# Dictionary of prompt templates for each technical question category
-CATEGORY_TEMPLATES = {
-    "tech_most_challenging_project": """You are a technical interviewer at XYZ. Use the candidate’s resume (below).
-Ask ONE broad question about the candidate’s most challenging project across their experience—such as what made it challenging, how they overcame obstacles, and what they learned. Return ONLY the single question, in plain text, no bullet points or numbering.
-
-Here is the resume for context:
+# Per-session resume-coverage schedulers (CATEGORY_SCHEDULER=adaptive)
+category_schedulers = {}
+
+# Static instructions shared by every technical turn. The prompt is laid out
+# from most to least stable -- this block, then the per-session resume, then the
+# chat history, then the per-turn category instruction -- so consecutive turns
+# share one long prefix that provider prompt caches can reuse.
+TECH_SYSTEM_PROMPT = """You are a technical interviewer at XYZ. The candidate's resume and the conversation so far are below.
+Each turn ends with an instruction describing the next question to ask. Follow it and ask ONE question.
+Return ONLY the single question, in plain text, no bullet points or numbering."""
+
+RESUME_CONTEXT_PROMPT = """Here is the resume for context:
 {resume}
-""",
-    "tech_project_deep_dive": """You are a technical interviewer at XYZ. Use the candidate’s resume (below).
-Ask ONE focused question about a specific project the candidate has listed, probing implementation details—such as architecture choices, libraries used, or performance considerations. Return ONLY the single question, in plain text, no bullet points or numbering.
+"""
 
-Here is the resume for context:
-{resume}
-""",
-    "tech_project_impact": """You are a technical interviewer at XYZ. Use the candidate’s resume (below).
-Ask ONE question about the measurable impact of a specific project the candidate listed—such as cost savings, efficiency gains, or performance improvements. Return ONLY the single question, in plain text, no bullet points or numbering.
-
-Here is the resume for context:
-{resume}
-""",
-    "tech_platform_choice": """You are a technical interviewer at XYZ. Use the candidate’s resume (below).
-Ask ONE question about why the candidate chose a particular platform or technology (for example, Firebase) over alternatives, probing their trade‐offs and decision criteria. Return ONLY the single question, in plain text, no bullet points or numbering.
+# Appended to a category instruction when the interview plan has seeds for it
+SEED_QUESTIONS_PROMPT = """
+Questions prepared for this candidate, which you may ask as they are or adapt to the conversation (never repeat one already asked):
+{questions}"""
 
-Here is the resume for context:
-{resume}
-""",
-    "tech_scalability_decision": """You are a technical interviewer at XYZ. Use the candidate’s resume (below).
-Ask ONE question about how the candidate designed their system or data pipeline to scale—specifically, how they balanced throughput, latency, and resource costs. Return ONLY the single question, in plain text, no bullet points or numbering.
-
-Here is the resume for context:
-{resume}
-""",
-    "tech_error_handling_followup": """You are a technical interviewer at XYZ. The candidate answered: "{last_response}".
-Ask ONE targeted follow‐up question about their approach to error handling or missing data in that scenario. Return ONLY the single question, in plain text, no bullet points or numbering.
-""",
-    "tech_performance_tuning": """You are a technical interviewer at XYZ. Use the candidate’s resume (below).
-Ask ONE question about how the candidate identified and optimized a performance bottleneck—such as in a database query, data processing job, or front‐end rendering. Return ONLY the single question, in plain text, no bullet points or numbering.
-
-Here is the resume for context:
-{resume}
-""",
-    "tech_function_design": """You are a technical interviewer at XYZ. Use the candidate’s resume (below).
-Ask ONE question about how the candidate would design a particular function or module related to their stated skills (e.g., data processing, API endpoint, algorithm). Inquire about inputs, outputs, and error handling. Return ONLY the single question, in plain text, no bullet points or numbering.
-
-Here is the resume for context:
-{resume}
-""",
-    "tech_syntax_and_language": """You are a technical interviewer at XYZ. Use the candidate’s resume (below).
-Ask ONE question testing the candidate’s knowledge of syntax or idioms in a language they listed (e.g., Python list comprehensions, JavaScript async/await, SQL JOINs). Return ONLY the single question, in plain text, no bullet points or numbering.
-
-Here is the resume for context:
-{resume}
-""",
-    "tech_problem_solving": """You are a technical interviewer at XYZ. Use the candidate’s resume (below).
-Ask ONE concise, problem‐solving question that requires the candidate to outline their approach to solving a real‐world scenario relevant to their role or projects (e.g., scaling a service, debugging a memory leak). Return ONLY the single question, in plain text, no bullet points or numbering.
-
-Here is the resume for context:
-{resume}
-""",
-    "tech_education_application": """You are a technical interviewer at XYZ. Use the candidate’s resume (below).
-Ask ONE question that connects the candidate’s formal education to practical application—such as applying a data structure, mathematical concept, or theory they learned during their degree. Return ONLY the single question, in plain text, no bullet points or numbering.
-
-Here is the resume for context:
-{resume}
-""",
+# Per-turn instruction for each technical question category
+CATEGORY_TEMPLATES = {
+    "tech_most_challenging_project": """Use the candidate’s resume. Ask ONE broad question about the candidate’s most challenging project across their experience—such as what made it challenging, how they overcame obstacles, and what they learned.""",
+    "tech_project_deep_dive": """Use the candidate’s resume. Ask ONE focused question about a specific project the candidate has listed, probing implementation details—such as architecture choices, libraries used, or performance considerations.""",
+    "tech_project_impact": """Use the candidate’s resume. Ask ONE question about the measurable impact of a specific project the candidate listed—such as cost savings, efficiency gains, or performance improvements.""",
+    "tech_platform_choice": """Use the candidate’s resume. Ask ONE question about why the candidate chose a particular platform or technology (for example, Firebase) over alternatives, probing their trade‐offs and decision criteria.""",
+    "tech_scalability_decision": """Use the candidate’s resume. Ask ONE question about how the candidate designed their system or data pipeline to scale—specifically, how they balanced throughput, latency, and resource costs.""",
+    "tech_error_handling_followup": """The candidate answered: "{last_response}".
+Ask ONE targeted follow‐up question about their approach to error handling or missing data in that scenario.""",
+    "tech_performance_tuning": """Use the candidate’s resume. Ask ONE question about how the candidate identified and optimized a performance bottleneck—such as in a database query, data processing job, or front‐end rendering.""",
+    "tech_function_design": """Use the candidate’s resume. Ask ONE question about how the candidate would design a particular function or module related to their stated skills (e.g., data processing, API endpoint, algorithm). Inquire about inputs, outputs, and error handling.""",
+    "tech_syntax_and_language": """Use the candidate’s resume. Ask ONE question testing the candidate’s knowledge of syntax or idioms in a language they listed (e.g., Python list comprehensions, JavaScript async/await, SQL JOINs).""",
+    "tech_problem_solving": """Use the candidate’s resume. Ask ONE concise, problem‐solving question that requires the candidate to outline their approach to solving a real‐world scenario relevant to their role or projects (e.g., scaling a service, debugging a memory leak).""",
+    "tech_education_application": """Use the candidate’s resume. Ask ONE question that connects the candidate’s formal education to practical application—such as applying a data structure, mathematical concept, or theory they learned during their degree.""",
 }
 
+# Categories that build on the candidate's last answer (routed as "followup", the rest as "deep_technical")
+FOLLOWUP_CATEGORIES = {"tech_error_handling_followup"}
+
 # Initialize Groq LLM
 llm = ChatGroq(
     temperature=0.3,
@@ -90,6 +69,9 @@ llm = ChatGroq(
     model_name=os.getenv("GROQ_MODEL_NAME")
 )
 
+# Optional local response cache (LLM_RESPONSE_CACHE); no-op when unset
+configure_llm_cache()
+
 def get_session_history(session_id: str) -> ChatMessageHistory:
     """Retrieve or create chat history for the given session."""
     if session_id not in session_store:
@@ -106,7 +88,9 @@ def _escape_braces(text: str) -> str:
 def choose_next_category(session_id: str) -> str:
     """
     Pick the next technical question category, avoiding immediate repeats
-    and limiting back-to-back project questions.
+    and limiting back-to-back project questions. Among the allowed categories the
+    session's scheduler, when there is one, picks the one its resume covers best;
+    otherwise the first in a fixed order is used.
     """
     all_categories = [
         "tech_syntax_and_language",
@@ -142,100 +126,146 @@ def choose_next_category(session_id: str) -> str:
     if not candidates:
         candidates = [c for c in all_categories if c != last_cat]
 
-    next_cat = candidates[0]
+    scheduler = category_schedulers.get(session_id)
+    next_cat = scheduler.pick(candidates) if scheduler else candidates[0]
     category_history.setdefault(session_id, []).append(next_cat)
     return next_cat
 
-def build_category_prompt(category: str, resume: str, last_response: str) -> ChatPromptTemplate:
+@traced("build_prompt")
+def build_category_prompt(category: str, resume: str, last_response: str, seeds: list = None) -> ChatPromptTemplate:
     """
-    Build a ChatPromptTemplate for the selected category, filling in resume and last response.
+    Build a ChatPromptTemplate for the selected category: shared instructions,
+    the resume, the chat history and finally this turn's category instruction,
+    followed by the interview plan's `seeds` for the category, if any.
     We must escape braces in 'resume' and 'last_response' so that str.format() won't misinterpret JSON.
     """
-    template_text = CATEGORY_TEMPLATES[category]
-
     # Escape braces in resume and last_response
     esc_resume = _escape_braces(resume)
     esc_last = _escape_braces(last_response)
 
-    # Format once to inject the escaped resume (and last_response, if needed)
-    filled = template_text.format(resume=esc_resume, last_response=esc_last)
+    # Format once to inject the escaped resume / last_response; the escaped braces
+    # survive as literals when ChatPromptTemplate parses the result
+    resume_context = RESUME_CONTEXT_PROMPT.format(resume=esc_resume)
+    instruction = CATEGORY_TEMPLATES[category].format(last_response=esc_last)
+    if seeds:
+        questions = "\n".join(f"- {_escape_braces(q)}" for q in seeds)
+        instruction += SEED_QUESTIONS_PROMPT.format(questions=questions)
 
     return ChatPromptTemplate.from_messages([
-        ("system", filled),
+        ("system", TECH_SYSTEM_PROMPT),
+        ("system", resume_context),
         MessagesPlaceholder(variable_name="chat_history"),
-        ("human", "{input}")
+        ("human", instruction)
     ])
 
-def interview_loop(resume_text: str, general_history: list) -> str:
+def interview_loop(resume_text: str, general_history: list, context_retriever=None, on_turn=None,
+                   input_fn=input, interview_plan: dict = None) -> str:
     """
     Main loop for the technical interview. Receives:
       - resume_text: the full text of the candidate’s resume
       - general_history: a list of dicts {speaker, text, timestamp}
+      - context_retriever: optional callable(query) -> str returning the resume
+        excerpts most relevant to the candidate's last answer (e.g. hybrid search);
+        when it returns text, that replaces the full resume in the prompt
+      - on_turn: optional callable(speaker, text) invoked for every turn as it happens
+      - input_fn: callable(prompt) -> str supplying the candidate's answers
+        (defaults to input(); scripted runs pass their own)
+      - interview_plan: optional plan from agent.interview_plan; its seed question
+        for the most challenging project opens the interview, and each later
+        turn's prompt offers the seeds of the category picked for it
     1. Seed the session history with all general_history messages.
     2. Ask an initial project question.
-    3. Iteratively choose categories and ask follow‐up technical questions.
-    4. When the candidate says “exit” or “bye,” stop.
+    3. Iteratively choose categories (by resume coverage, see agent/category_scheduler.py)
+       and ask follow‐up technical questions.
+    4. When the candidate asks to stop (“bye”, “let's end here”), stop.
     5. Return this technical session’s session_id.
     """
-    session_id = f"tech_{int(time())}"
+    on_turn = on_turn or (lambda speaker, text: None)
+    intent_classifier = get_intent_classifier()
+    model_router = get_model_router()
+    session_id = f"tech_{int(time())}_{uuid4().hex[:8]}"
     session_hist = get_session_history(session_id)
-
-    # Seed the history with the general‐interview messages
-    for entry in general_history:
-        sp = entry["speaker"]
-        txt = entry["text"]
-        if sp.lower() == "system":
-            session_hist.add_message(SystemMessage(content=txt))
-        elif sp.lower() in ["ai", "assistant"]:
-            session_hist.add_message(AIMessage(content=txt))
-        else:
-            session_hist.add_message(HumanMessage(content=txt))
-
-    # Print a welcome message
-    print("\nAI: Thank you. Now moving on to the technical portion.\n")
-
-    # Ask the first question manually (most challenging project)
-    initial_question = (
-        "Based on your resume, can you explain the most technically challenging project you've worked on, "
-        "including any architecture or design decisions?"
-    )
-    session_hist.add_message(AIMessage(content=initial_question))
-    print("AI:", initial_question)
-
-    while True:
-        user_input = input("\nYou: ").strip()
-        if not user_input:
-            continue
-        if user_input.lower() in ["no", "exit", "quit", "bye"]:
-            print("\nAI: Thank you for your time. The technical interview is now complete.")
-            break
-
-        # Add candidate response to history
-        session_hist.add_message(HumanMessage(content=user_input))
-
-        # Pick the next category
-        next_category = choose_next_category(session_id)
-
-        # Build a prompt for that category
-        prompt = build_category_prompt(next_category, resume_text, user_input)
-        chain = prompt | llm
-        runnable = RunnableWithMessageHistory(
-            chain,
-            get_session_history,
-            input_messages_key="input",
-            history_messages_key="chat_history"
-        )
-
-        # Invoke LLM with empty human input (the system prompt already contains instructions)
-        response = runnable.invoke(
-            {"input": ""},
-            config={"configurable": {"session_id": session_id}}
-        )
-        ai_text = response.content.strip()
-        session_hist.add_message(AIMessage(content=ai_text))
-
-        # Print the AI’s generated question
-        print("\nAI:", ai_text)
+    if CATEGORY_SCHEDULER == "adaptive":
+        # Coverage of resume sections by each category, computed once per session
+        category_schedulers[session_id] = CategoryScheduler(resume_text)
+
+    try:
+        # Seed the history with the general‐interview messages
+        for entry in general_history:
+            sp = entry["speaker"]
+            txt = entry["text"]
+            if sp.lower() == "system":
+                session_hist.add_message(SystemMessage(content=txt))
+            elif sp.lower() in ["ai", "assistant"]:
+                session_hist.add_message(AIMessage(content=txt))
+            else:
+                session_hist.add_message(HumanMessage(content=txt))
+
+        # Print a welcome message
+        print("\nAI: Thank you. Now moving on to the technical portion.\n")
+
+        # Ask the first question without the LLM: the plan's project-grounded seed, or a generic one
+        initial_question = first_technical_question(interview_plan)
+        session_hist.add_message(AIMessage(content=initial_question))
+        if session_id in category_schedulers:
+            category_schedulers[session_id].record("tech_most_challenging_project")
+        print("AI:", initial_question)
+        on_turn("ai", initial_question)
+
+        while True:
+            user_input = input_fn("\nYou: ").strip()
+            if not user_input:
+                continue
+            on_turn("human", user_input)
+            # Only an explicit wish to stop ends the interview; "no" as an answer doesn't
+            if intent_classifier.is_exit(user_input):
+                print("\nAI: Thank you for your time. The technical interview is now complete.")
+                on_turn("ai", "Thank you for your time. The technical interview is now complete.")
+                break
+
+            # Add candidate response to history
+            session_hist.add_message(HumanMessage(content=user_input))
+
+            # Pick the next category
+            next_category = choose_next_category(session_id)
+
+            # Build a prompt for that category, grounded in retrieved context when available
+            context = context_retriever(user_input) if context_retriever else ""
+            grounding = context or resume_text
+            prompt = build_category_prompt(next_category, grounding, user_input,
+                                           seed_questions(interview_plan, next_category))
+
+            def build_runnable(model):
+                return RunnableWithMessageHistory(
+                    prompt | model,
+                    get_session_history,
+                    input_messages_key="input",
+                    history_messages_key="chat_history"
+                )
+
+            # Invoke LLM with empty human input (the category instruction is the prompt's last message).
+            # Follow-ups on the last answer can go to the small model; new questions need the large one.
+            response = model_router.invoke(
+                "followup" if next_category in FOLLOWUP_CATEGORIES else "deep_technical",
+                "llm.technical",
+                build_runnable,
+                {"input": ""},
+                config={"configurable": {"session_id": session_id}},
+                default=llm,
+                prompt_tokens=estimate_tokens(
+                    TECH_SYSTEM_PROMPT, grounding, *(m.content for m in session_hist.messages)
+                ),
+                category=next_category
+            )
+            ai_text = response.content.strip()
+            session_hist.add_message(AIMessage(content=ai_text))
+
+            # Print the AI’s generated question
+            print("\nAI:", ai_text)
+            on_turn("ai", ai_text)
+    finally:
+        # The scheduler is only needed while the session runs
+        category_schedulers.pop(session_id, None)
 
     # Do NOT save here. Return session_id so the manager can fetch history later.
     return session_id
@@ -0,0 +1,300 @@
+import os
+import json
+import time
+import functools
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+from langchain_core.globals import get_llm_cache
+
+load_dotenv()
+
+# Tracing is off unless TRACING_ENABLED=true; span() then returns a shared no-op
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACE_EXPORT_PATH = os.getenv(
+    "TRACE_EXPORT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces", "spans.jsonl")
+)
+# Serve Prometheus text metrics on this port when set (e.g. 9464)
+TRACE_PROMETHEUS_PORT = os.getenv("TRACE_PROMETHEUS_PORT")
+
+# Per-stage samples kept for percentiles
+MAX_SAMPLES = 10000
+
+_lock = threading.Lock()
+_local = threading.local()
+_stats = {}
+_export_file = None
+_listeners = []
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """A timed stage. Nested spans record their parent's name."""
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.parent = None
+        self.start = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self.start) * 1000
+        _local.stack.pop()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _record(self, duration_ms)
+        return False
+
+
+def span(name: str, **attrs):
+    """Context manager timing one stage: `with span("vector_query", top_k=1): ...`."""
+    if not TRACING_ENABLED:
+        return _NOOP_SPAN
+    return Span(name, attrs)
+
+
+def traced(name: str):
+    """Decorator form of span() for whole functions."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACING_ENABLED:
+                return fn(*args, **kwargs)
+            with Span(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def enable(export_path: str = None):
+    """Turn tracing on. `export_path` overrides TRACE_EXPORT_PATH; "" disables the JSONL export."""
+    global TRACING_ENABLED, TRACE_EXPORT_PATH
+    TRACING_ENABLED = True
+    if export_path is not None:
+        TRACE_EXPORT_PATH = export_path
+
+
+def disable():
+    global TRACING_ENABLED
+    TRACING_ENABLED = False
+
+
+def add_listener(callback):
+    """Call callback(record) with each finished span's record, in the thread that ran it."""
+    _listeners.append(callback)
+
+
+def remove_listener(callback):
+    if callback in _listeners:
+        _listeners.remove(callback)
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def _record(sp: Span, duration_ms: float):
+    global _export_file
+    with _lock:
+        stage = _stats.setdefault(sp.name, {
+            "count": 0, "total_ms": 0.0, "samples": [], "errors": 0,
+            "tokens_in": 0, "tokens_out": 0, "tokens_cached": 0, "ttft_samples": [],
+        })
+        stage["count"] += 1
+        stage["total_ms"] += duration_ms
+        if len(stage["samples"]) < MAX_SAMPLES:
+            stage["samples"].append(duration_ms)
+        if "error" in sp.attrs:
+            stage["errors"] += 1
+        stage["tokens_in"] += sp.attrs.get("tokens_in", 0)
+        stage["tokens_out"] += sp.attrs.get("tokens_out", 0)
+        stage["tokens_cached"] += sp.attrs.get("tokens_cached", 0)
+        if "ttft_ms" in sp.attrs and len(stage["ttft_samples"]) < MAX_SAMPLES:
+            stage["ttft_samples"].append(sp.attrs["ttft_ms"])
+
+        if not TRACE_EXPORT_PATH and not _listeners:
+            return
+        record = {
+            "name": sp.name,
+            "parent": sp.parent,
+            "duration_ms": round(duration_ms, 3),
+            "timestamp": datetime.now().isoformat(),
+            "pid": os.getpid(),
+            **sp.attrs,
+        }
+        if TRACE_EXPORT_PATH:
+            if _export_file is None:
+                os.makedirs(os.path.dirname(TRACE_EXPORT_PATH), exist_ok=True)
+                _export_file = open(TRACE_EXPORT_PATH, "a", encoding="utf-8")
+            _export_file.write(json.dumps(record, default=str) + "\n")
+            _export_file.flush()
+
+    for callback in list(_listeners):
+        callback(record)
+
+
+def token_usage(message) -> tuple:
+    """(tokens_in, tokens_out, tokens_cached) from a LangChain message; None where unreported."""
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        cached = (usage.get("input_token_details") or {}).get("cache_read")
+        return usage.get("input_tokens"), usage.get("output_tokens"), cached
+    reported = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    if reported:
+        cached = (reported.get("prompt_tokens_details") or {}).get("cached_tokens")
+        return reported.get("prompt_tokens"), reported.get("completion_tokens"), cached
+    return None, None, None
+
+
+def traced_invoke(name: str, runnable, inputs: dict, config: dict = None, **attrs):
+    """
+    runnable.invoke() with an LLM span. When tracing is on the call is streamed
+    so time-to-first-token can be measured; the chunks are merged back into one
+    message, so callers see the same result either way. LangChain's response
+    cache only applies to invoke(), so with a cache installed the call is not
+    streamed and time-to-first-token is the full call.
+    """
+    if not TRACING_ENABLED:
+        return runnable.invoke(inputs, config=config)
+
+    with span(name, **attrs) as sp:
+        start = time.perf_counter()
+        if get_llm_cache() is not None:
+            message = runnable.invoke(inputs, config=config)
+            sp.set(ttft_ms=round((time.perf_counter() - start) * 1000, 3))
+        else:
+            message = None
+            for chunk in runnable.stream(inputs, config=config):
+                if message is None:
+                    sp.set(ttft_ms=round((time.perf_counter() - start) * 1000, 3))
+                    message = chunk
+                else:
+                    message = message + chunk
+        tokens_in, tokens_out, tokens_cached = token_usage(message)
+        if tokens_out is None:
+            # Provider sent no usage on the stream; ~4 characters per token
+            tokens_out = len(getattr(message, "content", "") or "") // 4
+            sp.set(tokens_estimated=True)
+        sp.set(tokens_in=tokens_in or 0, tokens_out=tokens_out, tokens_cached=tokens_cached or 0)
+        return message
+
+
+def _percentile(samples: list, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+def summary() -> list:
+    """One row per stage: count, p50/p95/total ms, tokens (in/out/prompt-cached) and median time-to-first-token."""
+    with _lock:
+        return [
+            {
+                "stage": name,
+                "count": s["count"],
+                "p50_ms": _percentile(s["samples"], 0.5),
+                "p95_ms": _percentile(s["samples"], 0.95),
+                "total_ms": s["total_ms"],
+                "errors": s["errors"],
+                "tokens_in": s["tokens_in"],
+                "tokens_out": s["tokens_out"],
+                "tokens_cached": s["tokens_cached"],
+                "ttft_p50_ms": _percentile(s["ttft_samples"], 0.5) if s["ttft_samples"] else None,
+            }
+            for name, s in sorted(_stats.items(), key=lambda kv: kv[1]["total_ms"], reverse=True)
+        ]
+
+
+def print_summary():
+    rows = summary()
+    if not rows:
+        return
+    header = (f"{'stage':<24} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'total ms':>10} "
+              f"{'tok in':>8} {'tok out':>8} {'cached':>8} {'ttft ms':>8}")
+    print("\n===== Latency Summary =====")
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        ttft = f"{r['ttft_p50_ms']:.1f}" if r["ttft_p50_ms"] is not None else "-"
+        print(f"{r['stage']:<24} {r['count']:>6} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['total_ms']:>10.1f} "
+              f"{r['tokens_in']:>8} {r['tokens_out']:>8} {r['tokens_cached']:>8} {ttft:>8}")
+
+
+def prometheus_text() -> str:
+    """Current aggregates in the Prometheus text exposition format."""
+    lines = [
+        "# TYPE rag_agent_stage_duration_seconds summary",
+    ]
+    rows = summary()
+    for r in rows:
+        label = f'stage="{r["stage"]}"'
+        lines.append(f'rag_agent_stage_duration_seconds{{{label},quantile="0.5"}} {r["p50_ms"] / 1000:.6f}')
+        lines.append(f'rag_agent_stage_duration_seconds{{{label},quantile="0.95"}} {r["p95_ms"] / 1000:.6f}')
+        lines.append(f'rag_agent_stage_duration_seconds_sum{{{label}}} {r["total_ms"] / 1000:.6f}')
+        lines.append(f'rag_agent_stage_duration_seconds_count{{{label}}} {r["count"]}')
+    lines.append("# TYPE rag_agent_stage_errors_total counter")
+    lines += [f'rag_agent_stage_errors_total{{stage="{r["stage"]}"}} {r["errors"]}' for r in rows]
+    lines.append("# TYPE rag_agent_llm_tokens_total counter")
+    for r in rows:
+        if r["tokens_in"] or r["tokens_out"]:
+            lines.append(f'rag_agent_llm_tokens_total{{stage="{r["stage"]}",direction="in"}} {r["tokens_in"]}')
+            lines.append(f'rag_agent_llm_tokens_total{{stage="{r["stage"]}",direction="out"}} {r["tokens_out"]}')
+            lines.append(f'rag_agent_llm_tokens_total{{stage="{r["stage"]}",direction="cached"}} {r["tokens_cached"]}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_prometheus(port: int) -> ThreadingHTTPServer:
+    """Expose /metrics on localhost:<port> from a daemon thread."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if TRACING_ENABLED and TRACE_PROMETHEUS_PORT:
+    serve_prometheus(int(TRACE_PROMETHEUS_PORT))
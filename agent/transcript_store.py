@@ -0,0 +1,407 @@
+"""
+Append-only interview transcript store.
+
+Layout under TRANSCRIPT_DIR:
+    active/<writer>.jsonl          turns being written by a live interview (one line per turn)
+    segments/<writer>-<n>.jsonl.gz sealed, compressed, immutable segments
+    manifest.jsonl                 one line per sealed segment: sessions, candidates, time range
+
+Writers append and flush every turn, fsync in batches, and seal (gzip) their
+segment when it grows past a size limit or the interview ends. Readers prune
+segments with the manifest and stream matching turns line by line.
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import uuid
+import shutil
+import socket
+import argparse
+from datetime import datetime
+
+TRANSCRIPT_DIR = os.getenv(
+    "TRANSCRIPT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "conversations", "transcripts")
+)
+
+
+# Latest timestamp of every precision, used to pad `until` bounds
+_END_OF_PERIOD = "9999-12-31T23:59:59.999999"
+
+
+def _to_iso(value, end: bool = False) -> str:
+    """
+    ISO string for a date/time bound. With `end`, a partial bound covers its
+    whole period: "2025-06-30" becomes "2025-06-30T23:59:59.999999", so
+    `until` stays inclusive under string comparison.
+    """
+    if value is None or isinstance(value, datetime):
+        return value and value.isoformat()
+    value = value if isinstance(value, str) else value.isoformat()
+    if end and len(value) < len(_END_OF_PERIOD) and not any(c in value[10:] for c in "+-Z"):
+        value += _END_OF_PERIOD[len(value):]
+    return value
+
+
+def _append_line(path: str, entry: dict):
+    """Single O_APPEND write, so concurrent writers never interleave manifest lines."""
+    data = (json.dumps(entry) + "\n").encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class TranscriptWriter:
+    """Appends turns for one process; safe to run many writers on the same directory."""
+
+    def __init__(self, root: str = TRANSCRIPT_DIR, max_segment_bytes: int = 8 * 1024 * 1024,
+                 fsync_every: int = 16, fsync_interval: float = 2.0):
+        self.root = root
+        self.max_segment_bytes = max_segment_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.writer_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._segment_no = 0
+        self._file = None
+        self._stats = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        os.makedirs(os.path.join(root, "active"), exist_ok=True)
+        os.makedirs(os.path.join(root, "segments"), exist_ok=True)
+
+    @property
+    def active_path(self) -> str:
+        return os.path.join(self.root, "active", f"{self.writer_id}-{self._segment_no}.jsonl")
+
+    def _open(self):
+        self._file = open(self.active_path, "a", encoding="utf-8")
+        self._stats = {"records": 0, "min_ts": None, "max_ts": None, "sessions": set(), "candidates": set()}
+
+    def append(self, session_id: str, speaker: str, text: str, phone: str = None,
+               name: str = None, stage: str = None, timestamp: str = None) -> dict:
+        """Write one turn. The line reaches the OS immediately; fsync is batched."""
+        if self._file is None:
+            self._open()
+        record = {
+            "session_id": session_id,
+            "phone": phone,
+            "name": name,
+            "stage": stage,
+            "speaker": speaker,
+            "text": text,
+            "timestamp": timestamp or datetime.now().isoformat(),
+        }
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+        stats = self._stats
+        stats["records"] += 1
+        stats["sessions"].add(session_id)
+        if phone:
+            stats["candidates"].add(phone)
+        ts = record["timestamp"]
+        stats["min_ts"] = ts if stats["min_ts"] is None else min(stats["min_ts"], ts)
+        stats["max_ts"] = ts if stats["max_ts"] is None else max(stats["max_ts"], ts)
+
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+        if self._file.tell() >= self.max_segment_bytes:
+            self.rotate()
+        return record
+
+    def sync(self):
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def rotate(self):
+        """Seal the active segment: gzip it, record it in the manifest, start a new one."""
+        if self._file is None:
+            return
+        self.sync()
+        self._file.close()
+        self._file = None
+        if self._stats["records"]:
+            seal_segment(self.root, self.active_path, self._stats)
+        else:
+            os.remove(self.active_path)
+        self._segment_no += 1
+
+    def close(self):
+        self.rotate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _scan_stats(path: str) -> dict:
+    stats = {"records": 0, "min_ts": None, "max_ts": None, "sessions": set(), "candidates": set()}
+    for record in _iter_file(path):
+        stats["records"] += 1
+        stats["sessions"].add(record["session_id"])
+        if record.get("phone"):
+            stats["candidates"].add(record["phone"])
+        ts = record["timestamp"]
+        stats["min_ts"] = ts if stats["min_ts"] is None else min(stats["min_ts"], ts)
+        stats["max_ts"] = ts if stats["max_ts"] is None else max(stats["max_ts"], ts)
+    return stats
+
+
+def seal_segment(root: str, source_path: str, stats: dict = None) -> str:
+    """Compress a finished .jsonl file into segments/ and add its manifest entry."""
+    stats = stats or _scan_stats(source_path)
+    name = os.path.basename(source_path)
+    if name.endswith(".jsonl"):
+        name = name[:-len(".jsonl")]
+    target = os.path.join(root, "segments", f"{name}.jsonl.gz")
+    tmp = f"{target}.tmp"
+    with open(source_path, "rb") as src, gzip.open(tmp, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp, target)
+    _append_line(os.path.join(root, "manifest.jsonl"), {
+        "op": "add",
+        "file": os.path.basename(target),
+        "records": stats["records"],
+        "min_ts": stats["min_ts"],
+        "max_ts": stats["max_ts"],
+        "sessions": sorted(stats["sessions"]),
+        "candidates": sorted(stats["candidates"]),
+    })
+    os.remove(source_path)
+    return target
+
+
+def _iter_file(path: str):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A crash can leave a partial last line in an active segment
+                continue
+
+
+class TranscriptReader:
+    """Streams turns from sealed and active segments, pruning with the manifest."""
+
+    def __init__(self, root: str = TRANSCRIPT_DIR):
+        self.root = root
+
+    def _manifest(self) -> list:
+        path = os.path.join(self.root, "manifest.jsonl")
+        if not os.path.exists(path):
+            return []
+        entries, removed = {}, set()
+        for entry in _iter_file(path):
+            if entry.get("op") == "remove":
+                removed.update(entry["files"])
+            else:
+                entries[entry["file"]] = entry
+        return [e for name, e in entries.items() if name not in removed]
+
+    def _segment_matches(self, entry, candidate, session_id, since, until) -> bool:
+        if session_id and session_id not in entry["sessions"]:
+            return False
+        # The manifest indexes phones; name lookups have to scan
+        if candidate and candidate.isdigit() and candidate not in entry["candidates"]:
+            return False
+        if since and entry["max_ts"] and entry["max_ts"] < since:
+            return False
+        if until and entry["min_ts"] and entry["min_ts"] > until:
+            return False
+        return True
+
+    def _plan(self, candidate=None, session_id=None, since=None, until=None) -> list:
+        """Ordered (path, sessions-or-None) list of segments that may hold matching turns."""
+        plan = [
+            (os.path.join(self.root, "segments", e["file"]), set(e["sessions"]))
+            for e in sorted(self._manifest(), key=lambda e: (e["min_ts"] or "", e["file"]))
+            if self._segment_matches(e, candidate, session_id, since, until)
+        ]
+        active_dir = os.path.join(self.root, "active")
+        if os.path.isdir(active_dir):
+            # Unsealed segments (live or crashed interviews) have no manifest entry yet
+            plan += [(os.path.join(active_dir, n), None) for n in sorted(os.listdir(active_dir)) if n.endswith(".jsonl")]
+        return plan
+
+    def iter_turns(self, candidate: str = None, session_id: str = None, since=None, until=None):
+        """Yield matching turn records. `candidate` matches the phone or the name."""
+        since, until = _to_iso(since), _to_iso(until, end=True)
+        for path, _ in self._plan(candidate, session_id, since, until):
+            try:
+                for record in _iter_file(path):
+                    if session_id and record["session_id"] != session_id:
+                        continue
+                    if candidate and candidate not in (record.get("phone"), record.get("name")):
+                        continue
+                    if since and record["timestamp"] < since:
+                        continue
+                    if until and record["timestamp"] > until:
+                        continue
+                    yield record
+            except FileNotFoundError:
+                # Sealed or compacted while we were planning
+                continue
+
+    def iter_sessions(self, candidate: str = None, session_id: str = None, since=None, until=None):
+        """
+        Yield (session_id, [turns]) per interview. A session is emitted as soon as
+        no later segment can contain more of its turns, so memory stays bounded.
+        """
+        since, until = _to_iso(since), _to_iso(until, end=True)
+        plan = self._plan(candidate, session_id, since, until)
+        pending = {}
+        for i, (path, _) in enumerate(plan):
+            try:
+                for record in _iter_file(path):
+                    if session_id and record["session_id"] != session_id:
+                        continue
+                    if candidate and candidate not in (record.get("phone"), record.get("name")):
+                        continue
+                    if since and record["timestamp"] < since:
+                        continue
+                    if until and record["timestamp"] > until:
+                        continue
+                    pending.setdefault(record["session_id"], []).append(record)
+            except FileNotFoundError:
+                continue
+            later = plan[i + 1:]
+            if any(sessions is None for _, sessions in later):
+                continue
+            still_open = set().union(*(sessions for _, sessions in later)) if later else set()
+            for sid in [s for s in pending if s not in still_open]:
+                yield sid, pending.pop(sid)
+        for sid, turns in pending.items():
+            yield sid, turns
+
+    def load_session(self, session_id: str) -> list:
+        return list(self.iter_turns(session_id=session_id))
+
+
+def seal_orphaned(root: str = TRANSCRIPT_DIR, older_than: float = 3600) -> int:
+    """Seal active segments left behind by crashed interviews (untouched for `older_than` seconds)."""
+    active_dir = os.path.join(root, "active")
+    if not os.path.isdir(active_dir):
+        return 0
+    sealed = 0
+    for name in os.listdir(active_dir):
+        path = os.path.join(active_dir, name)
+        if name.endswith(".jsonl") and time.time() - os.path.getmtime(path) > older_than:
+            seal_segment(root, path)
+            sealed += 1
+    return sealed
+
+
+def compact(root: str = TRANSCRIPT_DIR, small_bytes: int = 256 * 1024, target_bytes: int = 8 * 1024 * 1024) -> int:
+    """
+    Merge small sealed segments (typically one per interview) into larger ones so
+    bulk reports open few files. Returns the number of segments merged.
+    """
+    reader = TranscriptReader(root)
+    seg_dir = os.path.join(root, "segments")
+    small = [
+        e for e in sorted(reader._manifest(), key=lambda e: (e["min_ts"] or "", e["file"]))
+        if os.path.exists(os.path.join(seg_dir, e["file"]))
+        and os.path.getsize(os.path.join(seg_dir, e["file"])) < small_bytes
+    ]
+    merged = 0
+    while len(small) > 1:
+        group, size = [], 0
+        while small and size < target_bytes:
+            entry = small.pop(0)
+            group.append(entry)
+            size += os.path.getsize(os.path.join(seg_dir, entry["file"]))
+        if len(group) < 2:
+            break
+        out_name = f"compact-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.jsonl.gz"
+        tmp = os.path.join(seg_dir, f"{out_name}.tmp")
+        with gzip.open(tmp, "wb") as dst:
+            for entry in group:
+                with gzip.open(os.path.join(seg_dir, entry["file"]), "rb") as src:
+                    shutil.copyfileobj(src, dst)
+        os.replace(tmp, os.path.join(seg_dir, out_name))
+        manifest = os.path.join(root, "manifest.jsonl")
+        _append_line(manifest, {
+            "op": "add",
+            "file": out_name,
+            "records": sum(e["records"] for e in group),
+            "min_ts": min(e["min_ts"] for e in group if e["min_ts"]),
+            "max_ts": max(e["max_ts"] for e in group if e["max_ts"]),
+            "sessions": sorted(set().union(*(e["sessions"] for e in group))),
+            "candidates": sorted(set().union(*(e["candidates"] for e in group))),
+        })
+        _append_line(manifest, {"op": "remove", "files": [e["file"] for e in group]})
+        for entry in group:
+            os.remove(os.path.join(seg_dir, entry["file"]))
+        merged += len(group)
+    return merged
+
+
+def import_legacy_json(folder: str, root: str = TRANSCRIPT_DIR) -> int:
+    """Load old agent/conversations/{Name}-{Phone}.json files into the store."""
+    count = 0
+    with TranscriptWriter(root) as writer:
+        for name in sorted(os.listdir(folder)):
+            if not name.endswith(".json"):
+                continue
+            stem = name[:-len(".json")]
+            cand_name, _, phone = stem.rpartition("-")
+            with open(os.path.join(folder, name), "r", encoding="utf-8") as f:
+                turns = json.load(f)
+            session_id = f"legacy_{stem}"
+            for turn in turns:
+                writer.append(session_id, turn["speaker"], turn["text"], phone=phone,
+                              name=cand_name.replace("_", " "), timestamp=turn.get("timestamp"))
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query and maintain the interview transcript store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="Print matching sessions.")
+    show.add_argument("--candidate", help="Phone number or name.")
+    show.add_argument("--session")
+    show.add_argument("--since", help="ISO date/time, inclusive.")
+    show.add_argument("--until", help="ISO date/time, inclusive.")
+    sub.add_parser("compact", help="Seal orphaned segments and merge small ones.")
+    legacy = sub.add_parser("import-legacy", help="Import per-interview JSON files.")
+    legacy.add_argument("folder", nargs="?", default=os.path.dirname(TRANSCRIPT_DIR))
+    args = parser.parse_args()
+
+    if args.command == "show":
+        reader = TranscriptReader()
+        found = 0
+        for session_id, turns in reader.iter_sessions(args.candidate, args.session, args.since, args.until):
+            found += 1
+            first = turns[0]
+            print(f"\n===== {session_id} | {first.get('name')} ({first.get('phone')}) | {first['timestamp']} =====")
+            for turn in turns:
+                print(f"[{turn.get('stage') or '-'}] {turn['speaker']}: {turn['text']}")
+        if not found:
+            print("No matching transcripts.")
+            sys.exit(0)
+    elif args.command == "compact":
+        sealed = seal_orphaned()
+        merged = compact()
+        print(f"Sealed {sealed} orphaned segment(s); merged {merged} small segment(s).")
+    elif args.command == "import-legacy":
+        print(f"Imported {import_legacy_json(args.folder)} legacy transcript(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Parallel index upserts with bounded in-flight work, shared by ingest and
+snapshot import.
+
+UpsertPool.upsert() has the Index.upsert() signature, so it can be passed
+wherever an index is written to (e.g. ingest.embed_and_upsert). Requests run on
+worker threads; once `max_in_flight` are pending, the caller waits for one to
+finish, which keeps memory flat however fast vectors are produced.
+"""
+import os
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Upsert requests running at once; twice as many may be pending before the producer blocks
+UPSERT_WORKERS = int(os.getenv("UPSERT_WORKERS", "8"))
+
+
+class UpsertPool:
+    def __init__(self, index, workers: int = UPSERT_WORKERS, max_in_flight: int = None):
+        self.index = index
+        self.workers = workers
+        self.max_in_flight = max_in_flight or workers * 2
+        self.tag = None  # attached to requests submitted from now on, reported back on failure
+        self.upserted = 0
+        self.started = time.perf_counter()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upsert")
+        self._pending = {}  # future -> (tag, vector count)
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _collect(self, done):
+        for future in done:
+            tag, count = self._pending.pop(future)
+            error = future.exception()
+            if error is None:
+                with self._lock:
+                    self.upserted += count
+            else:
+                self._failures.setdefault(tag, error)
+
+    def upsert(self, vectors, **kwargs):
+        if len(self._pending) >= self.max_in_flight:
+            done, _ = wait(self._pending, return_when=FIRST_COMPLETED)
+            self._collect(done)
+        future = self._pool.submit(self.index.upsert, vectors=vectors, **kwargs)
+        self._pending[future] = (self.tag, len(vectors))
+        return future
+
+    def settle(self):
+        """Wait for every pending request, so reads of the index see them; failures are kept for drain()."""
+        self._collect(wait(self._pending).done)
+
+    def drain(self) -> dict:
+        """Wait for every pending request; returns {tag: first error} for those that failed since the last drain."""
+        self.settle()
+        failures, self._failures = self._failures, {}
+        return failures
+
+    def vectors_per_s(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.upserted / elapsed if elapsed else 0.0
+
+    def close(self):
+        self.drain()
+        self._pool.shutdown()
@@ -0,0 +1,221 @@
+"""
+Optional compression of the vectors stored in the index: dimensionality
+reduction fitted on the corpus, plus a storage precision.
+
+    python -m agent.vector_compression fit agent/snapshots/latest --method pca --dim 128 --quantization int8
+    python -m agent.resetIndex rebuild --transform agent/index_data/vector_transform-<version>.npz
+
+Reduction (the vectors Pinecone receives and queries are embedded with):
+    none      full model vectors, as before
+    pca       projection onto the top --dim principal components of the corpus
+    truncate  the first --dim coordinates (Matryoshka-trained models put most of the signal there)
+Reduced vectors are renormalised, so cosine similarity still applies.
+
+Quantization (float32 | float16 | int8) is how LocalIndex holds them; int8
+uses per-dimension scales fitted on the corpus. float16 is for memory only:
+LocalIndex scores it much more slowly than float32 or int8. Pinecone dense indexes store
+float32 whatever is sent, so there only the reduced dimension saves space.
+
+Stored vectors and query vectors must go through the same transform. The active
+index alias entry (agent/index_alias.py) names the transform file its index was
+built with; without an alias, VECTOR_TRANSFORM_PATH is used. Every vector's
+metadata carries the transform `version`.
+"""
+import os
+import json
+import hashlib
+import argparse
+import threading
+from dotenv import load_dotenv
+
+import numpy as np
+
+from agent.index_alias import active_entry
+
+load_dotenv()
+
+# Transform file (.npz) used when the active index alias does not name one; empty = no transform
+VECTOR_TRANSFORM_PATH = os.getenv("VECTOR_TRANSFORM_PATH", "")
+METHODS = ("none", "pca", "truncate")
+QUANTIZATIONS = ("float32", "float16", "int8")
+# Rows used to fit PCA and the int8 scales
+FIT_SAMPLE = 50000
+# Quantile of |value| per dimension mapped to +-127; rarer outliers are clipped
+INT8_QUANTILE = 0.999
+
+_lock = threading.Lock()
+_transforms = {}
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms, norms, 1.0)
+
+
+class VectorTransform:
+    """A fitted reduction (`reduce`) and storage precision (`quantize` / `restore`)."""
+
+    def __init__(self, method: str = "none", input_dim: int = None, output_dim: int = None,
+                 quantization: str = "float32", mean: np.ndarray = None, components: np.ndarray = None,
+                 scale: np.ndarray = None):
+        if method not in METHODS:
+            raise ValueError(f"Unknown reduction method: {method}")
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization: {quantization}")
+        self.method = method
+        self.input_dim = input_dim
+        self.output_dim = output_dim if method != "none" else input_dim
+        self.quantization = quantization
+        self.mean = mean
+        self.components = components
+        self.scale = scale
+        self.version = self._version()
+
+    def _version(self) -> str:
+        if self.method == "none" and self.quantization == "float32":
+            return "none"
+        digest = hashlib.blake2b(digest_size=4)
+        digest.update(f"{self.method}:{self.input_dim}:{self.output_dim}:{self.quantization}".encode("utf-8"))
+        for array in (self.mean, self.components, self.scale):
+            if array is not None:
+                digest.update(np.ascontiguousarray(array, dtype="float32").tobytes())
+        return f"{self.method}{self.output_dim or ''}-{self.quantization}-{digest.hexdigest()}"
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, method: str = "pca", dim: int = 128, quantization: str = "float32",
+            seed: int = 0) -> "VectorTransform":
+        """Fit on corpus vectors (n, input_dim); at most FIT_SAMPLE rows are used."""
+        vectors = np.asarray(vectors, dtype="float32")
+        if len(vectors) > FIT_SAMPLE:
+            rows = np.random.default_rng(seed).choice(len(vectors), FIT_SAMPLE, replace=False)
+            vectors = vectors[np.sort(rows)]
+        vectors = _normalize(vectors)
+        input_dim = vectors.shape[1]
+        if method != "none" and not 0 < dim <= input_dim:
+            raise ValueError(f"--dim must be between 1 and {input_dim}")
+        mean = components = None
+        if method == "pca":
+            mean = vectors.mean(axis=0)
+            # Right singular vectors of the centred sample, strongest first
+            _, _, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+            components = vt[:dim].astype("float32")
+        transform = cls(method, input_dim, dim, "float32", mean, components)
+        scale = None
+        if quantization == "int8":
+            reduced = transform.reduce(vectors)
+            scale = np.quantile(np.abs(reduced), INT8_QUANTILE, axis=0).astype("float32") / 127
+            scale[scale == 0] = 1.0 / 127
+        return cls(method, input_dim, dim, quantization, mean, components, scale)
+
+    def reduce(self, vectors) -> np.ndarray:
+        """Model vectors (one or many) -> the float32 vectors stored in and queried against the index."""
+        vectors = np.asarray(vectors, dtype="float32")
+        if self.method == "none":
+            return vectors
+        if self.method == "pca":
+            reduced = (vectors - self.mean) @ self.components.T
+        else:
+            reduced = vectors[..., :self.output_dim]
+        return _normalize(reduced).astype("float32")
+
+    def quantize(self, reduced: np.ndarray) -> np.ndarray:
+        """Reduced vectors -> their storage form (float32, float16 or int8 codes)."""
+        reduced = np.asarray(reduced, dtype="float32")
+        if self.quantization == "int8":
+            return np.clip(np.rint(reduced / self.scale), -127, 127).astype("int8")
+        return reduced.astype(self.quantization)
+
+    def restore(self, codes: np.ndarray) -> np.ndarray:
+        """Storage form -> approximate float32 reduced vectors."""
+        if self.quantization == "int8":
+            return codes.astype("float32") * self.scale
+        return np.asarray(codes, dtype="float32")
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return self.output_dim * np.dtype(self.quantization).itemsize
+
+    def local_index(self, capacity: int = 1024):
+        """An empty LocalIndex holding vectors at this transform's precision."""
+        from agent.local_index import LocalIndex
+        return LocalIndex(dimension=self.output_dim, capacity=capacity, quantization=self.quantization,
+                          scale=self.scale)
+
+    def describe(self) -> dict:
+        return {"version": self.version, "method": self.method, "input_dim": self.input_dim,
+                "output_dim": self.output_dim, "quantization": self.quantization}
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        arrays = {name: value for name, value in
+                  (("mean", self.mean), ("components", self.components), ("scale", self.scale)) if value is not None}
+        with open(path, "wb") as f:
+            np.savez(f, config=np.array(json.dumps(self.describe())), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "VectorTransform":
+        with np.load(path) as data:
+            config = json.loads(str(data["config"]))
+            transform = cls(config["method"], config["input_dim"], config["output_dim"], config["quantization"],
+                            *(data[name] if name in data else None for name in ("mean", "components", "scale")))
+        if transform.version != config["version"]:
+            raise ValueError(f"{path}: contents do not match version {config['version']}")
+        return transform
+
+
+def transform_path() -> str:
+    """Transform file of the active index: its alias entry's, else VECTOR_TRANSFORM_PATH ('' = none)."""
+    entry = active_entry()
+    if "vector_transform" in entry:
+        return entry["vector_transform"] or ""
+    return VECTOR_TRANSFORM_PATH
+
+
+def get_transform(path: str = None) -> VectorTransform:
+    """The transform at `path` (default: the active index's), loaded once; the identity when unset."""
+    path = transform_path() if path is None else path
+    with _lock:
+        if path not in _transforms:
+            _transforms[path] = VectorTransform.load(path) if path else VectorTransform()
+        return _transforms[path]
+
+
+def main():
+    from agent.index_snapshot import iter_snapshot, read_manifest
+
+    parser = argparse.ArgumentParser(description="Fit a vector transform on the vectors of an index snapshot.")
+    parser.add_argument("command", choices=["fit", "show"])
+    parser.add_argument("path", help="Snapshot directory (fit) or transform file (show).")
+    parser.add_argument("--method", choices=METHODS[1:], default="pca")
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default="float32")
+    parser.add_argument("--out", default=None,
+                        help="Transform file (default: agent/index_data/vector_transform-<version>.npz).")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        print(json.dumps(VectorTransform.load(args.path).describe(), indent=2))
+        return
+
+    manifest = read_manifest(args.path)
+    if manifest.get("vector_transform", "none") != "none":
+        raise SystemExit(f"Snapshot vectors are already reduced ({manifest['vector_transform']}); "
+                         "fit on a snapshot of an uncompressed index.")
+    blocks, total = [], 0
+    for _, vectors, _ in iter_snapshot(args.path):
+        blocks.append(np.array(vectors, dtype="float32"))
+        total += len(vectors)
+        if total >= FIT_SAMPLE * 4:
+            break
+    transform = VectorTransform.fit(np.concatenate(blocks), args.method, args.dim, args.quantization)
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "index_data",
+                                   f"vector_transform-{transform.version}.npz")
+    transform.save(out)
+    print(f"Fitted {transform.version} on {min(total, FIT_SAMPLE)} of {manifest['count']} vector(s): "
+          f"{transform.input_dim} -> {transform.output_dim} dims, {transform.bytes_per_vector} bytes/vector "
+          f"in LocalIndex (was {transform.input_dim * 4})")
+    print(f"Saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
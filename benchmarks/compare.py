@@ -0,0 +1,66 @@
+"""
+Compare two benchmark result files and flag latency regressions.
+
+    python -m benchmarks.compare benchmarks/results/<baseline>.json benchmarks/results/<candidate>.json
+
+Exits with status 1 when any p50/p95 grows by more than --threshold percent.
+"""
+import sys
+import json
+import argparse
+
+METRICS = ("p50_ms", "p95_ms", "total_ms")
+
+
+def load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> tuple:
+    """Rows of (size, stage, metric, old, new, change %) and the regressed subset."""
+    rows, regressions = [], []
+    for size, stages in candidate["results"].items():
+        for stage, values in stages.items():
+            old_values = baseline["results"].get(size, {}).get(stage)
+            if not old_values:
+                continue
+            for metric in METRICS:
+                if metric not in values or metric not in old_values:
+                    continue
+                old, new = old_values[metric], values[metric]
+                change = (new - old) / old * 100 if old else 0.0
+                row = (size, stage, metric, old, new, change)
+                rows.append(row)
+                # total_ms is reported for context; only per-call latency gates
+                if metric != "total_ms" and change > threshold:
+                    regressions.append(row)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent.")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    if baseline.get("config") != candidate.get("config"):
+        print("⚠️ Benchmark configs differ; deltas may not be meaningful.")
+    print(f"baseline {baseline.get('commit')}  ->  candidate {candidate.get('commit')}\n")
+
+    rows, regressions = compare(baseline, candidate, args.threshold)
+    print(f"{'size':>7}  {'stage':<26} {'metric':<9} {'baseline':>11} {'candidate':>11} {'change':>8}")
+    for size, stage, metric, old, new, change in rows:
+        flag = "  ❗" if (size, stage, metric, old, new, change) in regressions else ""
+        print(f"{size:>7}  {stage:<26} {metric:<9} {old:>11.2f} {new:>11.2f} {change:>+7.1f}%{flag}")
+
+    if regressions:
+        print(f"\n❗ {len(regressions)} metric(s) regressed by more than {args.threshold:g}%.")
+        sys.exit(1)
+    print("\n✅ No regressions above threshold.")
+
+
+if __name__ == "__main__":
+    main()
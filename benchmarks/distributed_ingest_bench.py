@@ -0,0 +1,115 @@
+"""
+Distributed ingest with N local worker processes sharing one folder through
+directory leases, with one worker killed mid-run.
+
+    python -m benchmarks.distributed_ingest_bench --files 400 --procs 4 --kill-after 3
+
+Each worker is a separate process running agent.distributed_ingest.run_worker.
+Parsing is faked (--parse-ms per file) and the index is
+benchmarks.fakes.FakeRemoteIndex, which here also logs every upserted id to a
+shared file. The killed worker's leases expire after --ttl seconds and are
+reclaimed by the others. The run fails unless every file is done and every
+candidate reached the index. Files processed twice (a reclaimed lease whose
+work was already partly uploaded) are reported; they overwrite the same ids.
+"""
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import tempfile
+import subprocess
+from collections import Counter
+
+from benchmarks.synthetic import generate_candidates
+
+
+def child(args):
+    """One worker process: fake parser and index, real leases and upsert pool."""
+    from agent import distributed_ingest, embeddings
+    from benchmarks.fakes import FakeRemoteIndex, HashEmbedder, patched
+
+    class LoggedIndex(FakeRemoteIndex):
+        def upsert(self, vectors, **kwargs):
+            result = super().upsert(vectors, **kwargs)
+            lines = "".join(f"{os.getpid()}\t{v['id']}\n" for v in vectors)
+            # O_APPEND writes below PIPE_BUF land whole, even from several processes
+            with open(args.log, "a", encoding="utf-8") as f:
+                f.write(lines)
+            return result
+
+    def parse(api_url, path):
+        time.sleep(args.parse_ms / 1000)
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    embeddings.set_model(HashEmbedder())
+    index = LoggedIndex(args.upsert_latency_ms)
+    with patched(distributed_ingest, upload_resume_and_get_data=parse, initialize_pinecone=lambda: index):
+        distributed_ingest.run_worker(args.folder, args.run, api_url="fake", workers=4,
+                                      checkpoint_every=args.checkpoint_every, ttl_s=args.ttl, poll_s=0.5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--procs", type=int, default=4)
+    parser.add_argument("--kill-after", type=float, default=3.0, help="SIGKILL one worker after N seconds (0 = never).")
+    parser.add_argument("--parse-ms", type=float, default=20.0)
+    parser.add_argument("--upsert-latency-ms", type=float, default=40.0)
+    parser.add_argument("--checkpoint-every", type=int, default=5)
+    parser.add_argument("--ttl", type=float, default=3.0, help="Lease seconds.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--folder", help=argparse.SUPPRESS)
+    parser.add_argument("--run", default="bench", help=argparse.SUPPRESS)
+    parser.add_argument("--log", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args)
+
+    from agent.distributed_ingest import merge_lexical, print_progress
+    from agent.ingest_leases import DirectoryLeaseStore, shared_dir
+
+    with tempfile.TemporaryDirectory() as folder:
+        for i, data in enumerate(generate_candidates(args.files)):
+            with open(os.path.join(folder, f"resume_{i:06d}.pdf"), "w", encoding="utf-8") as f:
+                json.dump({k: v for k, v in data.items() if not k.startswith("_")}, f)
+        log = os.path.join(folder, "upserts.log")
+        command = [sys.executable, "-m", "benchmarks.distributed_ingest_bench", "--child", "--folder", folder,
+                   "--run", args.run, "--log", log, "--parse-ms", str(args.parse_ms),
+                   "--upsert-latency-ms", str(args.upsert_latency_ms), "--ttl", str(args.ttl),
+                   "--checkpoint-every", str(args.checkpoint_every)]
+
+        start = time.perf_counter()
+        procs = [subprocess.Popen(command, stdout=subprocess.DEVNULL) for _ in range(args.procs)]
+        store = DirectoryLeaseStore(shared_dir(folder, args.run))
+        keys = sorted(f for f in os.listdir(folder) if f.endswith(".pdf"))
+        killed = None
+        while any(p.poll() is None for p in procs):
+            time.sleep(1.0)
+            if args.kill_after and killed is None and time.perf_counter() - start >= args.kill_after:
+                killed = procs[0]
+                killed.send_signal(signal.SIGKILL)
+                print(f"💥 killed worker pid {killed.pid}")
+            print_progress(store.progress(keys), args.run)
+        elapsed = time.perf_counter() - start
+
+        files = store.progress(keys)["files"]
+        with open(log, "r", encoding="utf-8") as f:
+            phone_upserts = Counter(line.split("\t")[1].strip() for line in f if line.rstrip().endswith("_phone"))
+        reprocessed = sum(n - 1 for n in phone_upserts.values())
+        lexical_docs = merge_lexical(folder, args.run, path=os.path.join(folder, "lexical_index.json"))
+
+    serial_s = args.files * args.parse_ms / 1000
+    print(f"\n{args.files} file(s), {args.procs} worker process(es) in {elapsed:.1f}s "
+          f"(fake parsing alone would take {serial_s:.1f}s serially)")
+    print(f"done {files['done']}, failed {files['failed']}, candidates in index {len(phone_upserts)}, "
+          f"processed twice {reprocessed}, merged lexical chunks {lexical_docs}")
+    ok = files["done"] == args.files and len(phone_upserts) == args.files and lexical_docs >= args.files
+    if not ok:
+        raise SystemExit("❌ some files were not ingested")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Torch vs ONNX (int8) embedding backends: parity, throughput, latency, memory and start-up.
+
+    python -m agent.onnx_embedder export          # once
+    python -m benchmarks.embedding_backend_bench --texts 2000 --queries 200 --threads 4
+
+Each backend runs in its own process so import time and peak RSS are not shared.
+Parity embeds the same resume chunks with both backends and compares them
+per text (cosine); the run fails when the minimum is below --min-cosine.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import statistics
+import subprocess
+import tempfile
+
+import numpy as np
+
+BACKENDS = {
+    "torch": {"EMBEDDING_BACKEND": "torch"},
+    "onnx-fp32": {"EMBEDDING_BACKEND": "onnx", "EMBEDDING_ONNX_QUANTIZED": "false"},
+    "onnx-int8": {"EMBEDDING_BACKEND": "onnx", "EMBEDDING_ONNX_QUANTIZED": "true"},
+}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def worker(args):
+    """Runs inside the child process with EMBEDDING_BACKEND set."""
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    t0 = time.perf_counter()
+    from agent import embeddings
+    model = embeddings.get_model()
+    startup_s = time.perf_counter() - t0
+    rss_loaded = peak_rss_mb()
+
+    model.encode(corpus["texts"][:32])  # warm-up
+    t0 = time.perf_counter()
+    vectors = model.encode(corpus["texts"], batch_size=32)
+    encode_s = time.perf_counter() - t0
+
+    latencies = []
+    for query in corpus["queries"]:
+        t0 = time.perf_counter()
+        model.encode(query)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+
+    np.save(args.vectors, np.asarray(vectors, dtype="float32"))
+    print(json.dumps({
+        "startup_s": round(startup_s, 3),
+        "texts_per_s": round(len(corpus["texts"]) / encode_s, 1),
+        "query_p50_ms": round(statistics.median(latencies), 2),
+        "query_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "rss_loaded_mb": round(rss_loaded, 1),
+        "rss_peak_mb": round(peak_rss_mb(), 1),
+        "torch_imported": "torch" in sys.modules,
+    }))
+
+
+def build_corpus(count: int, queries: int, seed: int) -> dict:
+    from agent.ingest import generate_resume_text
+    from benchmarks.synthetic import generate_candidates
+
+    # Same 1000-character chunks as ingest
+    texts = []
+    for candidate in generate_candidates(count, seed=seed):
+        resume_text = generate_resume_text(candidate)
+        texts.extend(resume_text[i:i + 1000] for i in range(0, len(resume_text), 1000))
+        if len(texts) >= count:
+            break
+    rng = random.Random(seed)
+    return {"texts": texts[:count], "queries": [rng.choice(texts)[:120] for _ in range(queries)]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=0, help="onnxruntime intra-op threads (0 = per core).")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", help=argparse.SUPPRESS)
+    parser.add_argument("--vectors", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+    unknown = [name for name in args.backends.split(",") if name not in BACKENDS]
+    if unknown:
+        parser.error(f"unknown backend(s) {', '.join(unknown)}; choose from {', '.join(BACKENDS)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_path = os.path.join(tmp, "corpus.json")
+        with open(corpus_path, "w", encoding="utf-8") as f:
+            json.dump(build_corpus(args.texts, args.queries, args.seed), f)
+
+        results, vectors, failed = {}, {}, []
+        for name in args.backends.split(","):
+            vectors_path = os.path.join(tmp, f"{name}.npy")
+            env = {**os.environ, **BACKENDS[name], "EMBEDDING_ONNX_THREADS": str(args.threads),
+                   "EMBEDDING_CACHE_ENABLED": "false"}
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.embedding_backend_bench", "--worker",
+                 "--corpus", corpus_path, "--vectors", vectors_path],
+                env=env, capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"❌ {name} failed:\n{proc.stderr.strip()[-2000:]}")
+                failed.append(name)
+                continue
+            results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+            vectors[name] = np.load(vectors_path)
+
+    print(f"{args.texts} texts, {args.queries} single queries\n")
+    print(f"{'backend':<10} {'start-up':>9} {'texts/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'RSS loaded':>11} {'RSS peak':>9}  torch")
+    for name, r in results.items():
+        print(f"{name:<10} {r['startup_s']:>8.2f}s {r['texts_per_s']:>9.1f} {r['query_p50_ms']:>8.2f} "
+              f"{r['query_p95_ms']:>8.2f} {r['rss_loaded_mb']:>9.0f}MB {r['rss_peak_mb']:>7.0f}MB  "
+              f"{'yes' if r['torch_imported'] else 'no'}")
+
+    reference = vectors.get("torch")
+    if reference is None:
+        if failed:
+            sys.exit(f"❌ backend(s) failed to load: {', '.join(failed)}")
+        return
+    passed = not failed
+    print()
+    for name, other in vectors.items():
+        if name == "torch":
+            continue
+        cosine = (reference * other).sum(axis=1) / (
+            np.linalg.norm(reference, axis=1) * np.linalg.norm(other, axis=1))
+        ok = cosine.min() >= args.min_cosine
+        passed &= ok
+        print(f"Parity {name} vs torch: mean cosine {cosine.mean():.5f}, min {cosine.min():.5f} "
+              f"{'✅' if ok else '❌'}")
+    if failed:
+        print(f"❌ backend(s) failed to load, parity not checked: {', '.join(failed)}")
+    if not passed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
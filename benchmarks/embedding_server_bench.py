@@ -0,0 +1,144 @@
+"""
+Shared embedding server vs one model per process, under concurrent clients.
+
+    python -m benchmarks.embedding_server_bench --clients 8 --requests 200
+
+Each client is a separate process sending single-text encode requests back to
+back, like interview lookups. In "per-process" mode every client loads its own
+model; in "server" mode one agent.embedding_server process serves them all.
+Reports throughput, p50/p99 latency and the summed peak RSS of all processes.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import tempfile
+import subprocess
+import urllib.request
+
+from benchmarks.embedding_backend_bench import build_corpus, peak_rss_mb
+
+
+def worker(args):
+    """One client process: load, report ready, wait for 'go' on stdin, then encode."""
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        texts = json.load(f)["queries"]
+    from agent import embeddings
+    embeddings.encode(texts[0])  # load the model / check the server
+    print("ready", flush=True)
+    sys.stdin.readline()
+
+    latencies = []
+    for i in range(args.requests):
+        t0 = time.perf_counter()
+        embeddings.encode(texts[(args.offset + i) % len(texts)])
+        latencies.append((time.perf_counter() - t0) * 1000)
+    print(json.dumps({"latencies": latencies, "rss_peak_mb": peak_rss_mb()}), flush=True)
+
+
+def process_peak_rss_mb(pid: int):
+    """Peak RSS of another process (Linux /proc), or None."""
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def wait_for_server(url: str, proc, timeout_s: float = 300) -> dict:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("embedding server exited during start-up")
+        try:
+            with urllib.request.urlopen(f"{url}/health", timeout=1) as response:
+                return json.load(response)
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("embedding server did not become ready")
+
+
+def run_clients(args, corpus_path: str, env: dict) -> dict:
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.embedding_server_bench", "--worker", "--corpus", corpus_path,
+             "--requests", str(args.requests), "--offset", str(i * args.requests)],
+            env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        for i in range(args.clients)
+    ]
+    for proc in procs:
+        if proc.stdout.readline().strip() != "ready":
+            raise RuntimeError("client failed to start")
+    start = time.perf_counter()
+    for proc in procs:
+        proc.stdin.write("go\n")
+        proc.stdin.flush()
+    results = [json.loads(proc.stdout.readline()) for proc in procs]
+    wall_s = time.perf_counter() - start
+    for proc in procs:
+        proc.wait()
+
+    latencies = sorted(ms for r in results for ms in r["latencies"])
+    return {
+        "per_s": len(latencies) / wall_s,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)],
+        "clients_rss_mb": sum(r["rss_peak_mb"] for r in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Encode requests per client.")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", help=argparse.SUPPRESS)
+    parser.add_argument("--offset", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_path = os.path.join(tmp, "corpus.json")
+        with open(corpus_path, "w", encoding="utf-8") as f:
+            json.dump(build_corpus(100, args.clients * args.requests, seed=0), f)
+        base_env = {**os.environ, "EMBEDDING_CACHE_ENABLED": "false"}
+
+        local = run_clients(args, corpus_path, {**base_env, "EMBEDDING_SERVER_URL": ""})
+        local["total_rss_mb"] = local["clients_rss_mb"]
+
+        url = f"http://127.0.0.1:{args.port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "agent.embedding_server", "--port", str(args.port),
+             "--max-batch", str(args.max_batch), "--max-wait-ms", str(args.max_wait_ms)],
+            env=base_env, stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_server(url, server)
+            shared = run_clients(args, corpus_path, {**base_env, "EMBEDDING_SERVER_URL": url})
+            with urllib.request.urlopen(f"{url}/health", timeout=5) as response:
+                health = json.load(response)
+            server_rss = process_peak_rss_mb(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+        shared["total_rss_mb"] = shared["clients_rss_mb"] + (server_rss or 0)
+
+    print(f"{args.clients} clients x {args.requests} single-text requests\n")
+    print(f"{'mode':<12} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'total RSS':>10}")
+    for mode, r in (("per-process", local), ("server", shared)):
+        print(f"{mode:<12} {r['per_s']:>9.1f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['total_rss_mb']:>8.0f}MB")
+    print(f"\nServer: {health['batches']} batch(es) for {health['requests']} request(s), "
+          f"mean batch {health['mean_batch']} (max {args.max_batch}, window {args.max_wait_ms} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Throughput and determinism of the post-interview evaluator under a stub LLM.
+
+    python -m benchmarks.evaluator_bench --sessions 2000 --workers 16 --llm-latency-ms 400
+
+Synthetic transcripts are written to a temporary transcript store and scored
+three times with benchmarks.fakes.FakeEvaluatorModel: with one worker, with
+`--workers` workers, and interrupted halfway then resumed. All three tables must
+be identical (apart from evaluation timestamps).
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from agent.evaluator import COLUMNS, Evaluator, RateLimiter, open_results, run_evaluations
+from agent.transcript_store import TranscriptReader, TranscriptWriter
+from benchmarks.fakes import FakeEvaluatorModel, HR_RESPONSES, TECH_RESPONSES
+from benchmarks.synthetic import generate_candidates
+
+ANSWERS = [
+    "Yes, this is a good time.",
+    "I work on data pipelines and LLM services in Python.",
+    "I built a retrieval service combining keyword and vector search.",
+    "We partitioned the index and cached the most frequent queries.",
+    "Bad records went to a dead-letter queue with alerts.",
+]
+
+
+def write_sessions(root: str, count: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    start = datetime(2025, 6, 1, 9, 0)
+    with TranscriptWriter(root) as writer:
+        for i, candidate in enumerate(generate_candidates(count, seed=seed)):
+            session_id = f"bench-{i:06d}"
+            ts = start + timedelta(minutes=20 * i)
+            turns = [("hr", q, a) for q, a in zip(HR_RESPONSES, rng.sample(ANSWERS, 4))]
+            turns += [("technical", q, a) for q, a in zip(TECH_RESPONSES, rng.sample(ANSWERS, 3))]
+            for stage, question, answer in turns:
+                for speaker, text in (("ai", question), ("human", answer)):
+                    ts += timedelta(seconds=30)
+                    writer.append(session_id, speaker, text, phone=candidate["phone"],
+                                  name=candidate["name"], stage=stage, timestamp=ts.isoformat())
+
+
+def table(db_path: str) -> list:
+    conn = open_results(db_path)
+    columns = [c for c in COLUMNS if c != "evaluated_at"]
+    rows = conn.execute(f"SELECT {', '.join(columns)} FROM evaluations ORDER BY session_id").fetchall()
+    conn.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute limit (0 = none).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = os.path.join(tmp, "transcripts")
+        t0 = time.perf_counter()
+        write_sessions(store, args.sessions)
+        print(f"Wrote {args.sessions} synthetic session(s) in {time.perf_counter() - t0:.1f}s")
+        reader = TranscriptReader(store)
+
+        def evaluate(db_name, workers, limit=None):
+            evaluator = Evaluator(FakeEvaluatorModel(latency_ms=args.llm_latency_ms), RateLimiter(args.rpm, 0))
+            return run_evaluations(evaluator, reader, os.path.join(tmp, db_name), workers=workers,
+                                   limit=limit, min_idle_s=0, quiet=True)
+
+        sample = max(args.sessions // 10, 1)
+        serial = evaluate("serial.db", 1, limit=sample)
+        print(f"1 worker:   {serial['evaluated']} session(s) in {serial['elapsed_s']:.1f}s "
+              f"({serial['per_hour']} per hour)")
+        parallel = evaluate("parallel.db", args.workers)
+        print(f"{args.workers} workers: {parallel['evaluated']} session(s) in {parallel['elapsed_s']:.1f}s "
+              f"({parallel['per_hour']} per hour)")
+
+        first = evaluate("resumed.db", args.workers, limit=args.sessions // 2)
+        second = evaluate("resumed.db", args.workers)
+        print(f"Resumed run: {first['evaluated']} then {second['evaluated']} "
+              f"(skipped {second['skipped']} already scored)")
+
+        reference = table(os.path.join(tmp, "parallel.db"))
+        deterministic = (table(os.path.join(tmp, "resumed.db")) == reference
+                         and table(os.path.join(tmp, "serial.db")) == reference[:sample])
+        print(f"Identical results across worker counts and resume: {'✅' if deterministic else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Deterministic stand-ins for the external services, so the pipeline can be
+benchmarked offline: a ChatGroq-compatible chat model with configurable latency
+and token rate, a hashing embedder and a latency-only upsert sink. The vector
+store stand-in is agent.local_index.LocalIndex; scripted candidate input is
+agent.replay.ScriptedInput.
+"""
+import re
+import json
+import time
+import zlib
+import threading
+import contextlib
+from typing import Any, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+HR_RESPONSES = [
+    "Hi, this is a quick call about the role. Is now a good time to talk?",
+    "Great. Could you walk me through your current role and responsibilities?",
+    "What are your salary expectations for this position?",
+    "Are you open to relocating or working from our office?",
+    "What is your notice period?",
+    "Thank you, that covers everything from my side. GENERAL INTERVIEW COMPLETE",
+]
+TECH_RESPONSES = [
+    "How did you design the data model for that project, and what trade-offs did you make?",
+    "What would you change about the architecture if traffic grew tenfold?",
+    "How do you handle missing or malformed input in that pipeline?",
+    "Which bottleneck did you profile first, and how did you confirm the fix?",
+]
+
+
+def _estimate_tokens(text: str) -> int:
+    # ~4 characters per token, the same estimate agent.tracing falls back to
+    return max(len(text) // 4, 1)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers from a fixed list instead of calling Groq. The reply
+    is picked by the number of AI messages already in the conversation, so the
+    same conversation always gets the same answers, even across threads.
+    Latency is `latency_ms` before the first token plus output tokens at
+    `tokens_per_sec`; usage metadata is reported like a real provider.
+    """
+
+    responses: List[str] = TECH_RESPONSES
+    latency_ms: float = 0.0
+    tokens_per_sec: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        turn = sum(1 for m in messages if m.type == "ai")
+        return self.responses[min(turn, len(self.responses) - 1)]
+
+    def _usage(self, messages: List[BaseMessage], text: str) -> dict:
+        tokens_in = sum(_estimate_tokens(str(m.content)) for m in messages)
+        tokens_out = len(text.split())
+        return {"input_tokens": tokens_in, "output_tokens": tokens_out, "total_tokens": tokens_in + tokens_out}
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        text = self._reply(messages)
+        words = text.split()
+        delay = self.latency_ms / 1000
+        if self.tokens_per_sec:
+            delay += len(words) / self.tokens_per_sec
+        if delay:
+            time.sleep(delay)
+        message = AIMessage(content=text, usage_metadata=self._usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        text = self._reply(messages)
+        words = text.split(" ")
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        for i, word in enumerate(words):
+            if i and self.tokens_per_sec:
+                time.sleep(1 / self.tokens_per_sec)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(messages, text)))
+
+
+class FakeEvaluatorModel(FakeChatModel):
+    """
+    Evaluation stand-in: replies with rubric scores derived from a hash of the
+    prompt, so a given transcript always gets the same scores.
+    """
+
+    dimensions: List[str] = ["communication", "skill_match", "technical_depth"]
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        digest = zlib.crc32(str(messages[-1].content).encode("utf-8"))
+        scores = {d: 1 + (digest >> (3 * i)) % 5 for i, d in enumerate(self.dimensions)}
+        return json.dumps({**scores, "summary": f"Deterministic evaluation {digest:08x}."})
+
+
+class HashEmbedder:
+    """
+    Feature-hashing bag-of-words embedder with the SentenceTransformer encode()
+    signature. Identical texts map to identical unit vectors, so exact phone
+    lookups behave like the real model while costing microseconds.
+    """
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def _embed(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dimension, dtype="float32")
+        for token in re.findall(r"\w+", text.lower()):
+            h = zlib.crc32(token.encode("utf-8"))
+            vec[h % self.dimension] += 1.0 if h & 0x80000000 else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def encode(self, texts, **kwargs):
+        if isinstance(texts, str):
+            return self._embed(texts)
+        return np.stack([self._embed(t) for t in texts]) if texts else np.zeros((0, self.dimension), "float32")
+
+
+class FakeRemoteIndex:
+    """
+    Upsert sink that sleeps like a network round-trip per request and only
+    counts vectors, for measuring bulk-load throughput without a vector store.
+    """
+
+    def __init__(self, latency_ms: float = 40.0):
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors, **kwargs):
+        time.sleep(self.latency_ms / 1000)
+        with self._lock:
+            self.requests += 1
+            self.count += len(vectors)
+        return {"upserted_count": len(vectors)}
+
+    def describe_index_stats(self, **kwargs):
+        return {"total_vector_count": self.count}
+
+
+@contextlib.contextmanager
+def patched(module, **attrs):
+    """Temporarily replace module attributes, restoring them on exit."""
+    saved = {name: getattr(module, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(module, name, value)
+    try:
+        yield module
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
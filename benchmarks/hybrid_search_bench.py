@@ -0,0 +1,94 @@
+"""
+Recall/latency benchmark for dense, BM25 and hybrid (RRF) retrieval on a
+synthetic labelled resume corpus.
+
+    python -m benchmarks.hybrid_search_bench --candidates 1000 --queries 200
+"""
+import time
+import random
+import argparse
+import statistics
+
+from agent.embeddings import get_model, encode
+from agent.ingest import embed_and_upsert
+from agent.lexical_index import BM25Index
+from agent.local_index import LocalIndex
+from agent.hybrid_search import search_candidates
+from benchmarks.synthetic import generate_candidates, PROJECT_THEMES
+
+
+def build_queries(candidates, count, rng):
+    """
+    Labelled queries: half exact-term (employer + certification), half semantic
+    (project theme paraphrase). Relevant = every candidate satisfying the label.
+    """
+    queries = []
+    for i in range(count):
+        if i % 2 == 0:
+            c = rng.choice(candidates)
+            text = f"{c['_certification']} {c['company']}"
+            relevant = {
+                j for j, o in enumerate(candidates)
+                if o["company"] == c["company"] and o["_certification"] == c["_certification"]
+            }
+            queries.append(("exact", text, relevant))
+        else:
+            theme = rng.choice(list(PROJECT_THEMES))
+            relevant = {j for j, o in enumerate(candidates) if o["_theme"] == theme}
+            queries.append(("semantic", PROJECT_THEMES[theme][1], relevant))
+    return queries
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    candidates = generate_candidates(args.candidates, seed=args.seed)
+    index = LocalIndex(dimension=len(encode("probe")), capacity=args.candidates * 3)
+    lexical = BM25Index()
+
+    start = time.perf_counter()
+    model = get_model()
+    for i, data in enumerate(candidates):
+        embed_and_upsert(index, model, f"cand_{i}", data, lexical)
+    print(f"Indexed {args.candidates} candidates ({len(index)} vectors) in {time.perf_counter() - start:.1f}s\n")
+
+    queries = build_queries(candidates, args.queries, rng)
+    # The same hybrid_search call with one side emptied isolates each retriever
+    # (None would fall back to the configured index, so pass empty ones instead)
+    methods = {
+        "dense": dict(index=index, lexical=BM25Index()),
+        "bm25": dict(index=LocalIndex(dimension=index.dimension), lexical=lexical),
+        "hybrid": dict(index=index, lexical=lexical),
+    }
+
+    header = f"{'method':<8} {'kind':<9} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for method, kwargs in methods.items():
+        for kind in ("exact", "semantic", "all"):
+            recalls, latencies = [], []
+            for qkind, text, relevant in queries:
+                if kind != "all" and qkind != kind:
+                    continue
+                start = time.perf_counter()
+                results = search_candidates(text, top_k=args.k, **kwargs)
+                latencies.append((time.perf_counter() - start) * 1000)
+                found = {int(r["candidate_id"].split("_")[1]) for r in results}
+                # Recall against what is achievable in k slots
+                recalls.append(len(found & relevant) / min(len(relevant), args.k))
+            latencies.sort()
+            p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+            print(f"{method:<8} {kind:<9} {statistics.mean(recalls):>9.3f} "
+                  f"{statistics.median(latencies):>8.2f} {p95:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
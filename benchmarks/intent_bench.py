@@ -0,0 +1,85 @@
+"""
+Accuracy and latency of the control-flow intent classifier on held-out utterances.
+
+    python -m benchmarks.intent_bench
+    python -m benchmarks.intent_bench --hash-embeddings   # plumbing check without the model
+"""
+import time
+import argparse
+import statistics
+
+from agent import embeddings
+from agent.intent_classifier import IntentClassifier
+
+# Utterances not in the prototype set, with the label control flow should see
+HELD_OUT = [
+    ("Sorry, I'm in a meeting and can't talk now.", "decline"),
+    ("I'm not really looking to switch jobs.", "decline"),
+    ("I think you have the wrong person.", "decline"),
+    ("I'm no longer interested, thank you.", "decline"),
+    ("ok bye", "end"),
+    ("I'd like to stop the interview here.", "end"),
+    ("Thanks, I need to leave now. Bye!", "end"),
+    ("quit please", "end"),
+    ("How big is the engineering team?", "question"),
+    ("What's the next step after this call?", "question"),
+    ("Is there a probation period?", "question"),
+    ("Which cloud provider do you use?", "question"),
+    ("no", "on_topic"),
+    ("No, I didn't use Docker for that project.", "on_topic"),
+    ("Not really, it was mostly batch processing.", "on_topic"),
+    ("Yes, I led a team of four engineers.", "on_topic"),
+    ("We moved the ETL jobs from cron to Airflow.", "on_topic"),
+    ("I used LangChain with Groq for the agent.", "on_topic"),
+    ("I'm based in Pune but open to moving.", "on_topic"),
+    ("Busy season was tough, we scaled the workers horizontally.", "on_topic"),
+]
+
+
+def _percentiles(samples: list) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+    return f"p50={statistics.median(ordered) * 1000:.1f} µs  p95={p95 * 1000:.1f} µs"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--hash-embeddings", action="store_true",
+                        help="Use the hashing stand-in instead of the sentence-transformers model.")
+    args = parser.parse_args()
+
+    if args.hash_embeddings:
+        from benchmarks.fakes import HashEmbedder
+        embeddings.set_model(HashEmbedder())
+
+    start = time.perf_counter()
+    classifier = IntentClassifier()
+    print(f"Built centroids in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    cold = []
+    correct, premature_exits = 0, 0
+    for text, expected in HELD_OUT:
+        t0 = time.perf_counter()
+        intent = classifier.classify(text)
+        cold.append((time.perf_counter() - t0) * 1000)
+        correct += intent.label == expected
+        premature_exits += intent.label in ("decline", "end") and expected not in ("decline", "end")
+        marker = "✅" if intent.label == expected else "❌"
+        print(f"  {marker} {intent.label:<9} ({intent.score:.2f}) expected {expected:<9} {text}")
+
+    warm = []
+    for _ in range(args.repeat):
+        for text, _ in HELD_OUT:
+            t0 = time.perf_counter()
+            classifier.classify(text)
+            warm.append((time.perf_counter() - t0) * 1000)
+
+    print(f"\nAccuracy: {correct}/{len(HELD_OUT)} ({correct / len(HELD_OUT):.0%}), "
+          f"premature exits: {premature_exits}")
+    print(f"Cold (embed + score): {_percentiles(cold)}")
+    print(f"Warm (memoized embedding, centroid scoring only): {_percentiles(warm)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Latency of job -> candidate ranking over a local index of synthetic candidates.
+
+    python -m benchmarks.job_ranker_bench --candidates 100000
+"""
+import time
+import argparse
+import statistics
+
+import numpy as np
+
+from agent.embeddings import encode
+from agent.job_config import load_job
+from agent.job_ranker import job_query_text, retrieve_pool, score_pool
+from agent.local_index import LocalIndex
+from benchmarks.synthetic import generate_candidates
+
+
+def build_index(count: int, dimension: int, seed: int) -> LocalIndex:
+    """One chunk vector + one phone vector per candidate; random unit vectors keep setup fast."""
+    rng = np.random.default_rng(seed)
+    index = LocalIndex(dimension=dimension, capacity=count * 2)
+    batch = []
+    for i, data in enumerate(generate_candidates(count, seed=seed)):
+        cid = f"candidate_{i}"
+        meta = {k: v for k, v in data.items() if not k.startswith("_") and isinstance(v, (str, int, float, list))}
+        meta.update(candidate_id=cid)
+        batch.append({"id": f"{cid}_chunk_0", "values": rng.standard_normal(dimension),
+                      "metadata": dict(meta, chunk_id="0", is_phone_entry="false")})
+        batch.append({"id": f"{cid}_phone", "values": rng.standard_normal(dimension),
+                      "metadata": dict(meta, chunk_id="-1", is_phone_entry="true")})
+        if len(batch) >= 10000:
+            index.upsert(vectors=batch)
+            batch = []
+    if batch:
+        index.upsert(vectors=batch)
+    return index
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return result, statistics.median(samples), samples[max(int(len(samples) * 0.95) - 1, 0)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    job = load_job()
+    _, encode_ms, _ = timed(lambda: encode(job_query_text(job)), 5)
+    job_vector = encode(job_query_text(job))
+
+    start = time.perf_counter()
+    index = build_index(args.candidates, len(job_vector), args.seed)
+    print(f"Built local index: {len(index)} vectors in {time.perf_counter() - start:.1f}s")
+    print(f"Job embedding: {encode_ms:.2f} ms (p50)\n")
+
+    header = f"{'pool':>6} {'retrieve p50':>13} {'re-rank p50':>12} {'total p50':>10} {'total p95':>10}"
+    print(header)
+    print("-" * len(header))
+    for pool_size in (100, 500, 2000, 10000):
+        pool, retrieve_ms, _ = timed(lambda: retrieve_pool(index, job_vector, pool_size), args.repeat)
+        _, rerank_ms, _ = timed(lambda: score_pool(pool, job, top_k=20), args.repeat)
+        _, total_ms, total_p95 = timed(lambda: score_pool(retrieve_pool(index, job_vector, pool_size), job, top_k=20),
+                                       args.repeat)
+        print(f"{pool_size:>6} {retrieve_ms:>13.2f} {rerank_ms:>12.2f} {total_ms:>10.2f} {total_p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Offline benchmark of the interview pipeline at several corpus sizes.
+
+    python -m benchmarks.pipeline_bench --sizes 100 1000 5000
+    python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+
+Groq, Pinecone, the parser API and (by default) the embedding model are replaced
+by the deterministic stand-ins in benchmarks/fakes.py, so runs are repeatable
+and comparable between commits. Results are written as JSON to benchmarks/results/.
+"""
+import io
+import os
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import contextlib
+import tempfile
+from datetime import datetime
+from tqdm import tqdm
+
+from agent import data_loader, embeddings, general_agent, ingest, technical_agent
+from agent.local_index import LocalIndex
+from benchmarks.fakes import (
+    FakeChatModel, HashEmbedder, ScriptedInput, patched, HR_RESPONSES, TECH_RESPONSES,
+)
+from benchmarks.synthetic import generate_candidates
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+HR_ANSWERS = [
+    "Yes, this is a good time.",
+    "I build retrieval pipelines and LLM services in Python.",
+    "I am expecting around 18 LPA.",
+    "Yes, I am open to relocating.",
+    "My notice period is 30 days.",
+]
+TECH_ANSWERS = [
+    "I built a hybrid search service that merged BM25 and vector results.",
+    "We sharded the index and cached hot queries in Redis.",
+    "Invalid records went to a dead-letter queue with alerts.",
+    "I profiled with py-spy and replaced a per-row ORM query with a bulk one.",
+]
+
+
+def _stats(samples_ms: list) -> dict:
+    ordered = sorted(samples_ms)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "total_ms": round(sum(ordered), 3),
+    }
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+@contextlib.contextmanager
+def _quiet(enabled=True):
+    """The agents print every turn; keep benchmark output readable."""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def bench_ingest(records: list, quiet: bool) -> tuple:
+    """ingest_all_resumes over placeholder files, with the parser API and Pinecone stubbed."""
+    index = LocalIndex(dimension=384, capacity=len(records) * 2)
+    by_file = {f"resume_{i:07d}.pdf": record for i, record in enumerate(records)}
+
+    with tempfile.TemporaryDirectory() as folder:
+        for name in by_file:
+            # Distinct contents: ingest derives candidate ids from the file hash
+            with open(os.path.join(folder, name), "wb") as f:
+                f.write(name.encode("utf-8"))
+        with patched(
+            ingest,
+            upload_resume_and_get_data=lambda api_url, path: dict(by_file[os.path.basename(path)]),
+            initialize_pinecone=lambda: index,
+            active_lexical_path=lambda: os.path.join(folder, "lexical_index.json"),
+            tqdm=lambda iterable, **kwargs: tqdm(iterable, disable=True),
+        ), _quiet(quiet):
+            _, elapsed_ms = _timed(lambda: ingest.ingest_all_resumes(
+                folder, ingest.API_URL, runs_dir=os.path.join(folder, "ingest_runs")))
+
+    return index, {
+        "resumes": len(records),
+        "vectors": len(index),
+        "total_ms": round(elapsed_ms, 3),
+        "resumes_per_sec": round(len(records) / (elapsed_ms / 1000), 1) if elapsed_ms else None,
+    }
+
+
+def bench_lookups(records: list, samples: int, rng: random.Random, quiet: bool) -> dict:
+    phones = [rng.choice(records)["phone"] for _ in range(samples)]
+    results = {}
+    for name, fn in (("get_candidate_by_phone", data_loader.get_candidate_by_phone),
+                     ("load_full_resume_text", data_loader.load_full_resume_text)):
+        timings, hits = [], 0
+        with _quiet(quiet):
+            for phone in phones:
+                found, elapsed_ms = _timed(lambda: fn(phone))
+                timings.append(elapsed_ms)
+                hits += bool(found)
+        results[name] = dict(_stats(timings), hit_rate=round(hits / len(phones), 4))
+    return results
+
+
+def bench_interviews(records: list, samples: int, rng: random.Random, quiet: bool) -> dict:
+    hr_timings, hr_turns, hr_completed = [], [], 0
+    tech_timings, tech_turns = [], []
+    for _ in range(samples):
+        record = rng.choice(records)
+        with _quiet(quiet):
+            metadata = data_loader.get_candidate_by_phone(record["phone"]) or record
+
+        script = ScriptedInput(HR_ANSWERS)
+        with _quiet(quiet):
+            session_id, elapsed_ms = _timed(
+                lambda: general_agent.run_general_hr_interview(record["phone"], metadata, input_fn=script)
+            )
+        hr_timings.append(elapsed_ms)
+        hr_turns.append(script.calls)
+        hr_completed += session_id is not None
+
+        history = [
+            {"speaker": m.type, "text": m.content, "timestamp": None}
+            for m in general_agent.get_session_history(session_id).messages
+        ] if session_id else []
+        script = ScriptedInput(TECH_ANSWERS)
+        with _quiet(quiet):
+            resume_text = data_loader.load_full_resume_text(record["phone"]) or ""
+            _, elapsed_ms = _timed(
+                lambda: technical_agent.interview_loop(resume_text, history, input_fn=script)
+            )
+        tech_timings.append(elapsed_ms)
+        tech_turns.append(script.calls)
+
+    return {
+        "run_general_hr_interview": dict(
+            _stats(hr_timings),
+            mean_turns=round(statistics.fmean(hr_turns), 2),
+            completed_rate=round(hr_completed / samples, 4),
+        ),
+        "interview_loop": dict(_stats(tech_timings), mean_turns=round(statistics.fmean(tech_turns), 2)),
+    }
+
+
+def run(sizes: list, lookups: int, interviews: int, llm_latency_ms: float, tokens_per_sec: float,
+        seed: int, real_embeddings: bool, quiet: bool = True) -> dict:
+    if not real_embeddings:
+        embeddings.set_model(HashEmbedder())
+    general_agent.llm = FakeChatModel(
+        responses=HR_RESPONSES, latency_ms=llm_latency_ms, tokens_per_sec=tokens_per_sec
+    )
+    technical_agent.llm = FakeChatModel(
+        responses=TECH_RESPONSES, latency_ms=llm_latency_ms, tokens_per_sec=tokens_per_sec
+    )
+
+    results = {}
+    for size in sizes:
+        rng = random.Random(seed)
+        records = [
+            {k: v for k, v in record.items() if not k.startswith("_")}
+            for record in generate_candidates(size, seed=seed)
+        ]
+        index, ingest_stats = bench_ingest(records, quiet)
+        data_loader.index = index
+        results[str(size)] = {
+            "ingest_all_resumes": ingest_stats,
+            **bench_lookups(records, lookups, rng, quiet),
+            **bench_interviews(records, interviews, rng, quiet),
+        }
+        print(f"  corpus={size}: ingest {ingest_stats['total_ms']:.0f} ms, "
+              f"lookup p50 {results[str(size)]['get_candidate_by_phone']['p50_ms']:.2f} ms")
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(results: dict, config: dict, out_dir: str = RESULTS_DIR) -> str:
+    os.makedirs(out_dir, exist_ok=True)
+    commit = _git_commit()
+    path = os.path.join(out_dir, f"pipeline-{commit}-{datetime.now().strftime('%Y%m%d%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "benchmark": "pipeline",
+            "commit": commit,
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "config": config,
+            "results": results,
+        }, f, indent=2)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--lookups", type=int, default=200, help="Phone lookups / resume loads per size.")
+    parser.add_argument("--interviews", type=int, default=5, help="Scripted HR + technical interviews per size.")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Fake LLM time to first token.")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="Fake LLM output rate (0 = instant).")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--real-embeddings", action="store_true",
+                        help="Use the sentence-transformers model instead of the hashing embedder.")
+    parser.add_argument("--out-dir", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    # Lookups go through the vector path whatever .env says
+    data_loader.USE_PINECONE = True
+    config = {k: v for k, v in vars(args).items() if k != "out_dir"}
+    print(f"Running pipeline benchmark: {config}")
+    results = run(args.sizes, args.lookups, args.interviews, args.llm_latency_ms,
+                  args.tokens_per_sec, args.seed, args.real_embeddings)
+    print(f"Saved results: {save_results(results, config, args.out_dir)}")
+
+
+if __name__ == "__main__":
+    main()
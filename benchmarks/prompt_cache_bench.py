@@ -0,0 +1,202 @@
+"""
+Measure prompt-prefix cache hit rates of the agents' prompts against a stub Groq server.
+
+    python -m benchmarks.prompt_cache_bench --repeat 20 --parallel 4
+    python -m benchmarks.prompt_cache_bench --serve-only --port 8765   # point GROQ_API_BASE at it
+
+The stub speaks the Groq (OpenAI-compatible) chat completions API, streaming and
+non-streaming, and simulates provider prefix caching: a request's cached tokens
+are those of its longest message-aligned prefix already seen in an earlier request.
+The real ChatGroq client drives it through agent.replay, so what is measured is
+exactly what the agents send.
+"""
+import json
+import time
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fakes import HR_RESPONSES, TECH_RESPONSES
+
+HR_MARKER = "HR recruiter"
+
+
+def _estimate_tokens(text: str) -> int:
+    # ~4 characters per token plus per-message framing
+    return len(text) // 4 + 4
+
+
+class PrefixCache:
+    """Message-aligned prefix cache with LRU eviction, shared by all requests."""
+
+    def __init__(self, max_entries: int = 100_000, min_tokens: int = 0):
+        self.max_entries = max_entries
+        self.min_tokens = min_tokens
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def account(self, messages: list) -> tuple:
+        """(prompt_tokens, cached_tokens) for one request; remembers its prefixes."""
+        digest = hashlib.sha256()
+        prefixes, total = [], 0
+        for message in messages:
+            content = message.get("content") or ""
+            digest.update(f"{message.get('role')}\x00{content}\x01".encode("utf-8"))
+            total += _estimate_tokens(content)
+            prefixes.append((digest.hexdigest(), total))
+
+        with self._lock:
+            cached = 0
+            for key, tokens in prefixes:
+                if key in self._seen:
+                    self._seen.move_to_end(key)
+                    cached = tokens
+            if cached < self.min_tokens:
+                cached = 0
+            for key, _ in prefixes:
+                self._seen[key] = True
+            while len(self._seen) > self.max_entries:
+                self._seen.popitem(last=False)
+            self.requests += 1
+            self.prompt_tokens += total
+            self.cached_tokens += cached
+        return total, cached
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "hit_rate": round(self.cached_tokens / self.prompt_tokens, 4) if self.prompt_tokens else None,
+            }
+
+
+def _reply(messages: list) -> str:
+    """Deterministic answer: walks the HR or technical script by assistant-turn count."""
+    responses = HR_RESPONSES if any(HR_MARKER in (m.get("content") or "") for m in messages) else TECH_RESPONSES
+    turn = sum(1 for m in messages if m.get("role") == "assistant")
+    return responses[min(turn, len(responses) - 1)]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    cache: PrefixCache = None
+    latency_ms: float = 0.0
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        messages = body.get("messages", [])
+        prompt_tokens, cached_tokens = self.cache.account(messages)
+        text = _reply(messages)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(text.split()),
+            "total_tokens": prompt_tokens + len(text.split()),
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        base = {"id": f"stub-{time.time_ns()}", "created": int(time.time()), "model": body.get("model", "stub")}
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            words = text.split(" ")
+            for i, word in enumerate(words):
+                chunk = dict(base, object="chat.completion.chunk", choices=[{
+                    "index": 0,
+                    "delta": {"role": "assistant", "content": word if i == 0 else " " + word},
+                    "finish_reason": None,
+                }])
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            final = dict(base, object="chat.completion.chunk",
+                         choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                         usage=usage, x_groq={"id": base["id"], "usage": usage})
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            return
+
+        payload = json.dumps(dict(base, object="chat.completion", usage=usage, choices=[{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": "stop",
+        }])).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub(port: int = 0, latency_ms: float = 0.0, min_tokens: int = 0) -> tuple:
+    """Run the stub on a daemon thread; returns (server, base_url, PrefixCache)."""
+    cache = PrefixCache(min_tokens=min_tokens)
+    handler = type("BoundStubHandler", (StubHandler,), {"cache": cache, "latency_ms": latency_ms})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="Replays of each synthetic script.")
+    parser.add_argument("--parallel", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Stub response delay.")
+    parser.add_argument("--min-prefix-tokens", type=int, default=0,
+                        help="Ignore cached prefixes shorter than this (providers cache in blocks).")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--serve-only", action="store_true", help="Run the stub server until interrupted.")
+    parser.add_argument("--real-embeddings", action="store_true",
+                        help="Use the sentence-transformers model for intent checks instead of the hashing embedder.")
+    args = parser.parse_args()
+
+    server, base_url, cache = start_stub(args.port, args.latency_ms, args.min_prefix_tokens)
+    if args.serve_only:
+        print(f"Stub Groq API at {base_url} (set GROQ_API_BASE={base_url}). Ctrl+C to stop.")
+        try:
+            while True:
+                time.sleep(5)
+                print(f"  {cache.stats()}")
+        except KeyboardInterrupt:
+            return
+
+    from langchain_groq import ChatGroq
+    from agent import general_agent, technical_agent, replay
+    from agent.llm_cache import cache_stats
+
+    if not args.real_embeddings:
+        from agent import embeddings
+        from benchmarks.fakes import HashEmbedder
+        embeddings.set_model(HashEmbedder())
+
+    for module in (general_agent, technical_agent):
+        module.llm = ChatGroq(temperature=0.3, groq_api_key="stub", model_name="stub-model", groq_api_base=base_url)
+
+    scripts = [dict(s, id=f"{s['id']}#{n}") for s in replay.SYNTHETIC_SCRIPTS for n in range(args.repeat)]
+    report = replay.run_replays(scripts, parallel=args.parallel, lookup=False)
+    replay.print_report(report)
+    server.shutdown()
+
+    stats = cache.stats()
+    print("\n===== Prompt Prefix Cache (stub server) =====")
+    print(f"Requests: {stats['requests']}, prompt tokens: {stats['prompt_tokens']}, "
+          f"cached: {stats['cached_tokens']} ({(stats['hit_rate'] or 0) * 100:.1f}% of prompt tokens)")
+    local = cache_stats()
+    if local:
+        print(f"Local response cache: {local['hits']} hit(s), {local['misses']} miss(es), hit rate {local['hit_rate']}")
+
+
+if __name__ == "__main__":
+    main()
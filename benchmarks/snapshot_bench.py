@@ -0,0 +1,133 @@
+"""
+Reload time from an index snapshot versus a full re-ingest.
+
+    python -m benchmarks.snapshot_bench --vectors 1000000
+    python -m benchmarks.snapshot_bench --vectors 200000 --hash-embeddings   # plumbing check without the model
+
+The source index is synthesised page by page (synthetic resumes through
+ingest.embed_and_upsert with the hashing embedder), so memory stays flat at any
+size. It is exported once. Then the snapshot is reloaded in two ways:
+- into a LocalIndex (memory-mapped Arrow, one matrix copy);
+- with parallel upserts into benchmarks.fakes.FakeRemoteIndex, which sleeps
+  --upsert-latency-ms per request like a network round-trip.
+
+The full re-ingest figure is extrapolated from a sample of candidates. Each
+sample candidate pays --parse-ms for the LLM resume parse, embeds with the
+configured model and makes one upsert round-trip, sequentially, as ingest does.
+"""
+import os
+import time
+import argparse
+import tempfile
+
+from agent import embeddings
+from agent.ingest import embed_and_upsert
+from agent.index_snapshot import export_snapshot, import_snapshot, load_local_index
+from benchmarks.fakes import FakeRemoteIndex, HashEmbedder
+from benchmarks.synthetic import generate_candidates
+
+# Synthetic resumes fit in one chunk: one chunk vector plus one phone vector each
+VECTORS_PER_CANDIDATE = 2
+
+
+class _Capture:
+    def __init__(self):
+        self.vectors = []
+
+    def upsert(self, vectors, **kwargs):
+        self.vectors.extend(vectors)
+
+
+class _Vector:
+    def __init__(self, record):
+        self.values = record["values"]
+        self.metadata = record["metadata"]
+
+
+class SyntheticIndex:
+    """list()/fetch() over synthetic candidates, generated on demand."""
+
+    def __init__(self, candidates: int, seed: int = 0):
+        self.candidates = candidates
+        self.seed = seed
+        self.embedder = HashEmbedder()
+
+    def list(self, limit: int = 100, **kwargs):
+        per_page = max(limit // VECTORS_PER_CANDIDATE, 1)
+        for start in range(0, self.candidates, per_page):
+            yield [(start, min(start + per_page, self.candidates))]
+
+    def fetch(self, ids, **kwargs):
+        (start, stop), = ids
+        capture = _Capture()
+        for i, data in enumerate(generate_candidates(stop - start, seed=self.seed + start)):
+            embed_and_upsert(capture, self.embedder, f"candidate_{start + i}", data)
+        return {"vectors": {v["id"]: _Vector(v) for v in capture.vectors}}
+
+
+def dir_size_mb(path: str) -> float:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1e6
+
+
+def reingest_seconds_per_candidate(sample: int, parse_ms: float, upsert_latency_ms: float) -> float:
+    model = embeddings.get_model()
+    sink = FakeRemoteIndex(upsert_latency_ms)
+    candidates = generate_candidates(sample, seed=12345)
+    embed_and_upsert(sink, model, "warmup", candidates[0])
+    start = time.perf_counter()
+    for i, data in enumerate(candidates):
+        embed_and_upsert(sink, model, f"candidate_{i}", data)
+    return (time.perf_counter() - start) / sample + parse_ms / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["arrow", "parquet"], default="arrow")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--upsert-latency-ms", type=float, default=40.0)
+    parser.add_argument("--parse-ms", type=float, default=4000.0, help="LLM resume parse per candidate.")
+    parser.add_argument("--ingest-sample", type=int, default=200)
+    parser.add_argument("--skip-local", action="store_true", help="Skip the in-memory LocalIndex load.")
+    parser.add_argument("--hash-embeddings", action="store_true",
+                        help="Use the hashing embedder for the re-ingest sample instead of the real model.")
+    args = parser.parse_args()
+    if args.hash_embeddings:
+        embeddings.set_model(HashEmbedder())
+
+    candidates = args.vectors // VECTORS_PER_CANDIDATE
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_dir = os.path.join(tmp, "snapshot")
+        start = time.perf_counter()
+        manifest = export_snapshot(SyntheticIndex(candidates), snapshot_dir, fmt=args.format, page_size=1000)
+        export_s = time.perf_counter() - start
+        print(f"Exported {manifest['count']} vectors ({manifest['candidates']} candidates) in {export_s:.1f}s "
+              f"(including synthesis), {dir_size_mb(snapshot_dir):.0f} MB as {args.format}\n")
+
+        results = []
+        if not args.skip_local:
+            start = time.perf_counter()
+            local = load_local_index(snapshot_dir)
+            results.append(("snapshot -> LocalIndex", time.perf_counter() - start))
+            assert len(local) == manifest["count"]
+            del local
+
+        sink = FakeRemoteIndex(args.upsert_latency_ms)
+        stats = import_snapshot(sink, snapshot_dir, batch_size=args.batch_size, workers=args.workers)
+        assert sink.count == manifest["count"]
+        results.append((f"snapshot -> remote ({args.workers} workers x {args.batch_size})", stats["elapsed_s"]))
+
+    per_candidate = reingest_seconds_per_candidate(args.ingest_sample, args.parse_ms, args.upsert_latency_ms)
+    results.append(("full re-ingest (extrapolated)", per_candidate * candidates))
+
+    reingest_s = results[-1][1]
+    print(f"{'reload path':<44} {'time':>10} {'vectors/s':>12} {'speed-up':>9}")
+    for name, seconds in results:
+        print(f"{name:<44} {seconds:>9.1f}s {manifest['count'] / seconds:>12.1f} {reingest_s / seconds:>8.0f}x")
+    print(f"\nRe-ingest: {per_candidate * 1000:.0f} ms per candidate ({args.parse_ms:.0f} ms parse, "
+          f"embedding with {type(embeddings.get_model()).__name__}, one {args.upsert_latency_ms:.0f} ms upsert)")
+
+
+if __name__ == "__main__":
+    main()
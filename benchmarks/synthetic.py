@@ -0,0 +1,66 @@
+import random
+
+# Names, cities, skills and roles are shared with the parser's load-test generator
+from resumeparser.parser.parser_utils.synthetic import CITIES, FIRST_NAMES, LAST_NAMES, ROLES, SKILLS
+
+CERTIFICATIONS = [
+    "AWS Certified Solutions Architect", "CKA Kubernetes Administrator", "Azure AI Engineer Associate",
+    "Google Professional Data Engineer", "TensorFlow Developer Certificate", "Databricks Spark Associate",
+]
+# Made-up employer names: unlike the parser's, they are rare words, so they work as exact-match queries
+COMPANIES = [
+    "Zentrix Labs", "Quorvane Systems", "Helixor Analytics", "Brightwave Tech", "Nimbuscale",
+    "Orvanta Digital", "Kestrel AI", "Lumora Networks", "Tessaract Data", "Vantiq Cloud",
+]
+
+# Project themes, each described with two different vocabularies: the resume uses
+# one wording and benchmark queries use the other, so only semantic search matches.
+PROJECT_THEMES = {
+    "chatbot": ("Developed an LLM-powered dialogue assistant answering customer tickets",
+                "built a conversational chatbot with large language models"),
+    "fraud": ("Trained anomaly detectors flagging suspicious card transactions",
+              "machine learning system for detecting payment fraud"),
+    "forecast": ("Predicted weekly store demand using gradient boosted time-series models",
+                 "sales forecasting for retail inventory"),
+    "vision": ("Built a defect spotting pipeline for factory camera images",
+               "computer vision quality inspection on a manufacturing line"),
+    "search": ("Implemented semantic retrieval over product catalogs with vector embeddings",
+               "ecommerce search engine using dense vectors"),
+    "etl": ("Orchestrated nightly Airflow DAGs moving terabytes into the warehouse",
+            "data pipeline engineering for a data lake"),
+}
+
+
+def generate_candidates(count: int, seed: int = 0) -> list:
+    """
+    Synthetic parsed resumes (same shape as the parser API response), each with a
+    certification, employer and project theme usable as relevance labels.
+    """
+    rng = random.Random(seed)
+    candidates = []
+    for i in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        skills = rng.sample(SKILLS, rng.randint(3, 8))
+        company = rng.choice(COMPANIES)
+        certification = rng.choice(CERTIFICATIONS)
+        theme = rng.choice(list(PROJECT_THEMES))
+        candidates.append({
+            "name": name,
+            "email": f"{name.split()[0].lower()}.{i}@example.com",
+            "phone": f"9{i:09d}",
+            "location": rng.choice(CITIES),
+            "experience_years": rng.randint(0, 12),
+            "skills": skills,
+            "current_role": rng.choice(ROLES),
+            "company": company,
+            "education": [f"B.Tech Computer Science, Batch {rng.randint(2008, 2024)}", certification],
+            "projects": [
+                {"title": f"{theme.title()} platform", "description": PROJECT_THEMES[theme][0]},
+                {"title": f"{skills[0]} tooling", "description": f"Internal {skills[0]} utilities for {company}."},
+            ],
+            "work_experience": [f"{rng.choice(ROLES)} at {company}"],
+            # Labels for benchmarks; not part of the parser schema
+            "_certification": certification,
+            "_theme": theme,
+        })
+    return candidates
@@ -0,0 +1,144 @@
+"""
+Recall@k versus memory and query latency of vector compression settings
+(agent/vector_compression.py) on a synthetic resume corpus.
+
+    python -m benchmarks.vector_compression_bench --candidates 20000
+    python -m benchmarks.vector_compression_bench --candidates 50000 --hash-embeddings
+
+Each setting is fitted on the corpus, loaded into a LocalIndex at its storage
+precision and queried through the same transform. recall@k is the overlap with
+the exact top-k over the uncompressed float32 vectors. phone@1 is how often a
+phone lookup ("Phone number: ...") still returns that candidate's phone entry
+first, which is what get_candidate_by_phone relies on. Both count exact-score
+ties as hits (the hashing embedder gives many phone numbers the same vector).
+"""
+import time
+import random
+import argparse
+import statistics
+
+import numpy as np
+
+from agent import embeddings
+from agent.ingest import chunk_resume, generate_resume_text
+from agent.vector_compression import QUANTIZATIONS, VectorTransform
+from benchmarks.fakes import HashEmbedder
+from benchmarks.synthetic import CITIES, PROJECT_THEMES, ROLES, SKILLS, generate_candidates
+
+
+def build_corpus(count: int, seed: int):
+    """Ids and texts of every chunk and phone vector ingest would store, plus the phone numbers."""
+    ids, texts, phones = [], [], []
+    for i, data in enumerate(generate_candidates(count, seed=seed)):
+        for j, chunk in enumerate(chunk_resume(generate_resume_text(data))):
+            ids.append(f"candidate_{i}_chunk_{j}")
+            texts.append(chunk)
+        ids.append(f"candidate_{i}_phone")
+        texts.append(f"Phone number: {data['phone']}")
+        phones.append(data["phone"])
+    return ids, texts, phones
+
+
+def build_queries(phones: list, count: int, rng: random.Random) -> list:
+    """(kind, text, expected id) - phone lookups expect their phone entry, search queries nothing specific."""
+    queries = []
+    for i in range(count):
+        if i % 2 == 0:
+            index = rng.randrange(len(phones))
+            queries.append(("phone", f"Phone number: {phones[index]}", f"candidate_{index}_phone"))
+        elif i % 4 == 1:
+            queries.append(("search", rng.choice(list(PROJECT_THEMES.values()))[1], None))
+        else:
+            skills = ", ".join(rng.sample(SKILLS, 3))
+            queries.append(("search", f"{rng.choice(ROLES)} in {rng.choice(CITIES)} with {skills}", None))
+    return queries
+
+
+def embed(model, texts: list, batch_size: int = 256) -> np.ndarray:
+    return np.concatenate([np.asarray(model.encode(texts[i:i + batch_size]), dtype="float32")
+                           for i in range(0, len(texts), batch_size)])
+
+
+def exact_scores(corpus: np.ndarray, queries: np.ndarray, k: int):
+    """Exact cosine scores (queries x corpus) and each query's k-th best score."""
+    norms = np.linalg.norm(corpus, axis=1, keepdims=True)
+    scores = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ (corpus / np.where(norms, norms, 1.0)).T
+    return scores, -np.partition(-scores, k - 1, axis=1)[:, k - 1]
+
+
+def evaluate(transform: VectorTransform, ids: list, corpus: np.ndarray, queries: list, query_vectors: np.ndarray,
+             truth: tuple, k: int) -> dict:
+    start = time.perf_counter()
+    reduced = transform.reduce(corpus)
+    index = transform.local_index(capacity=len(ids))
+    for lo in range(0, len(ids), 1000):
+        index.upsert(vectors=[(ids[i], reduced[i]) for i in range(lo, min(lo + 1000, len(ids)))])
+    load_s = time.perf_counter() - start
+
+    slot = {vid: i for i, vid in enumerate(ids)}
+    recalls, phone_hits, latencies = [], [], []
+    scores, kth = truth
+    for q, ((kind, _, expected), vector) in enumerate(zip(queries, transform.reduce(query_vectors))):
+        start = time.perf_counter()
+        matches = index.query(vector=vector, top_k=k).matches
+        latencies.append((time.perf_counter() - start) * 1000)
+        found = [slot[m.id] for m in matches]
+        recalls.append(np.count_nonzero(scores[q, found] >= kth[q] - 1e-6) / k)
+        if kind == "phone":
+            phone_hits.append(bool(found) and bool(scores[q, found[0]] >= scores[q, slot[expected]] - 1e-6))
+    latencies.sort()
+    return {
+        "bytes_per_vector": transform.bytes_per_vector,
+        "index_mb": index.describe_index_stats()["vector_bytes"] / 1e6,
+        "recall": statistics.mean(recalls),
+        "phone_at_1": statistics.mean(phone_hits) if phone_hits else float("nan"),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[max(int(len(latencies) * 0.95) - 1, 0)],
+        "load_s": load_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dims", default="64,128,192", help="Comma-separated reduced dimensions.")
+    parser.add_argument("--methods", default="pca,truncate")
+    parser.add_argument("--quantizations", default=",".join(QUANTIZATIONS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hash-embeddings", action="store_true",
+                        help="Use the hashing embedder instead of the sentence-transformers model.")
+    args = parser.parse_args()
+
+    model = HashEmbedder() if args.hash_embeddings else embeddings.get_model()
+    ids, texts, phones = build_corpus(args.candidates, args.seed)
+    queries = build_queries(phones, args.queries, random.Random(args.seed))
+    start = time.perf_counter()
+    corpus = embed(model, texts)
+    query_vectors = embed(model, [text for _, text, _ in queries])
+    print(f"Embedded {len(corpus)} vectors ({corpus.shape[1]}-d, {type(model).__name__}) "
+          f"and {len(queries)} queries in {time.perf_counter() - start:.1f}s\n")
+    truth = exact_scores(corpus, query_vectors, args.k)
+
+    settings = [("none", None)]
+    for method in args.methods.split(","):
+        settings += [(method, int(dim)) for dim in args.dims.split(",")]
+    header = (f"{'reduction':<13} {'storage':<8} {'bytes/vec':>9} {'index MB':>9} {f'recall@{args.k}':>10} "
+              f"{'phone@1':>8} {'p50 ms':>7} {'p95 ms':>7} {'fit s':>6}")
+    print(header)
+    print("-" * len(header))
+    for method, dim in settings:
+        for quantization in args.quantizations.split(","):
+            start = time.perf_counter()
+            transform = VectorTransform.fit(corpus, method, dim or corpus.shape[1], quantization, seed=args.seed)
+            fit_s = time.perf_counter() - start
+            r = evaluate(transform, ids, corpus, queries, query_vectors, truth, args.k)
+            label = method if method == "none" else f"{method}-{dim}"
+            print(f"{label:<13} {quantization:<8} {r['bytes_per_vector']:>9} {r['index_mb']:>9.1f} "
+                  f"{r['recall']:>10.3f} {r['phone_at_1']:>8.3f} {r['p50_ms']:>7.2f} {r['p95_ms']:>7.2f} "
+                  f"{fit_s:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
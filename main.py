@@ -2,6 +2,7 @@
 
 import sys
 from agent.interview_manager import main as run_interview
+from agent import tracing
 
 def main():
     """
@@ -10,7 +11,8 @@ def main():
       1. Prompt for phone number, confirm candidate details (via Pinecone).
       2. Run the general HR agent.
       3. Run the technical agent (seeded with resume + HR history).
-      4. Save a single JSON transcript named {Name}-{Phone}.json.
+      4. Append every turn to the transcript store (agent/transcript_store.py).
+    With TRACING_ENABLED=true, a per-stage latency summary is printed at the end.
     """
     try:
         run_interview()
@@ -20,6 +22,9 @@ def main():
     except Exception as e:
         print(f"\n❗ An error occurred: {e}")
         sys.exit(1)
+    finally:
+        if tracing.TRACING_ENABLED:
+            tracing.print_summary()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from parser.models import ParsedResume
+from parser.parser_utils.resume_store import normalize_phone, compute_content_hash, sync_skill_links
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill phone_normalized/content_hash and the skill links on rows created before they existed. "
+        "When several rows share a phone, the newest gets the keys; the older ones are listed and only "
+        "deleted with --delete-duplicates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--delete-duplicates", action="store_true",
+                            help="Delete the older rows that collide with a keyed row (default: leave them unkeyed).")
+
+    def handle(self, *args, **options):
+        rows = ParsedResume.objects.filter(content_hash__isnull=True).order_by("-created_at", "-id")
+        seen_phones = dict(
+            ParsedResume.objects.filter(phone_normalized__isnull=False).values_list("phone_normalized", "id")
+        )
+        seen_hashes = dict(
+            ParsedResume.objects.filter(content_hash__isnull=False).values_list("content_hash", "id")
+        )
+        updates, duplicates = [], []
+        for row in rows.iterator():
+            phone = normalize_phone(row.phone) or None
+            content_hash = compute_content_hash(row.__dict__)
+            kept = (seen_phones.get(phone) if phone else None) or seen_hashes.get(content_hash)
+            if kept is not None:
+                duplicates.append((row.pk, kept))
+                continue
+            if phone:
+                seen_phones[phone] = row.pk
+            seen_hashes[content_hash] = row.pk
+            row.phone_normalized = phone
+            row.content_hash = content_hash
+            updates.append(row)
+
+        self.stdout.write(f"{len(updates)} row(s) to backfill, {len(duplicates)} older duplicate(s).")
+        for pk, kept in duplicates:
+            self.stdout.write(f"  duplicate pk={pk} (same phone or content as pk={kept})")
+        if options["dry_run"]:
+            return
+        with transaction.atomic():
+            if options["delete_duplicates"]:
+                ParsedResume.objects.filter(pk__in=[pk for pk, _ in duplicates]).delete()
+            ParsedResume.objects.bulk_update(updates, ["phone_normalized", "content_hash"], batch_size=1000)
+            for start in range(0, len(updates), 1000):
+                sync_skill_links({row.pk: row.skills for row in updates[start:start + 1000]})
+        if duplicates and options["delete_duplicates"]:
+            self.stdout.write(f"Deleted {len(duplicates)} duplicate(s).")
+        elif duplicates:
+            self.stdout.write("Duplicates kept without keys; rerun with --delete-duplicates to remove them.")
+        self.stdout.write("Backfill complete.")
@@ -0,0 +1,139 @@
+import time
+import random
+import statistics
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from parser.models import ParsedResume, ResumeVersion, ResumeLSHBucket
+from parser.parser_utils.near_duplicates import fingerprint, find_near_duplicate, normalize_words, shingles
+from parser.parser_utils.resume_store import bulk_upsert_parsed_resumes
+from parser.parser_utils.synthetic import SENTENCES, generate_parsed_resumes, render_resume_text
+
+FILLER = ["senior", "production", "scalable", "internal", "customer", "realtime", "critical", "new"]
+
+
+def mutate(text: str, rng: random.Random, edits: int) -> str:
+    """A re-saved resume: a few words changed, lines dropped, added or moved."""
+    lines = text.split("\n")
+    for _ in range(edits):
+        op = rng.random()
+        i = rng.randrange(len(lines))
+        if op < 0.4:
+            words = lines[i].split()
+            if words:
+                words[rng.randrange(len(words))] = rng.choice(FILLER)
+                lines[i] = " ".join(words)
+        elif op < 0.6 and len(lines) > 10:
+            del lines[i]
+        elif op < 0.8:
+            lines.insert(i, rng.choice(SENTENCES).format(skill="Python", n=rng.randint(2, 90), company="Acme Corp"))
+        else:
+            j = rng.randrange(len(lines))
+            lines[i], lines[j] = lines[j], lines[i]
+    return "\n".join(lines)
+
+
+def jaccard(a: str, b: str) -> float:
+    sa, sb = shingles(normalize_words(a)), shingles(normalize_words(b))
+    return len(sa & sb) / len(sa | sb)
+
+
+class Command(BaseCommand):
+    help = "Seed resume signatures and time near-duplicate lookups (LSH buckets vs a full signature scan)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=20_000)
+        parser.add_argument("--queries", type=int, default=200, help="Edited copies; as many unrelated resumes.")
+        parser.add_argument("--edits", type=int, default=4, help="Edits per copy.")
+        parser.add_argument("--phone-prefix", default="93")
+        parser.add_argument("--keep", action="store_true")
+
+    def _seed(self, rows, prefix):
+        records = list(generate_parsed_resumes(rows, seed=11, phone_prefix=prefix))
+        bulk_upsert_parsed_resumes(records)
+        ids = dict(ParsedResume.objects.filter(phone_normalized__startswith=prefix)
+                   .values_list("phone_normalized", "id"))
+        texts = {}
+        with transaction.atomic():
+            for start in range(0, len(records), 1000):
+                batch = records[start:start + 1000]
+                versions, keys = [], []
+                for data in batch:
+                    text = render_resume_text(data)
+                    fp = fingerprint(text)
+                    resume_id = ids["".join(filter(str.isdigit, data["phone"]))[-10:]]
+                    texts[resume_id] = text
+                    versions.append(ResumeVersion(resume_id=resume_id, text_hash=fp.text_hash, minhash=fp.signature))
+                    keys.append(fp.band_keys)
+                ResumeVersion.objects.bulk_create(versions)
+                ResumeLSHBucket.objects.bulk_create([
+                    ResumeLSHBucket(key=key, version=version)
+                    for version, version_keys in zip(versions, keys) for key in version_keys
+                ])
+        return texts
+
+    def handle(self, *args, **options):
+        prefix = options["phone_prefix"]
+        synthetic = ParsedResume.objects.filter(phone_normalized__startswith=prefix)
+        threshold = settings.RESUME_DEDUP_THRESHOLD
+        ResumeVersion.objects.filter(resume__in=synthetic).delete()  # left by an earlier --keep run
+        start = time.perf_counter()
+        texts = self._seed(options["rows"], prefix)
+        self.stdout.write(f"Seeded {len(texts)} resume signatures in {time.perf_counter() - start:.1f}s "
+                          f"({ResumeLSHBucket.objects.count()} bucket rows)\n")
+
+        rng = random.Random(5)
+        originals = rng.sample(sorted(texts), min(options["queries"], len(texts)))
+        edited = [(resume_id, mutate(texts[resume_id], rng, options["edits"])) for resume_id in originals]
+        unrelated = [render_resume_text(data, seed=99) for data in
+                     generate_parsed_resumes(options["queries"], seed=99, phone_prefix="00")]
+
+        # Baseline without LSH: every stored signature compared in memory (loading them is not timed)
+        matrix = np.array(list(ResumeVersion.objects.filter(resume__phone_normalized__startswith=prefix)
+                               .values_list("minhash", flat=True)), dtype=np.uint64)
+
+        lsh_ms, scan_ms, fingerprint_ms = [], [], []
+        found = missed = wrong = false_positives = should_match = 0
+        for expected, text in [(rid, t) for rid, t in edited] + [(None, t) for t in unrelated]:
+            t0 = time.perf_counter()
+            fp = fingerprint(text)
+            t1 = time.perf_counter()
+            match = find_near_duplicate(fp, threshold)
+            t2 = time.perf_counter()
+            (matrix == np.asarray(fp.signature, dtype=np.uint64)).mean(axis=1).max()
+            t3 = time.perf_counter()
+            fingerprint_ms.append((t1 - t0) * 1000)
+            lsh_ms.append((t2 - t1) * 1000)
+            scan_ms.append((t3 - t2) * 1000)
+
+            if expected is None:
+                false_positives += match is not None
+                continue
+            similar = jaccard(text, texts[expected]) >= threshold
+            should_match += similar
+            if match is None:
+                missed += similar
+            elif match.version.resume_id == expected:
+                found += similar
+            else:
+                wrong += 1
+
+        def p(samples, q):
+            return sorted(samples)[int(len(samples) * q) - 1 if len(samples) > 1 else 0]
+
+        self.stdout.write(f"{'step':<34} {'p50 ms':>8} {'p95 ms':>8}")
+        for label, samples in [("fingerprint (shingles + MinHash)", fingerprint_ms),
+                               ("LSH lookup (database)", lsh_ms), ("full signature scan (memory)", scan_ms)]:
+            self.stdout.write(f"{label:<34} {statistics.median(samples):>8.2f} {p(samples, 0.95):>8.2f}")
+        self.stdout.write(
+            f"\nEdited copies with shingle Jaccard >= {threshold}: {should_match}; "
+            f"found {found}, missed {missed}, linked to the wrong resume {wrong}"
+        )
+        self.stdout.write(f"Unrelated resumes wrongly linked: {false_positives}/{len(unrelated)}")
+
+        if not options["keep"]:
+            deleted, _ = synthetic.delete()
+            self.stdout.write(f"\nCleaned up {deleted} synthetic rows (including signatures).")
@@ -0,0 +1,98 @@
+import io
+import re
+import json
+import time
+import random
+from contextlib import redirect_stdout
+
+from django.core.management.base import BaseCommand
+
+from parser.parser_utils import llm_parser
+from parser.parser_utils.synthetic import generate_parsed_resumes, render_resume_text
+
+
+class StubLLM:
+    """
+    Stands in for llm_parser._complete: answers from the synthetic records, after
+    a fixed per-call overhead plus generation time. Packed answers drop or
+    corrupt a share of their items, to exercise the single-resume fallback.
+    """
+
+    def __init__(self, records, overhead_ms, tokens_per_s, error_rate, seed=0):
+        self.by_email = {r["email"]: r for r in records}
+        self.overhead_ms = overhead_ms
+        self.tokens_per_s = tokens_per_s
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.calls = self.prompt_tokens = self.completion_tokens = 0
+
+    def _extract(self, text):
+        email = re.search(r"[\w.]+@example\.com", text).group(0)
+        return dict(self.by_email[email])
+
+    def __call__(self, prompt):
+        blocks = re.findall(r"<<<RESUME (\S+)>>>\n(.*?)\n<<<END RESUME \1>>>", prompt, re.DOTALL)
+        if blocks:
+            items = []
+            for resume_id, text in blocks:
+                roll = self.rng.random()
+                if roll < self.error_rate / 2:
+                    continue  # dropped from the answer
+                item = {"resume_id": resume_id, **self._extract(text)}
+                if roll < self.error_rate:
+                    item["experience_years"] = "several"
+                items.append(item)
+            answer = json.dumps(items, indent=2)
+        else:
+            answer = json.dumps(self._extract(prompt.split("Resume text:", 1)[1]), indent=2)
+        self.calls += 1
+        self.prompt_tokens += len(prompt) // 4
+        self.completion_tokens += len(answer) // 4
+        time.sleep(self.overhead_ms / 1000 + len(answer) / 4 / self.tokens_per_s)
+        return answer
+
+
+class Command(BaseCommand):
+    help = "Compare one LLM call per resume with packed multi-resume extraction, against a stub LLM."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--resumes", type=int, default=120)
+        parser.add_argument("--sentences", type=int, default=10, help="Experience lines per synthetic resume.")
+        parser.add_argument("--overhead-ms", type=float, default=250.0, help="Stub latency per call.")
+        parser.add_argument("--tokens-per-s", type=float, default=1500.0, help="Stub generation speed.")
+        parser.add_argument("--error-rate", type=float, default=0.05,
+                            help="Share of packed items the stub drops or corrupts.")
+        parser.add_argument("--rpm", type=int, default=30, help="Requests-per-minute quota for the projection.")
+
+    def _run(self, label, fn, texts, records, options):
+        stub = StubLLM(records, options["overhead_ms"], options["tokens_per_s"], options["error_rate"])
+        original = llm_parser._complete
+        llm_parser._complete = stub
+        try:
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                results = fn(texts)
+            elapsed = time.perf_counter() - start
+        finally:
+            llm_parser._complete = original
+        correct = sum(
+            result is not None and all(result.get(k) == v for k, v in record.items())
+            for result, record in zip(results, records)
+        )
+        per_call = len(texts) / stub.calls
+        self.stdout.write(
+            f"{label:<8} {stub.calls:>6} {per_call:>10.2f} {len(texts) / elapsed:>10.1f} "
+            f"{stub.prompt_tokens / len(texts):>14.0f} {options['rpm'] * per_call:>13.0f} {correct:>5}/{len(texts)}"
+        )
+
+    def handle(self, *args, **options):
+        records = list(generate_parsed_resumes(options["resumes"], seed=3, phone_prefix="94"))
+        texts = [render_resume_text(r, sentences=options["sentences"]) for r in records]
+        self.stdout.write(
+            f"{len(texts)} resumes, {sum(map(len, texts)) // len(texts)} chars on average; packs of up to "
+            f"{llm_parser.GROQ_PACK_MAX_RESUMES} resumes / {llm_parser.GROQ_PACK_MAX_CHARS} chars\n"
+        )
+        self.stdout.write(f"{'mode':<8} {'calls':>6} {'res/call':>10} {'res/s':>10} {'prompt tok/res':>14} "
+                          f"{'res/min @rpm':>13} {'correct':>9}")
+        self._run("single", lambda batch: [llm_parser.extract_resume_data(t) for t in batch], texts, records, options)
+        self._run("packed", llm_parser.extract_resume_batch, texts, records, options)
@@ -0,0 +1,81 @@
+import time
+import statistics
+
+from django.core.management.base import BaseCommand
+
+from parser.models import ParsedResume
+from parser.parser_utils.resume_store import bulk_upsert_parsed_resumes
+from parser.parser_utils.skill_search import search_candidates
+from parser.parser_utils.synthetic import generate_parsed_resumes
+
+QUERIES = [
+    (["Python"], None),
+    (["Python", "LangChain"], 2),
+    (["Python", "LangChain", "Groq"], 5),
+    (["Kubernetes", "Spark", "Airflow"], None),
+    (["Rust"], None),
+]
+
+
+class Command(BaseCommand):
+    help = "Seed synthetic resumes and time skill search (normalized table vs JSONB containment)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--pages", type=int, default=5, help="Pages to walk per query.")
+        parser.add_argument("--phone-prefix", default="91")
+        parser.add_argument("--keep", action="store_true")
+
+    def _time(self, fn, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        return statistics.median(samples), samples[int(len(samples) * 0.95) - 1 if len(samples) > 1 else 0]
+
+    def handle(self, *args, **options):
+        prefix = options["phone_prefix"]
+        synthetic = ParsedResume.objects.filter(phone_normalized__startswith=prefix)
+        if synthetic.count() < options["rows"]:
+            self.stdout.write(f"Seeding {options['rows']} synthetic resumes...")
+            bulk_upsert_parsed_resumes(generate_parsed_resumes(options["rows"], phone_prefix=prefix))
+        self.stdout.write(f"Table size: {ParsedResume.objects.count()} rows\n")
+
+        header = f"{'query':<40} {'matches':>8} {'p50 ms':>8} {'p95 ms':>8} {'json p50':>9} {'pages ms':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for skills, min_exp in QUERIES:
+            label = " AND ".join(skills) + (f", exp>={min_exp}" if min_exp is not None else "")
+
+            p50, p95 = self._time(lambda: search_candidates(skills, min_experience=min_exp), options["repeat"])
+
+            # Same filter through the GIN index on the raw JSON field (exact-case match)
+            def json_query():
+                qs = ParsedResume.objects.filter(skills__contains=skills)
+                if min_exp is not None:
+                    qs = qs.filter(experience_years__gte=min_exp)
+                return list(qs.order_by("id").values_list("id", flat=True)[:50])
+            json_p50, _ = self._time(json_query, options["repeat"])
+
+            matches = ParsedResume.objects.filter(skills__contains=skills)
+            if min_exp is not None:
+                matches = matches.filter(experience_years__gte=min_exp)
+            total = matches.count()
+
+            # Walk the first N pages with keyset cursors
+            start = time.perf_counter()
+            cursor = None
+            for _ in range(options["pages"]):
+                _, cursor = search_candidates(skills, min_experience=min_exp, after_id=cursor)
+                if cursor is None:
+                    break
+            pages_ms = (time.perf_counter() - start) * 1000
+
+            self.stdout.write(f"{label:<40} {total:>8} {p50:>8.2f} {p95:>8.2f} {json_p50:>9.2f} {pages_ms:>9.2f}")
+
+        if not options["keep"]:
+            deleted, _ = synthetic.delete()
+            self.stdout.write(f"\nCleaned up {deleted} synthetic rows (including skill links).")
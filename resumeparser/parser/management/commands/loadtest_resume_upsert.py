@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from parser.models import ParsedResume
+from parser.parser_utils.resume_store import bulk_upsert_parsed_resumes
+from parser.parser_utils.synthetic import generate_parsed_resumes
+
+
+class Command(BaseCommand):
+    help = "Bulk-upsert synthetic parsed resumes and report rows/sec."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--phone-prefix", default="90",
+                            help="Prefix for synthetic phone numbers (used for cleanup).")
+        parser.add_argument("--keep", action="store_true",
+                            help="Keep the synthetic rows instead of deleting them afterwards.")
+
+    def _run(self, label, rows, batch_size, prefix, seed):
+        start = time.perf_counter()
+        stats = bulk_upsert_parsed_resumes(
+            generate_parsed_resumes(rows, seed=seed, phone_prefix=prefix),
+            batch_size=batch_size,
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{label:<10} {stats['received']:>8} rows in {elapsed:7.2f}s "
+            f"-> {stats['received'] / elapsed:9.0f} rows/sec "
+            f"(written={stats['written']}, unchanged={stats['unchanged']}, batches={stats['batches']})"
+        )
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        batch_size = options["batch_size"]
+        prefix = options["phone_prefix"]
+        synthetic = ParsedResume.objects.filter(phone_normalized__startswith=prefix)
+
+        self.stdout.write(f"Load test: {rows} synthetic resumes, batch size {batch_size or 'default'}")
+        # Insert, then replay identical content (no-op path), then changed content (update path)
+        self._run("insert", rows, batch_size, prefix, seed=0)
+        self._run("unchanged", rows, batch_size, prefix, seed=0)
+        self._run("update", rows, batch_size, prefix, seed=1)
+        self.stdout.write(f"Rows with prefix {prefix}: {synthetic.count()} (expected {rows})")
+
+        if not options["keep"]:
+            deleted, _ = synthetic.delete()
+            self.stdout.write(f"Cleaned up {deleted} synthetic rows.")
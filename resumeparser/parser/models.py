@@ -1,12 +1,25 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, transaction
+
+class Skill(models.Model):
+    # Lower-cased, whitespace-collapsed skill name (see resume_store.normalize_skill)
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
 
 class ParsedResume(models.Model):
     name = models.CharField(max_length=255, blank=True)
     email = models.EmailField(blank=True)
     phone = models.CharField(max_length=20, blank=True)
+    # Upsert keys: last 10 digits of `phone` and a hash of the parsed content.
+    # Both are nullable so rows without a phone (or legacy rows) don't collide.
+    phone_normalized = models.CharField(max_length=20, unique=True, null=True, blank=True)
+    content_hash = models.CharField(max_length=64, unique=True, null=True, blank=True)
     location = models.CharField(max_length=255, blank=True)
-    experience_years = models.FloatField(default=0)
+    experience_years = models.FloatField(default=0, db_index=True)
     skills = models.JSONField(default=list, blank=True)
+    normalized_skills = models.ManyToManyField(Skill, through="CandidateSkill", related_name="resumes", blank=True)
     current_role = models.CharField(max_length=255, blank=True)
     company = models.CharField(max_length=255, blank=True)
     education = models.JSONField(default=list, blank=True)
@@ -15,5 +28,63 @@ class ParsedResume(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # jsonb_path_ops GIN indexes serve containment lookups, e.g. skills__contains=["Python"]
+        indexes = [
+            GinIndex(fields=["skills"], name="resume_skills_gin", opclasses=["jsonb_path_ops"]),
+            GinIndex(fields=["projects"], name="resume_projects_gin", opclasses=["jsonb_path_ops"]),
+            GinIndex(fields=["work_experience"], name="resume_work_exp_gin", opclasses=["jsonb_path_ops"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        from .parser_utils.resume_store import normalize_phone, compute_content_hash, sync_skill_links
+        self.phone_normalized = normalize_phone(self.phone) or None
+        self.content_hash = compute_content_hash(self.__dict__)
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Keep the search table in step with admin and ORM edits too
+            if update_fields is None or "skills" in update_fields:
+                sync_skill_links({self.pk: self.skills})
+
     def __str__(self):
         return self.name or "Resume"
+
+class ResumeVersion(models.Model):
+    """
+    One uploaded resume text linked to its candidate, with the MinHash signature
+    used to spot near-duplicate uploads (see parser_utils/near_duplicates.py).
+    """
+    resume = models.ForeignKey(ParsedResume, on_delete=models.CASCADE, related_name="versions")
+    version = models.PositiveIntegerField(default=1)
+    # SHA-256 of the normalized text: exact re-uploads match without comparing signatures
+    text_hash = models.CharField(max_length=64, db_index=True)
+    minhash = models.JSONField(default=list)
+    # Estimated similarity to the version this upload was linked to (null for a new candidate)
+    similarity = models.FloatField(null=True, blank=True)
+    parsed = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["resume", "version"], name="unique_resume_version"),
+        ]
+
+    def __str__(self):
+        return f"{self.resume} v{self.version}"
+
+class ResumeLSHBucket(models.Model):
+    # "<band><hash of the band's MinHash rows>"; versions sharing a key are near-duplicate candidates
+    key = models.CharField(max_length=24, db_index=True)
+    version = models.ForeignKey(ResumeVersion, on_delete=models.CASCADE, related_name="buckets")
+
+class CandidateSkill(models.Model):
+    resume = models.ForeignKey(ParsedResume, on_delete=models.CASCADE, related_name="skill_links")
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="candidate_links")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["resume", "skill"], name="unique_resume_skill"),
+        ]
+        # Skill-first index: "all resumes with skill X" walks this in resume id order
+        indexes = [models.Index(fields=["skill", "resume"], name="candidate_skill_lookup")]
@@ -2,11 +2,19 @@ import requests
 import json
 import os
 import re
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+# Model routing for resume extraction: the small model handles typical resumes;
+# prompts above GROQ_EXTRACTION_SMALL_MAX_TOKENS (or a 429 on one model) go to the other.
+GROQ_EXTRACTION_MODEL = os.getenv("GROQ_EXTRACTION_MODEL", "llama3-8b-8192")
+GROQ_EXTRACTION_LARGE_MODEL = os.getenv("GROQ_EXTRACTION_LARGE_MODEL")
+GROQ_EXTRACTION_SMALL_MAX_TOKENS = int(os.getenv("GROQ_EXTRACTION_SMALL_MAX_TOKENS", "6000"))
 
 
 headers = {
@@ -14,13 +22,45 @@ headers = {
     "Content-Type": "application/json"
 }
 
-def extract_resume_data(resume_text):
-    prompt = f"""
-You are an AI resume parser. Extract the following fields from this resume text and return a valid JSON.
-Calculate total professional experience in years by analyzing the work experience timeline. Use the current date for "Present" if needed.
-Return output in exactly this format:
+def _extraction_models(prompt: str) -> list:
+    """Models to try for an extraction prompt, preferred first (~4 characters per token)."""
+    models = [GROQ_EXTRACTION_MODEL]
+    if GROQ_EXTRACTION_LARGE_MODEL and GROQ_EXTRACTION_LARGE_MODEL != GROQ_EXTRACTION_MODEL:
+        if len(prompt) // 4 > GROQ_EXTRACTION_SMALL_MAX_TOKENS:
+            models.insert(0, GROQ_EXTRACTION_LARGE_MODEL)
+        else:
+            models.append(GROQ_EXTRACTION_LARGE_MODEL)
+    return models
 
-{{
+
+def _complete(prompt: str) -> str:
+    """Run the extraction prompt on the routed model, falling back to the next one on HTTP 429."""
+    models = _extraction_models(prompt)
+    for i, model in enumerate(models):
+        data = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": "You are a helpful resume parsing assistant."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.2
+        }
+        start = time.perf_counter()
+        response = requests.post(GROQ_API_URL, headers=headers, json=data)
+        if response.status_code == 429 and i < len(models) - 1:
+            print(f"⚠️ {model} is rate limited, retrying on {models[i + 1]}")
+            continue
+        response.raise_for_status()  # Raise exception for HTTP errors
+
+        body = response.json()
+        usage = body.get("usage") or {}
+        print(f"⏱️ resume_extraction on {model}: {(time.perf_counter() - start) * 1000:.0f} ms, "
+              f"tokens in/out {usage.get('prompt_tokens')}/{usage.get('completion_tokens')}")
+        return body["choices"][0]["message"]["content"]
+
+
+# Output shape and field notes shared by the single and the packed extraction prompts
+RESUME_SCHEMA = """{
   "name": "",
   "email": "",
   "phone": "",
@@ -31,44 +71,44 @@ Return output in exactly this format:
   "company": "",
   "education": [],
   "projects": [
-    {{
+    {
       "title": "",
       "description": ""
-    }}
+    }
   ],
   "work_experience": []
-}}
+}"""
 
-Details:
+FIELD_DETAILS = """Details:
 - "location" is the candidate's city or region.
 - "experience_years" is the total years of professional experience (integer).
 - "current_role" and "company" indicate their present job title and employer.
 - "projects" is a list of projects with "title" and "description" fields.
-- "education" and "work_experience" should list relevant details in arrays.
+- "education" and "work_experience" should list relevant details in arrays."""
 
-Resume text:
-{resume_text}
-"""
+# Packed extraction: up to GROQ_PACK_MAX_RESUMES resumes and GROQ_PACK_MAX_CHARS of resume text
+# per call; longer resumes are extracted alone. The defaults keep prompt plus answer inside 8k tokens.
+GROQ_PACK_MAX_RESUMES = int(os.getenv("GROQ_PACK_MAX_RESUMES", "6"))
+GROQ_PACK_MAX_CHARS = int(os.getenv("GROQ_PACK_MAX_CHARS", "12000"))
+GROQ_PACK_MAX_RESUME_CHARS = int(os.getenv("GROQ_PACK_MAX_RESUME_CHARS", "4000"))
 
 
-    data = {
-        "model": "llama3-8b-8192",
-        "messages": [
-            {"role": "system", "content": "You are a helpful resume parsing assistant."},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.2
-    }
+def extract_resume_data(resume_text):
+    prompt = f"""
+You are an AI resume parser. Extract the following fields from this resume text and return a valid JSON.
+Calculate total professional experience in years by analyzing the work experience timeline. Use the current date for "Present" if needed.
+Return output in exactly this format:
 
-    response = requests.post(
-        "https://api.groq.com/openai/v1/chat/completions",
-        headers=headers,
-        json=data
-    )
+{RESUME_SCHEMA}
 
-    response.raise_for_status()  # Raise exception for HTTP errors
+{FIELD_DETAILS}
 
-    content = response.json()["choices"][0]["message"]["content"]
+Resume text:
+{resume_text}
+"""
+
+
+    content = _complete(prompt)
 
     try:
         # Extract JSON object using regex
@@ -82,4 +122,107 @@ Resume text:
         print(content)
         raise e
     print("Successfully parsed JSON: \n", parsed_json)
-    return parsed_json
\ No newline at end of file
+    return parsed_json
+
+
+def pack_resumes(resume_texts: list) -> list:
+    """
+    Group resume indexes into packs for extract_resume_batch, in input order.
+    Resumes over GROQ_PACK_MAX_RESUME_CHARS get a pack of their own.
+    """
+    packs, current, size = [], [], 0
+    for i, text in enumerate(resume_texts):
+        if len(text) > GROQ_PACK_MAX_RESUME_CHARS:
+            packs.append([i])
+            continue
+        if current and (len(current) >= GROQ_PACK_MAX_RESUMES or size + len(text) > GROQ_PACK_MAX_CHARS):
+            packs.append(current)
+            current, size = [], 0
+        current.append(i)
+        size += len(text)
+    if current:
+        packs.append(current)
+    return packs
+
+
+def _packed_prompt(resume_texts: dict) -> str:
+    blocks = "\n\n".join(
+        f"<<<RESUME {resume_id}>>>\n{text}\n<<<END RESUME {resume_id}>>>" for resume_id, text in resume_texts.items()
+    )
+    return f"""
+You are an AI resume parser. The text below holds {len(resume_texts)} separate resumes, each between
+<<<RESUME id>>> and <<<END RESUME id>>> markers. Extract the following fields from each resume on its own;
+never mix details from different resumes.
+Calculate total professional experience in years by analyzing the work experience timeline. Use the current date for "Present" if needed.
+Return a valid JSON array with one object per resume, in the same order. Each object has a "resume_id" key
+holding the id from its markers, plus exactly these fields:
+
+{RESUME_SCHEMA}
+
+{FIELD_DETAILS}
+
+Resumes:
+{blocks}
+"""
+
+
+def validate_extraction(item) -> dict:
+    """
+    Check one extracted resume against the ParsedResume schema.
+    Returns the fields as extract_resume_data would; raises ValueError if invalid.
+    """
+    from ..serializers import ParsedResumeRecordSerializer
+
+    if not isinstance(item, dict):
+        raise ValueError(f"expected a JSON object, got {type(item).__name__}")
+    data = {k: v for k, v in item.items() if k != "resume_id"}
+    if not any(data.get(field) for field in ("name", "email", "phone")):
+        raise ValueError("no name, email or phone")
+    serializer = ParsedResumeRecordSerializer(data=data)
+    if not serializer.is_valid():
+        raise ValueError(json.dumps(serializer.errors))
+    return data
+
+
+def extract_resume_batch(resume_texts: list) -> list:
+    """
+    Extract several resumes with as few LLM calls as possible.
+    Short resumes are packed into one prompt (see pack_resumes), and each
+    answer is validated; any resume missing from or invalid in its pack's
+    answer is extracted again on its own. Returns one parsed dict per input
+    text, in order, or None where even the single call failed.
+    """
+    results = [None] * len(resume_texts)
+    retry = []
+    for pack in pack_resumes(resume_texts):
+        if len(pack) == 1:
+            retry.extend(pack)
+            continue
+        try:
+            content = _complete(_packed_prompt({str(i): resume_texts[i] for i in pack}))
+            match = re.search(r'\[.*\]', content, re.DOTALL)
+            if not match:
+                raise ValueError("No JSON array found in LLM response.")
+            items = json.loads(match.group(0))
+            if not isinstance(items, list):
+                raise ValueError("LLM response is not a JSON array.")
+        except Exception as e:
+            print(f"⚠️ Packed extraction of {len(pack)} resumes failed ({e}), extracting them one by one")
+            retry.extend(pack)
+            continue
+        by_id = {str(item.get("resume_id")): item for item in items if isinstance(item, dict)}
+        for i in pack:
+            try:
+                if str(i) not in by_id:
+                    raise ValueError("missing from the answer")
+                results[i] = validate_extraction(by_id[str(i)])
+            except ValueError as e:
+                print(f"⚠️ Resume {i} of a packed call: {e}; extracting it alone")
+                retry.append(i)
+
+    for i in sorted(retry):
+        try:
+            results[i] = extract_resume_data(resume_texts[i])
+        except Exception as e:
+            print(f"❌ Extraction failed for resume {i}: {e}")
+    return results
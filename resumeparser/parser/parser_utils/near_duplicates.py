@@ -0,0 +1,138 @@
+"""
+Near-duplicate detection for uploaded resume text, run before the LLM parse.
+
+Every stored ResumeVersion keeps a MinHash signature of its text's word
+shingles, split into LSH bands (ResumeLSHBucket rows). An upload is compared
+only with versions that share at least one band, so the lookup cost grows with
+the number of similar resumes, not with the table.
+"""
+import re
+import random
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+from ..models import ResumeVersion, ResumeLSHBucket
+
+# Changing any of these invalidates the stored signatures
+SHINGLE_WORDS = 3
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16  # of 8 rows: texts sharing 85% of their shingles collide in a band 99% of the time
+ROWS_PER_BAND = NUM_PERMUTATIONS // LSH_BANDS
+
+POLICIES = ("skip", "replace", "version", "off")
+
+# Hash family h(x) = (a*x + b) mod p over 32-bit shingle hashes; a, b < 2^31 keep a*x + b inside uint64
+_PRIME = np.uint64(4294967311)
+_rng = random.Random(1729)
+_A = np.array([_rng.randrange(1, 1 << 31) for _ in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+_B = np.array([_rng.randrange(0, 1 << 31) for _ in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+
+
+def normalize_words(text: str) -> list:
+    """Lower-cased alphanumeric words; layout, punctuation and spacing differences vanish."""
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+def shingles(words: list) -> set:
+    if len(words) < SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(shingle_set: set) -> np.ndarray:
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingle_set),
+        dtype=np.uint64, count=len(shingle_set),
+    )
+    return ((np.outer(_A, hashes) + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def band_keys(signature) -> list:
+    signature = np.asarray(signature, dtype=np.uint64)
+    keys = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        keys.append(f"{band:02d}{hashlib.blake2b(rows.tobytes(), digest_size=8).hexdigest()}")
+    return keys
+
+
+def estimate_similarity(a, b) -> float:
+    """Share of equal MinHash values: an unbiased estimate of the shingles' Jaccard similarity."""
+    return float(np.mean(np.asarray(a, dtype=np.uint64) == np.asarray(b, dtype=np.uint64)))
+
+
+@dataclass
+class Fingerprint:
+    text_hash: str
+    signature: list
+
+    @property
+    def band_keys(self) -> list:
+        return band_keys(self.signature)
+
+
+@dataclass
+class NearDuplicate:
+    version: ResumeVersion
+    similarity: float
+    exact: bool
+
+    def describe(self, action: str) -> dict:
+        """The `near_duplicate` field of the parse response."""
+        return {"resume_id": self.version.resume_id, "version": self.version.version,
+                "similarity": round(self.similarity, 3), "exact": self.exact, "action": action}
+
+
+def dedup_policy() -> str:
+    policy = settings.RESUME_DEDUP_POLICY
+    if policy not in POLICIES:
+        raise ImproperlyConfigured(f"RESUME_DEDUP_POLICY must be one of {', '.join(POLICIES)}, got '{policy}'")
+    return policy
+
+
+def fingerprint(text: str):
+    """Fingerprint of a resume text, or None when it has no words to compare."""
+    words = normalize_words(text)
+    if not words:
+        return None
+    text_hash = hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()
+    return Fingerprint(text_hash, minhash(shingles(words)).tolist())
+
+
+def find_near_duplicate(fp: Fingerprint, threshold: float = None):
+    """The stored version most similar to `fp` at or above `threshold`, or None."""
+    threshold = settings.RESUME_DEDUP_THRESHOLD if threshold is None else threshold
+    exact = ResumeVersion.objects.filter(text_hash=fp.text_hash).order_by("-id").first()
+    if exact is not None:
+        return NearDuplicate(exact, 1.0, True)
+
+    candidate_ids = ResumeLSHBucket.objects.filter(key__in=fp.band_keys).values_list("version_id", flat=True)
+    best = None
+    for version in ResumeVersion.objects.filter(id__in=candidate_ids).only("id", "resume_id", "version", "minhash"):
+        similarity = estimate_similarity(fp.signature, version.minhash)
+        if similarity >= threshold and (best is None or similarity > best.similarity):
+            best = NearDuplicate(version, similarity, False)
+    return best
+
+
+def record_version(resume, fp: Fingerprint, parsed: dict, similarity: float = None, keep_history: bool = True):
+    """
+    Store `fp` as the newest version of `resume`. Without `keep_history` the
+    earlier versions are deleted, so only the latest text is matched later.
+    """
+    with transaction.atomic():
+        latest = resume.versions.order_by("-version").first()
+        number = latest.version + 1 if latest else 1
+        if not keep_history:
+            resume.versions.all().delete()
+        version = ResumeVersion.objects.create(
+            resume=resume, version=number, text_hash=fp.text_hash, minhash=fp.signature,
+            similarity=similarity, parsed=parsed,
+        )
+        ResumeLSHBucket.objects.bulk_create([ResumeLSHBucket(key=key, version=version) for key in fp.band_keys])
+    return version
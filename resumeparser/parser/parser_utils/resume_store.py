@@ -0,0 +1,182 @@
+import json
+import hashlib
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from ..models import ParsedResume, Skill, CandidateSkill
+
+# Parsed fields as returned by the LLM parser, with their empty defaults
+RESUME_FIELDS = {
+    "name": "",
+    "email": "",
+    "phone": "",
+    "location": "",
+    "experience_years": 0,
+    "skills": [],
+    "current_role": "",
+    "company": "",
+    "education": [],
+    "projects": [],
+    "work_experience": [],
+}
+
+# Columns rewritten when an incoming record replaces an existing candidate
+UPDATE_FIELDS = list(RESUME_FIELDS) + ["content_hash"]
+
+
+def normalize_phone(phone) -> str:
+    """Keep the last 10 digits of a phone number (same rule as agent/data_loader)."""
+    digits = "".join(filter(str.isdigit, str(phone or "")))
+    return digits[-10:] if len(digits) >= 10 else digits
+
+
+def normalize_skill(skill) -> str:
+    """Lower-case and collapse whitespace so "  LangChain " and "langchain" match."""
+    return " ".join(str(skill).split()).lower()[:100]
+
+
+def _skill_names(skills) -> set:
+    if not isinstance(skills, list):
+        return set()
+    return {name for name in (normalize_skill(s) for s in skills if s) if name}
+
+
+def sync_skill_links(skills_by_resume: dict):
+    """
+    Rebuild the normalized skill links for the given {resume_id: skills} map.
+    Must run inside the caller's transaction. ParsedResume.save() calls this
+    itself; bulk writes, which skip save(), must call it.
+    """
+    names_by_resume = {rid: _skill_names(skills) for rid, skills in skills_by_resume.items()}
+    all_names = set().union(*names_by_resume.values()) if names_by_resume else set()
+    if all_names:
+        Skill.objects.bulk_create([Skill(name=n) for n in all_names], ignore_conflicts=True)
+    skill_ids = dict(Skill.objects.filter(name__in=all_names).values_list("name", "id"))
+
+    CandidateSkill.objects.filter(resume_id__in=list(names_by_resume)).delete()
+    CandidateSkill.objects.bulk_create([
+        CandidateSkill(resume_id=rid, skill_id=skill_ids[name])
+        for rid, names in names_by_resume.items()
+        for name in names
+    ])
+
+
+def compute_content_hash(data: dict) -> str:
+    """
+    SHA-256 over the parsed fields in a canonical JSON form.
+    The phone is hashed in its normalized form, so records with the same
+    content hash always share the same normalized phone.
+    """
+    canonical = {field: data.get(field, default) for field, default in RESUME_FIELDS.items()}
+    canonical["phone"] = normalize_phone(canonical["phone"])
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_resume_record(data: dict) -> dict:
+    """Fill defaults for missing fields and attach the upsert keys."""
+    record = {}
+    for field, default in RESUME_FIELDS.items():
+        value = data.get(field)
+        record[field] = default if value is None else value
+    record["phone_normalized"] = normalize_phone(record["phone"]) or None
+    record["content_hash"] = compute_content_hash(record)
+    return record
+
+
+def upsert_parsed_resume(data: dict, match: ParsedResume = None):
+    """
+    Insert or update a single parsed resume.
+    `match` is updated when neither upsert key finds a row, e.g. the candidate
+    a near-duplicate upload was linked to.
+    Returns (instance, created). Re-uploading an identical resume is a no-op.
+    """
+    record = build_resume_record(data)
+    with transaction.atomic():
+        existing = None
+        if record["phone_normalized"]:
+            existing = ParsedResume.objects.select_for_update().filter(
+                phone_normalized=record["phone_normalized"]
+            ).first()
+        if existing is None:
+            existing = ParsedResume.objects.select_for_update().filter(
+                content_hash=record["content_hash"]
+            ).first()
+        if existing is None and match is not None:
+            existing = ParsedResume.objects.select_for_update().filter(pk=match.pk).first()
+
+        if existing is None:
+            # save() also writes the skill links
+            return ParsedResume.objects.create(**record), True
+        if existing.content_hash != record["content_hash"]:
+            for field in RESUME_FIELDS:
+                setattr(existing, field, record[field])
+            existing.save()
+        return existing, False
+
+
+def _write_batch(records):
+    """Upsert one batch inside a single transaction. Returns (written, unchanged, duplicates)."""
+    # Collapse repeats inside the batch (last one wins); Postgres rejects
+    # ON CONFLICT DO UPDATE touching the same row twice in one statement.
+    by_key = {}
+    for record in records:
+        key = record["phone_normalized"] or f"hash:{record['content_hash']}"
+        by_key[key] = record
+    duplicates = len(records) - len(by_key)
+
+    with transaction.atomic():
+        known = set(
+            ParsedResume.objects.filter(
+                content_hash__in=[r["content_hash"] for r in by_key.values()]
+            ).values_list("content_hash", flat=True)
+        )
+        pending = [r for r in by_key.values() if r["content_hash"] not in known]
+
+        with_phone = [ParsedResume(**r) for r in pending if r["phone_normalized"]]
+        without_phone = [ParsedResume(**r) for r in pending if not r["phone_normalized"]]
+        if with_phone:
+            ParsedResume.objects.bulk_create(
+                with_phone,
+                update_conflicts=True,
+                unique_fields=["phone_normalized"],
+                update_fields=UPDATE_FIELDS,
+            )
+        if without_phone:
+            # Without a phone the content hash is the only key, and known
+            # hashes were already filtered out above.
+            ParsedResume.objects.bulk_create(without_phone, ignore_conflicts=True)
+
+        if pending:
+            skills_by_hash = {r["content_hash"]: r["skills"] for r in pending}
+            ids = ParsedResume.objects.filter(content_hash__in=list(skills_by_hash)).values_list("id", "content_hash")
+            sync_skill_links({rid: skills_by_hash[h] for rid, h in ids})
+
+    return len(pending), len(by_key) - len(pending), duplicates
+
+
+def bulk_upsert_parsed_resumes(records, batch_size: int = None) -> dict:
+    """
+    Write many parsed resumes with upsert semantics keyed on the normalized
+    phone (or the content hash when there is no phone).
+    `records` may be any iterable of parsed dicts; each batch of `batch_size`
+    rows is committed in its own transaction.
+    Returns counters: received, written, unchanged, duplicates, batches.
+    """
+    batch_size = batch_size or settings.RESUME_BULK_BATCH_SIZE
+    stats = {"received": 0, "written": 0, "unchanged": 0, "duplicates": 0, "batches": 0}
+
+    iterator = iter(records)
+    while True:
+        batch = [build_resume_record(data) for data in islice(iterator, batch_size)]
+        if not batch:
+            break
+        written, unchanged, duplicates = _write_batch(batch)
+        stats["received"] += len(batch)
+        stats["written"] += written
+        stats["unchanged"] += unchanged
+        stats["duplicates"] += duplicates
+        stats["batches"] += 1
+    return stats
@@ -0,0 +1,37 @@
+from ..models import ParsedResume, Skill
+from .resume_store import normalize_skill
+
+# Columns returned by the search endpoint (keeps result pages small)
+SEARCH_FIELDS = (
+    "id", "name", "email", "phone", "location", "experience_years",
+    "skills", "current_role", "company",
+)
+
+
+def search_candidates(skills=None, min_experience=None, max_experience=None, after_id=None, limit=50):
+    """
+    Candidates having ALL of `skills` (case-insensitive), optionally bounded by
+    experience_years, ordered by id and keyset-paginated with `after_id`.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    queryset = ParsedResume.objects.all()
+    if min_experience is not None:
+        queryset = queryset.filter(experience_years__gte=min_experience)
+    if max_experience is not None:
+        queryset = queryset.filter(experience_years__lte=max_experience)
+
+    names = {normalize_skill(s) for s in (skills or []) if normalize_skill(s)}
+    if names:
+        skill_ids = list(Skill.objects.filter(name__in=names).values_list("id", flat=True))
+        if len(skill_ids) < len(names):
+            return [], None  # a requested skill no candidate has
+        # One join per required skill, each served by the (skill, resume) index
+        for skill_id in skill_ids:
+            queryset = queryset.filter(skill_links__skill_id=skill_id)
+
+    if after_id is not None:
+        queryset = queryset.filter(id__gt=after_id)
+
+    rows = list(queryset.order_by("id").values(*SEARCH_FIELDS)[:limit + 1])
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    return rows[:limit], next_cursor
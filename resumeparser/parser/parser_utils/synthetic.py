@@ -0,0 +1,76 @@
+import random
+
+FIRST_NAMES = ["Aarav", "Priya", "Rahul", "Ananya", "Vikram", "Sneha", "Arjun", "Meera", "Karan", "Divya"]
+LAST_NAMES = ["Sharma", "Reddy", "Iyer", "Patel", "Nair", "Gupta", "Rao", "Menon", "Singh", "Das"]
+CITIES = ["Hyderabad", "Bengaluru", "Pune", "Chennai", "Delhi", "Mumbai"]
+SKILLS = [
+    "Python", "LangChain", "Groq", "LLMs", "PyTorch", "TensorFlow", "SQL", "PostgreSQL",
+    "Django", "FastAPI", "Docker", "Kubernetes", "AWS", "Pinecone", "React", "Java",
+    "Spark", "Airflow", "NLP", "Computer Vision",
+]
+ROLES = ["ML Engineer", "Data Scientist", "Backend Developer", "Gen AI Engineer", "Software Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries"]
+
+
+def generate_parsed_resumes(count: int, seed: int = 0, phone_prefix: str = "90"):
+    """
+    Yield `count` synthetic parsed resumes shaped like extract_resume_data() output.
+    Phones are unique per index and start with `phone_prefix`, so load-test rows
+    can be found (and deleted) afterwards.
+    """
+    rng = random.Random(seed)
+    width = 10 - len(phone_prefix)
+    for i in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        skills = rng.sample(SKILLS, rng.randint(3, 8))
+        company = rng.choice(COMPANIES)
+        yield {
+            "name": name,
+            "email": f"{name.split()[0].lower()}.{i}@example.com",
+            "phone": f"+91 {phone_prefix}{i:0{width}d}",
+            "location": rng.choice(CITIES),
+            "experience_years": rng.randint(0, 12),
+            "skills": skills,
+            "current_role": rng.choice(ROLES),
+            "company": company,
+            "education": [f"B.Tech Computer Science, Batch {rng.randint(2008, 2024)}"],
+            "projects": [
+                {
+                    "title": f"{skill} project {j + 1}",
+                    "description": f"Built a {skill} based service for {company}.",
+                }
+                for j, skill in enumerate(skills[:2])
+            ],
+            "work_experience": [f"{rng.choice(ROLES)} at {company}"],
+        }
+
+
+SENTENCES = [
+    "Designed and shipped a {skill} service used by {n} internal teams at {company}.",
+    "Cut p95 latency by {n}% by profiling hot paths and caching {skill} results.",
+    "Led a team of {n} engineers migrating batch jobs to {skill}.",
+    "Built data pipelines in {skill} processing {n} million events per day.",
+    "Mentored {n} junior engineers and ran weekly {skill} reading groups.",
+    "Owned on-call for the {skill} platform and reduced incidents by {n}%.",
+    "Worked with product managers to plan {n} quarterly {skill} roadmaps.",
+    "Wrote design docs and reviewed code for the {skill} migration at {company}.",
+]
+
+
+def render_resume_text(data: dict, seed: int = 0, sentences: int = 30) -> str:
+    """Plain resume text for a synthetic parsed resume, as text extraction would return it."""
+    rng = random.Random(f"{seed}:{data['email']}")
+    lines = [
+        data["name"], f"{data['email']} | {data['phone']} | {data['location']}",
+        f"{data['current_role']} at {data['company']} ({data['experience_years']} years)",
+        "Skills: " + ", ".join(data["skills"]),
+        "Experience",
+    ]
+    for _ in range(sentences):
+        lines.append(rng.choice(SENTENCES).format(skill=rng.choice(data["skills"]), n=rng.randint(2, 90),
+                                                  company=data["company"]))
+    lines.append("Projects")
+    lines.extend(f"{p['title']}: {p['description']}" for p in data["projects"])
+    lines.append("Education")
+    lines.extend(data["education"])
+    return "\n".join(lines)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import ParsedResume
+from .parser_utils.resume_store import RESUME_FIELDS
 
 class ResumeParseRequestSerializer(serializers.Serializer):
     file = serializers.FileField(required=False)
@@ -10,7 +11,36 @@ class ResumeParseRequestSerializer(serializers.Serializer):
             raise serializers.ValidationError("Provide either a resume file or resume text.")
         return data
 
+class ResumeBatchParseRequestSerializer(serializers.Serializer):
+    files = serializers.ListField(child=serializers.FileField(), required=False, max_length=100)
+    texts = serializers.ListField(child=serializers.CharField(), required=False, max_length=100)
+
+    def validate(self, data):
+        if not data.get("files") and not data.get("texts"):
+            raise serializers.ValidationError("Provide resume files or resume texts.")
+        return data
+
 class ParsedResumeSerializer(serializers.ModelSerializer):
     class Meta:
         model = ParsedResume
         fields = '__all__'
+
+class ParsedResumeRecordSerializer(serializers.ModelSerializer):
+    """One already-parsed resume in a bulk ingestion payload."""
+    class Meta:
+        model = ParsedResume
+        fields = list(RESUME_FIELDS)
+
+class BulkResumeIngestSerializer(serializers.Serializer):
+    records = ParsedResumeRecordSerializer(many=True, allow_empty=False)
+    batch_size = serializers.IntegerField(required=False, min_value=1, max_value=10000)
+
+class CandidateSearchQuerySerializer(serializers.Serializer):
+    skills = serializers.CharField(required=False, allow_blank=True, help_text="Comma-separated, all required.")
+    min_experience = serializers.FloatField(required=False, min_value=0)
+    max_experience = serializers.FloatField(required=False, min_value=0)
+    cursor = serializers.IntegerField(required=False, min_value=0)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=500, default=50)
+
+    def validate_skills(self, value):
+        return [s.strip() for s in value.split(",") if s.strip()]
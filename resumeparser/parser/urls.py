@@ -1,5 +1,8 @@
 from django.urls import path
-from .views import ResumeParserAPIView
+from .views import ResumeParserAPIView, ResumeBatchParseAPIView, BulkResumeIngestAPIView, CandidateSearchAPIView
 urlpatterns = [
     path('parse/', ResumeParserAPIView.as_view(), name='resume-parse'),
+    path('parse/batch/', ResumeBatchParseAPIView.as_view(), name='resume-batch-parse'),
+    path('parse/bulk/', BulkResumeIngestAPIView.as_view(), name='resume-bulk-ingest'),
+    path('candidates/search/', CandidateSearchAPIView.as_view(), name='candidate-search'),
 ]
@@ -4,9 +4,61 @@ import docx2txt
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .parser_utils.llm_parser import extract_resume_data
-from .models import ParsedResume
-from .serializers import ResumeParseRequestSerializer, ParsedResumeSerializer
+from .parser_utils.llm_parser import extract_resume_data, extract_resume_batch
+from .parser_utils.near_duplicates import dedup_policy, fingerprint, find_near_duplicate, record_version
+from .parser_utils.resume_store import upsert_parsed_resume, bulk_upsert_parsed_resumes
+from .parser_utils.skill_search import search_candidates
+from .serializers import (
+    ResumeParseRequestSerializer,
+    ResumeBatchParseRequestSerializer,
+    ParsedResumeSerializer,
+    BulkResumeIngestSerializer,
+    CandidateSearchQuerySerializer,
+)
+
+def extract_upload_text(file) -> str:
+    """Text of an uploaded PDF or DOCX file; raises ValueError for other types."""
+    file_name = file.name.lower()
+    if file_name.endswith(".pdf"):
+        print("Extracting text from PDF file.")
+        with fitz.open(stream=file.read(), filetype="pdf") as doc:
+            return "\n".join([page.get_text() for page in doc])
+    if file_name.endswith(".docx"):
+        print("Extracting text from DOCX file.")
+        temp_path = f"/tmp/{file.name}"
+        with open(temp_path, "wb+") as temp_file:
+            for chunk in file.chunks():
+                temp_file.write(chunk)
+        text = docx2txt.process(temp_path)
+        os.remove(temp_path)
+        return text
+    raise ValueError("Unsupported file type. Upload PDF or DOCX.")
+
+
+def find_duplicate(text, policy):
+    """(fingerprint, near duplicate) of an upload; both None when detection is off or the text is empty."""
+    fp = fingerprint(text) if policy != "off" else None
+    return fp, find_near_duplicate(fp) if fp else None
+
+
+def skips_parse(duplicate, policy) -> bool:
+    return bool(duplicate) and (duplicate.exact or policy == "skip")
+
+
+def store_extraction(extracted_data, fp, duplicate, policy):
+    """Upsert an LLM extraction (onto the linked candidate, if any) and record its text version."""
+    parsed_resume, created = upsert_parsed_resume(
+        extracted_data, match=duplicate.version.resume if duplicate else None
+    )
+    if fp:
+        record_version(parsed_resume, fp, extracted_data,
+                       similarity=duplicate.similarity if duplicate else None,
+                       keep_history=policy == "version")
+    response_data = ParsedResumeSerializer(parsed_resume).data
+    if duplicate:
+        response_data["near_duplicate"] = duplicate.describe("versioned" if policy == "version" else "replaced")
+    return response_data, created
+
 
 class ResumeParserAPIView(APIView):
     def post(self, request):
@@ -17,52 +69,35 @@ class ResumeParserAPIView(APIView):
             text = serializer.validated_data.get("text")
             if serializer.validated_data.get("file"):
                 file = serializer.validated_data["file"]
-                file_name = file.name.lower()
-                print(f"Processing uploaded file: {file_name}")
+                print(f"Processing uploaded file: {file.name.lower()}")
                 try:
-                    if file_name.endswith(".pdf"):
-                        print("Extracting text from PDF file.")
-                        with fitz.open(stream=file.read(), filetype="pdf") as doc:
-                            text = "\n".join([page.get_text() for page in doc])
-                    elif file_name.endswith(".docx"):
-                        print("Extracting text from DOCX file.")
-                        temp_path = f"/tmp/{file.name}"
-                        with open(temp_path, "wb+") as temp_file:
-                            for chunk in file.chunks():
-                                temp_file.write(chunk)
-                        text = docx2txt.process(temp_path)
-                        os.remove(temp_path)
-                    else:
-                        print("Unsupported file type uploaded.")
-                        return Response(
-                            {"error": "Unsupported file type. Upload PDF or DOCX."},
-                            status=status.HTTP_400_BAD_REQUEST
-                        )
+                    text = extract_upload_text(file)
+                except ValueError as e:
+                    print("Unsupported file type uploaded.")
+                    return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
                 except Exception as e:
                     print(f"Failed to extract text from file: {e}")
                     return Response(
                         {"error": f"Failed to extract text: {str(e)}"},
                         status=status.HTTP_500_INTERNAL_SERVER_ERROR
                     )
+            policy = dedup_policy()
+            fp, duplicate = find_duplicate(text, policy)
+            if skips_parse(duplicate, policy):
+                print(f"Near-duplicate of resume {duplicate.version.resume_id} "
+                      f"(similarity {duplicate.similarity:.2f}), skipping the LLM parse.")
+                response_data = ParsedResumeSerializer(duplicate.version.resume).data
+                response_data["near_duplicate"] = duplicate.describe("skipped")
+                return Response(response_data, status=status.HTTP_200_OK)
             try:
                 print("Extracting structured data from resume text using LLM.")
                 extracted_data = extract_resume_data(text)
-                parsed_resume = ParsedResume.objects.create(
-                    name=extracted_data.get("name", ""),
-                    email=extracted_data.get("email", ""),
-                    phone=extracted_data.get("phone", ""),
-                    location=extracted_data.get("location", ""),
-                    experience_years=extracted_data.get("experience_years", 0),
-                    skills=extracted_data.get("skills", []),
-                    current_role=extracted_data.get("current_role", ""),
-                    company=extracted_data.get("company", ""),
-                    education=extracted_data.get("education", []),
-                    projects=extracted_data.get("projects", []),
-                    work_experience=extracted_data.get("work_experience", []),
+                response_data, created = store_extraction(extracted_data, fp, duplicate, policy)
+                print("Resume parsed and saved successfully." if created else "Resume parsed and matched an existing record.")
+                return Response(
+                    response_data,
+                    status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
                 )
-                response_data = ParsedResumeSerializer(parsed_resume).data
-                print("Resume parsed and saved successfully.")
-                return Response(response_data, status=status.HTTP_201_CREATED)
             except Exception as e:
                 print(f"LLM parsing failed: {e}")
                 return Response(
@@ -71,3 +106,94 @@ class ResumeParserAPIView(APIView):
                 )
         print("Serializer errors:", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ResumeBatchParseAPIView(APIView):
+    """
+    Parse several resumes at once. Body: repeated "files" (PDF / DOCX) and/or a "texts" list.
+    Short resumes are packed into shared LLM calls (llm_parser.extract_resume_batch).
+    Returns {"results": [...]} in input order (files first), each with a "status" of
+    created, updated, skipped (near-duplicate) or failed.
+    """
+    def post(self, request):
+        serializer = ResumeBatchParseRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            print("Serializer errors:", serializer.errors)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        policy = dedup_policy()
+        results, texts, pending = [], [], []
+        uploads = serializer.validated_data.get("files", []) + serializer.validated_data.get("texts", [])
+        for i, upload in enumerate(uploads):
+            try:
+                text = upload if isinstance(upload, str) else extract_upload_text(upload)
+            except Exception as e:
+                results.append({"status": "failed", "error": f"Failed to extract text: {str(e)}"})
+                continue
+            fp, duplicate = find_duplicate(text, policy)
+            if skips_parse(duplicate, policy):
+                resume = ParsedResumeSerializer(duplicate.version.resume).data
+                resume["near_duplicate"] = duplicate.describe("skipped")
+                results.append({"status": "skipped", "resume": resume})
+                continue
+            results.append(None)
+            texts.append(text)
+            pending.append((i, fp, duplicate))
+
+        print(f"Extracting {len(texts)} resume(s) with packed LLM calls.")
+        for (i, fp, duplicate), extracted_data in zip(pending, extract_resume_batch(texts)):
+            if extracted_data is None:
+                results[i] = {"status": "failed", "error": "LLM parsing failed"}
+                continue
+            try:
+                resume, created = store_extraction(extracted_data, fp, duplicate, policy)
+                results[i] = {"status": "created" if created else "updated", "resume": resume}
+            except Exception as e:
+                results[i] = {"status": "failed", "error": f"Failed to save: {str(e)}"}
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class BulkResumeIngestAPIView(APIView):
+    """
+    Write already-parsed resumes in bulk.
+    Body: {"records": [<parsed resume>, ...], "batch_size": <optional int>}
+    Records are upserted on the normalized phone / content hash, one transaction per batch.
+    """
+    def post(self, request):
+        serializer = BulkResumeIngestSerializer(data=request.data)
+        if not serializer.is_valid():
+            print("Serializer errors:", serializer.errors)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            stats = bulk_upsert_parsed_resumes(
+                serializer.validated_data["records"],
+                batch_size=serializer.validated_data.get("batch_size"),
+            )
+        except Exception as e:
+            print(f"Bulk ingest failed: {e}")
+            return Response(
+                {"error": f"Bulk ingest failed: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        print(f"Bulk ingest finished: {stats}")
+        return Response(stats, status=status.HTTP_200_OK)
+
+
+class CandidateSearchAPIView(APIView):
+    """
+    Filter candidates by skills and experience.
+    GET /api/candidates/search/?skills=Python,LangChain&min_experience=2&limit=50
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page.
+    """
+    def get(self, request):
+        serializer = CandidateSearchQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = serializer.validated_data
+        rows, next_cursor = search_candidates(
+            skills=params.get("skills"),
+            min_experience=params.get("min_experience"),
+            max_experience=params.get("max_experience"),
+            after_id=params.get("cursor"),
+            limit=params["limit"],
+        )
+        return Response({"results": rows, "next_cursor": next_cursor}, status=status.HTTP_200_OK)
@@ -16,6 +16,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'parser',
 ]
 
@@ -81,3 +82,15 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Rows per transaction for bulk resume upserts (parser.parser_utils.resume_store)
+RESUME_BULK_BATCH_SIZE = int(os.getenv('RESUME_BULK_BATCH_SIZE', '1000'))
+
+# Near-duplicate uploads (parser.parser_utils.near_duplicates), matched before the LLM parse:
+#   skip     return the existing candidate without parsing (exact re-uploads are always skipped)
+#   replace  parse, overwrite the existing candidate and forget its earlier text
+#   version  parse, overwrite the existing candidate and keep earlier texts as versions
+#   off      no detection
+RESUME_DEDUP_POLICY = os.getenv('RESUME_DEDUP_POLICY', 'skip').lower()
+# Estimated Jaccard similarity of word 3-shingles above which two uploads are the same resume
+RESUME_DEDUP_THRESHOLD = float(os.getenv('RESUME_DEDUP_THRESHOLD', '0.85'))